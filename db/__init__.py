@@ -1,14 +1,38 @@
 #Makes db importable as a package instead of a module
 
-from .session import engine, SessionLocal, get_session, create_all, drop_all, db_healthcheck
+from .session import get_engine, SessionLocal, get_session, create_all, drop_all, db_healthcheck
 from .base import Base
+from .dialect import dialect_insert
+from .instrumentation import query_stats, reset_query_stats, format_query_stats
+
+#resolved on first access: `engine` creates the engine, the async names import
+#sqlalchemy.ext.asyncio only for programs that use them
+_ASYNC_NAMES = ("get_async_engine", "get_async_session", "dispose_async_engine")
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    if name in _ASYNC_NAMES:
+        from . import async_session
+        return getattr(async_session, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "engine",
+    "get_engine",
     "SessionLocal",
     "get_session",
     "create_all",
     "drop_all",
     "db_healthcheck",
     "Base",
+    "dialect_insert",
+    "get_async_engine",
+    "get_async_session",
+    "dispose_async_engine",
+    "query_stats",
+    "reset_query_stats",
+    "format_query_stats",
 ]
\ No newline at end of file
@@ -0,0 +1,91 @@
+#Async counterpart of db/session.py for asyncio callers (simulated clients, an API front end)
+#same DATABASE_URL and pool settings; psycopg v3 serves both the sync and the async engine
+#the engine is built on first use, so sync-only programs never create it
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from config import get_settings
+from db import instrumentation
+from db.dialect import sqlite_connect_pragmas
+
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+
+def _async_url(url: str) -> str:
+    """Pick the asyncio driver for the configured database (psycopg for PostgreSQL)."""
+    u = make_url(url)
+    if u.get_backend_name() == "sqlite":
+        # local stand-in; needs the aiosqlite package
+        return str(u.set(drivername="sqlite+aiosqlite"))
+    return str(u.set(drivername="postgresql+psycopg"))
+
+
+def get_async_engine() -> AsyncEngine:
+    """Create (once) and return the async engine."""
+    global _async_engine
+    if _async_engine is None:
+        settings = get_settings()
+        url = _async_url(settings.database_url)
+        if url.startswith("sqlite"):
+            _async_engine = create_async_engine(
+                url, echo=settings.echo, connect_args={"timeout": settings.pool_timeout}
+            )
+            event.listen(_async_engine.sync_engine, "connect", sqlite_connect_pragmas)
+        else:
+            _async_engine = create_async_engine(
+                url,
+                echo=settings.echo,
+                pool_size=settings.pool_size,
+                max_overflow=settings.max_overflow,
+                pool_timeout=settings.pool_timeout,
+                pool_recycle=settings.pool_recycle,
+                pool_pre_ping=True,
+                connect_args={"options": "-c timezone=utc"},
+            )
+        if settings.sql_instrument:
+            instrumentation.install(_async_engine.sync_engine, settings.sql_slow_ms)
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    #same session behavior as SessionLocal: explicit flushes, objects usable after commit
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
+    return _AsyncSessionLocal
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    #commits if no exception: rolls back on error, & always closes the session
+    #opened before the scope: the first call creates the engine, which installs instrumentation
+    session = get_async_sessionmaker()()
+    with instrumentation.scope(depth=4):
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (call before the event loop shuts down)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
@@ -0,0 +1,29 @@
+#Dialect-aware helpers for statements that differ between PostgreSQL and the SQLite stand-in
+
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(session: Session, entity: Any):
+    """
+    INSERT construct for the session's database so callers can use
+    on_conflict_do_nothing / on_conflict_do_update (both dialects support them).
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(entity)
+
+
+def sqlite_connect_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    """
+    "connect" listener for SQLite engines: enforce foreign keys (so ON DELETE CASCADE
+    behaves as on PostgreSQL and deleted events take their seats and tickets along)
+    and use WAL so readers don't block the single writer.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
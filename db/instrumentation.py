@@ -0,0 +1,204 @@
+#Per-statement query instrumentation hooked into the engine(s)
+#- every statement is timed (cursor execute events) and its rows counted (cursor.rowcount:
+#  rows affected for DML, rows returned for SELECT where the driver reports it, psycopg does)
+#- statements are attributed to the current scope: one get_session() block, named after the
+#  function that opened it, so "purchase_event_seats: 4 statements, 3.1 ms" is visible per call
+#- statements slower than SQL_SLOW_MS are logged as one JSON line (sql, params, ms, rows, scope)
+#  on the "db.slow_query" logger; the library only adds a NullHandler, entry points that want
+#  the log configure logging (worker/daemon.py does)
+#- query_stats() returns the running totals per scope and per statement; a scope that runs the
+#  same statement many times in one call (an N+1 loop) shows up in max_repeats
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_log = logging.getLogger("db.slow_query")
+slow_log.addHandler(logging.NullHandler())
+
+# Longest SQL text / parameter repr kept in the slow-query log and the statement table.
+_MAX_SQL_CHARS = 2000
+_MAX_PARAM_ROWS = 5
+# Distinct statements tracked; IN-lists and multi-row VALUES vary the SQL text, the rest share one bucket.
+_MAX_STATEMENTS = 500
+_OTHER = "<other statements>"
+
+
+@dataclass
+class _Totals:
+    calls: int = 0
+    statements: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    max_repeats: int = 0  # most executions of one statement within a single call
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "statements": self.statements,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "statements_per_call": round(self.statements / self.calls, 2) if self.calls else 0.0,
+            "max_repeats": self.max_repeats,
+        }
+
+
+@dataclass
+class _Scope:
+    name: str
+    statements: int = 0
+    rows: int = 0
+    sql_ms: float = 0.0
+    repeats: Counter = field(default_factory=Counter)
+
+
+_current: ContextVar[Optional[_Scope]] = ContextVar("db_query_scope", default=None)
+_lock = threading.Lock()
+_scopes: Dict[str, _Totals] = {}
+_statements: Dict[str, _Totals] = {}
+_slow_ms = 200.0
+_installed: List[Engine] = []
+
+
+def _caller_name(depth: int) -> str:
+    frame = sys._getframe(depth + 1)
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+@contextmanager
+def scope(name: Optional[str] = None, depth: int = 2) -> Iterator[None]:
+    """
+    Attribute the statements run inside to one named call. Nested scopes count toward
+    the outermost one. `name` defaults to the function `depth` frames up.
+    """
+    if not _installed or _current.get() is not None:
+        yield
+        return
+    s = _Scope(name or _caller_name(depth))
+    token = _current.set(s)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        with _lock:
+            t = _scopes.setdefault(s.name, _Totals())
+            t.calls += 1
+            t.statements += s.statements
+            t.rows += s.rows
+            t.total_ms += s.sql_ms
+            t.max_ms = max(t.max_ms, s.sql_ms)
+            t.max_repeats = max(t.max_repeats, max(s.repeats.values(), default=0))
+
+
+def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    ms = (time.perf_counter() - started) * 1000.0
+    rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else 0
+    sql = statement[:_MAX_SQL_CHARS]
+    s = _current.get()
+    if s is not None:
+        s.statements += 1
+        s.rows += rows
+        s.sql_ms += ms
+        s.repeats[sql] += 1
+    with _lock:
+        key = sql if sql in _statements or len(_statements) < _MAX_STATEMENTS else _OTHER
+        t = _statements.setdefault(key, _Totals())
+        t.calls += 1
+        t.statements += 1
+        t.rows += rows
+        t.total_ms += ms
+        t.max_ms = max(t.max_ms, ms)
+    if ms >= _slow_ms:
+        if executemany:
+            params: Any = [repr(p) for p in list(parameters)[:_MAX_PARAM_ROWS]]
+        else:
+            params = repr(parameters)[:_MAX_SQL_CHARS]
+        slow_log.warning(json.dumps({
+            "event": "slow_query",
+            "ms": round(ms, 3),
+            "rows": rows,
+            "scope": s.name if s is not None else None,
+            "executemany": bool(executemany),
+            "sql": sql,
+            "params": params,
+        }))
+
+
+def _error(ctx) -> None:
+    # a statement that raised never reaches _after: drop its start time so the pooled
+    # connection's stack doesn't grow (fetch errors come with statement None and were timed)
+    if ctx.connection is not None and ctx.statement is not None:
+        started = ctx.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def install(engine: Engine, slow_ms: Optional[float] = None) -> None:
+    """Hook the timing listeners into an engine (idempotent). slow_ms sets the slow-query threshold."""
+    global _slow_ms
+    if slow_ms is not None:
+        _slow_ms = slow_ms
+    if engine in _installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    event.listen(engine, "handle_error", _error)
+    _installed.append(engine)
+
+
+def query_stats(top: int = 20) -> Dict[str, Any]:
+    """
+    Running totals: per scope (service call) and the `top` statements by total time.
+    Times are milliseconds spent in the database driver.
+    """
+    with _lock:
+        scopes = {name: t.as_dict() for name, t in sorted(_scopes.items(), key=lambda kv: -kv[1].total_ms)}
+        statements = [
+            {"sql": sql, **t.as_dict()}
+            for sql, t in sorted(_statements.items(), key=lambda kv: -kv[1].total_ms)[:top]
+        ]
+    for st in statements:
+        for k in ("statements", "statements_per_call", "max_repeats"):
+            st.pop(k)
+    return {"slow_ms": _slow_ms, "scopes": scopes, "statements": statements}
+
+
+def reset_query_stats() -> None:
+    with _lock:
+        _scopes.clear()
+        _statements.clear()
+
+
+def format_query_stats(top: int = 10) -> str:
+    """query_stats() as a plain-text table for CLIs and benchmark output."""
+    stats = query_stats(top)
+    lines = [f"{'scope':<58} {'calls':>7} {'stmts/call':>10} {'mean ms':>9} {'max ms':>9} {'repeats':>7}"]
+    for name, t in stats["scopes"].items():
+        lines.append(
+            f"{name[-58:]:<58} {t['calls']:>7} {t['statements_per_call']:>10} "
+            f"{t['mean_ms']:>9.2f} {t['max_ms']:>9.2f} {t['max_repeats']:>7}"
+        )
+    lines.append("")
+    lines.append(f"{'count':>7} {'total ms':>10} {'max ms':>9}  statement")
+    for st in stats["statements"]:
+        sql = " ".join(st["sql"].split())
+        lines.append(f"{st['calls']:>7} {st['total_ms']:>10.2f} {st['max_ms']:>9.2f}  {sql[:100]}")
+    return "\n".join(lines)
@@ -0,0 +1,96 @@
+#Idempotent schema upgrades for databases created before a model change
+#- create_all() only creates missing tables: it never adds a column, index or constraint to a
+#  table that already exists. Each step below does that for one model change, checking the live
+#  schema first, so upgrade() is safe to re-run (scripts/bootstrap_db.py runs it after create_all)
+#- steps run in order, each in its own transaction, and return what they changed
+#- new tables (holds, idempotency_keys, event_inventory_stats) come from create_all
+
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .session import get_engine
+
+
+def _columns(conn: Connection, table: str) -> Set[str]:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _create_index(conn: Connection, name: str, table: str, definition: str) -> List[str]:
+    if name in {ix["name"] for ix in inspect(conn).get_indexes(table)}:
+        return []
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}"))
+    return [f"index {name}"]
+
+
+def _seat_section(conn: Connection) -> List[str]:
+    # user-007: seat sections, and seat uniqueness widened from (venue, row, number) to include the section
+    done: List[str] = []
+    if "section" not in _columns(conn, "seats"):
+        conn.execute(text("ALTER TABLE seats ADD COLUMN section varchar(50) NOT NULL DEFAULT ''"))
+        done.append("column seats.section")
+    done += _create_index(conn, "ix_seats_section", "seats", "(section)")
+    if conn.dialect.name != "postgresql":
+        # other backends can't drop a table constraint in place; only PostgreSQL is deployed
+        return done
+    uniques = {
+        frozenset(uc["column_names"]): uc["name"] for uc in inspect(conn).get_unique_constraints("seats")
+    }
+    old = uniques.get(frozenset({"venue_id", "row", "number"}))
+    if old:
+        conn.execute(text(f'ALTER TABLE seats DROP CONSTRAINT "{old}"'))
+        done.append(f"dropped unique {old}")
+    if frozenset({"venue_id", "section", "row", "number"}) not in uniques:
+        conn.execute(text(
+            "ALTER TABLE seats ADD CONSTRAINT seats_venue_id_section_row_number_key "
+            'UNIQUE (venue_id, section, "row", number)'
+        ))
+        done.append("unique seats_venue_id_section_row_number_key")
+    return done
+
+
+def _event_seat_version(conn: Connection) -> List[str]:
+    # user-011: optimistic version column, and the partial indexes behind available_clause
+    done: List[str] = []
+    if "version" not in _columns(conn, "event_seats"):
+        conn.execute(text("ALTER TABLE event_seats ADD COLUMN version integer NOT NULL DEFAULT 0"))
+        done.append("column event_seats.version")
+    done += _create_index(
+        conn, "ix_event_seats_available", "event_seats", "(event_id, seat_id) WHERE status = 'AVAILABLE'"
+    )
+    done += _create_index(
+        conn, "ix_event_seats_held_until", "event_seats", "(event_id, held_until) WHERE status = 'HELD'"
+    )
+    return done
+
+
+def _event_seat_hold(conn: Connection) -> List[str]:
+    # user-012: hold sessions; the holds table itself comes from create_all
+    done: List[str] = []
+    if "hold_id" not in _columns(conn, "event_seats"):
+        conn.execute(text(
+            "ALTER TABLE event_seats ADD COLUMN hold_id integer REFERENCES holds (id) ON DELETE SET NULL"
+        ))
+        done.append("column event_seats.hold_id")
+    done += _create_index(conn, "ix_event_seats_hold_id", "event_seats", "(hold_id)")
+    done += _create_index(conn, "ix_holds_active_expires_at", "holds", "(expires_at) WHERE status = 'ACTIVE'")
+    return done
+
+
+# (name, step) in the order the model changes were made
+STEPS: List[Tuple[str, Callable[[Connection], List[str]]]] = [
+    ("seat_section", _seat_section),
+    ("event_seat_version", _event_seat_version),
+    ("event_seat_hold", _event_seat_hold),
+]
+
+
+def upgrade(engine: Optional[Engine] = None) -> List[str]:
+    """Apply every pending step; returns a line per change made (empty when up to date)."""
+    engine = engine or get_engine()
+    changes: List[str] = []
+    for name, step in STEPS:
+        with engine.begin() as conn:
+            changes += [f"{name}: {change}" for change in step(conn)]
+    return changes
@@ -2,48 +2,108 @@
 #session orm handle for transactions (query/insert/update/delete
 #get_session() context manager that commits on success, rolls back on error)
 
+import threading
 from contextlib import contextmanager
 from typing import Iterator, Dict, Any
 
 
 #engine factory and raw sql helper
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
 
 #session factory
 from sqlalchemy.orm import sessionmaker, Session
 
 #import setting from config
-from config import get_settings
+from config import Settings, get_settings
 
 #shared base to create_all/drop_all 
 from db.base import Base
+from db.dialect import sqlite_connect_pragmas
+
+#per-statement timing, per-get_session scopes and the slow-query log
+from db import instrumentation
+
+#the engine is created on first use (get_engine(), or the first session), not at import:
+#short-lived scripts that never touch the database skip the settings, pool and driver setup
+_engine_lock = threading.Lock()
+
+
+def _connect_args(settings: Settings) -> Dict[str, Any]:
+    #PostgreSQL sessions run in UTC (consistent timestamps); a SQLite file (local stand-in,
+    #e.g. for scripts/onsale_load.py) waits up to pool_timeout for a writer instead of failing
+    backend = make_url(settings.database_url).get_backend_name()
+    if backend == "postgresql":
+        return {"options": "-c timezone=utc"}
+    if backend == "sqlite":
+        return {"timeout": settings.pool_timeout}
+    return {}
+
+
+def _create_engine() -> Engine:
+    #load settings
+    settings = get_settings()
+
+    # Creating the Engine (connection factory).
+    #    - echo=settings.echo → prints SQL if true
+    #    - pool_* → connection pool tuning (safe defaults for dev).
+    #    - pool_pre_ping=True → validates connections to avoid stale-connection errors.
+    #    - connect_args → timezone=utc on PostgreSQL, see _connect_args.
+    new_engine = create_engine(
+        settings.database_url,
+        echo=settings.echo,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=True,
+        connect_args=_connect_args(settings),
+        future=True,  # Use SQLAlchemy 2.x behavior explicitly.
+    )
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", sqlite_connect_pragmas)
+    # Statement timing / slow-query log (SQL_INSTRUMENT, SQL_SLOW_MS); see db/instrumentation.py
+    if settings.sql_instrument:
+        instrumentation.install(new_engine, settings.sql_slow_ms)
+    return new_engine
+
+
+def get_engine() -> Engine:
+    """Create (once) and return the engine; binds SessionLocal to it."""
+    global engine
+    current = globals().get("engine")
+    if current is None:
+        with _engine_lock:
+            current = globals().get("engine")
+            if current is None:
+                current = engine = _create_engine()
+                if SessionLocal.kw.get("bind") is None:
+                    SessionLocal.configure(bind=current)
+    return current
+
+
+def __getattr__(name: str) -> Any:
+    # `db.session.engine` keeps working: the first access creates the engine
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that creates the engine the first time an unbound session is opened."""
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            get_engine()
+        return super().__call__(**local_kw)
 
-#load settings
-settings = get_settings()
-
-# Creating the Engine (connection factory).
-#    - echo=settings.echo → prints SQL if true
-#    - pool_* → connection pool tuning (safe defaults for dev).
-#    - pool_pre_ping=True → validates connections to avoid stale-connection errors.
-#    - connect_args timezone=utc → run sessions in UTC (consistent timestamps).
-engine = create_engine(
-    settings.database_url,
-    echo=settings.echo,
-    pool_size=settings.pool_size,
-    max_overflow=settings.max_overflow,
-    pool_timeout=settings.pool_timeout,
-    pool_recycle=settings.pool_recycle,
-    pool_pre_ping=True,
-    connect_args={"options": "-c timezone=utc"},
-    future=True,  # Use SQLAlchemy 2.x behavior explicitly.
-)
 
 #  Buildintg  a Session factory.
 #    - autoflush=False → you control when pending changes are flushed.
 #    - autocommit=False → explicit commit/rollback (safer).
 #    - expire_on_commit=False → objects remain usable after commit (nice for CLIs).
-SessionLocal = sessionmaker(
-    bind=engine,
+#    - bound to the engine by get_engine() on first use
+SessionLocal = _LazySessionmaker(
     autoflush=False,
     autocommit=False,
     expire_on_commit=False,
@@ -56,30 +116,33 @@ def get_session() -> Iterator[Session]:
     #makes get_session as Session
 
     #commits if no exception: rolls back error, & always close session
+    #statements inside are attributed to the calling function (db/instrumentation.py)
+    #the session is opened first: the first one creates the engine, which installs instrumentation
     session = SessionLocal()
-    try:
-        yield session
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
+    with instrumentation.scope(depth=4):
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
 def create_all() -> None:
     """Create all tables in the database. Uses metadata from Base."""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 def drop_all() -> None:
     """Drop all tables in the database. Uses metadata from Base."""
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
 
 def db_healthcheck() -> Dict[str, Any]:
     """
     Quick connectivity test: fetch server version and current timestamp.
     Returns a dict you can print for diagnostics.
     """
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         server_version = conn.execute(text("show server_version")).scalar_one()
         now = conn.execute(text("select now()")).scalar_one()
         return {"server_version": str(server_version), "now": str(now)}
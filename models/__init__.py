@@ -9,5 +9,8 @@ from .event import Event
 from .event_seat import EventSeat
 from .customer import Customer
 from .ticket import Ticket
+from .hold import Hold
+from .idempotency_key import IdempotencyKey
+from .event_inventory_stats import EventInventoryStats
 
-__all__ = ["Venue", "Seat", "Event", "EventSeat", "Customer", "Ticket"]
\ No newline at end of file
+__all__ = ["Venue", "Seat", "Event", "EventSeat", "Customer", "Ticket", "Hold", "IdempotencyKey", "EventInventoryStats"]
\ No newline at end of file
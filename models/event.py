@@ -12,6 +12,7 @@ if TYPE_CHECKING:
     # type-only imports to avoid circular imports at runtime
     from models.venue import Venue
     from models.event_seat import EventSeat
+    from models.event_inventory_stats import EventInventoryStats
 
 
 class Event(Base):
@@ -33,8 +34,13 @@ class Event(Base):
 
     # Relationships
     venue: Mapped["Venue"] = relationship(back_populates="events")
+    #passive_deletes: deleting an event leaves its seats (and their tickets) to the
+    #database's ON DELETE CASCADE instead of loading every row into the session first
     event_seats: Mapped[List["EventSeat"]] = relationship(
-        back_populates="event", cascade="all, delete-orphan"
+        back_populates="event", cascade="all, delete-orphan", passive_deletes=True
+    )
+    inventory_stats: Mapped[Optional["EventInventoryStats"]] = relationship(
+        back_populates="event", cascade="all, delete-orphan", uselist=False, passive_deletes=True
     )
 
     #nullable description/ advertisement
@@ -0,0 +1,50 @@
+"""
+EventInventoryStats model (maps to 'event_inventory_stats' table).
+- One row per event: seat counts by stored status plus revenue of the SOLD seats.
+- Kept in step by the hold / sell / release / seed services in the same transaction
+  as the event_seats change; scripts/reconcile_inventory_stats.py rebuilds it.
+"""
+from typing import TYPE_CHECKING
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, BigInteger, ForeignKey, DateTime
+from db.base import Base
+
+if TYPE_CHECKING:
+    # type-only imports to avoid circular imports at runtime
+    from models.event import Event
+
+
+class EventInventoryStats(Base):
+    __tablename__ = "event_inventory_stats"
+
+    #one row per event, removed with it
+    event_id: Mapped[int] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    #counts follow the stored status: a lapsed hold stays in `held` until it is released
+    available: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    held: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    sold: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    #sum of price_ksh over SOLD seats
+    revenue_ksh: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc)
+    )
+
+    # Relationships
+    event: Mapped["Event"] = relationship(back_populates="inventory_stats")
+
+    @property
+    def total(self) -> int:
+        return self.available + self.held + self.sold
+
+    def __repr__(self) -> str:
+        return (
+            f"<EventInventoryStats event_id={self.event_id} available={self.available} "
+            f"held={self.held} sold={self.sold} revenue_ksh={self.revenue_ksh}>"
+        )
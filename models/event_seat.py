@@ -8,18 +8,35 @@ from datetime import datetime
 
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, ForeignKey, UniqueConstraint, DateTime, Enum as SAEnum
+from sqlalchemy import Integer, ForeignKey, UniqueConstraint, Index, DateTime, Enum as SAEnum, text
 from db.base import Base
 
 if TYPE_CHECKING:
     # type-only imports to avoid circular imports at runtime
     from models.event import Event
     from models.seat import Seat
+    from models.hold import Hold
 
 class EventSeat(Base):
     __tablename__ = "event_seats"
     #prevent the same seat from appearing twice for the same event
-    __table_args__ = (UniqueConstraint("event_id", "seat_id"),)
+    __table_args__ = (
+        UniqueConstraint("event_id", "seat_id"),
+        # partial indexes behind the availability predicate (AVAILABLE, or HELD with a lapsed
+        # held_until): each side of the OR stays a small index range scan per event
+        Index(
+            "ix_event_seats_available",
+            "event_id", "seat_id",
+            postgresql_where=text("status = 'AVAILABLE'"),
+            sqlite_where=text("status = 'AVAILABLE'"),
+        ),
+        Index(
+            "ix_event_seats_held_until",
+            "event_id", "held_until",
+            postgresql_where=text("status = 'HELD'"),
+            sqlite_where=text("status = 'HELD'"),
+        ),
+    )
 
 
 
@@ -47,6 +64,15 @@ class EventSeat(Base):
 
     #when a seat is temporarily held
     held_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    #hold session currently (or last) holding this seat; cleared when the hold is released
+    hold_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("holds.id", ondelete="SET NULL"), index=True, nullable=True
+    )
+
+    #optimistic concurrency: bumped by every status change, checked by versioned writes
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     # Relationships
     event: Mapped["Event"] = relationship(back_populates="event_seats")
     seat: Mapped["Seat"] = relationship(back_populates="event_seats")
+    hold: Mapped[Optional["Hold"]] = relationship(back_populates="event_seats")
@@ -0,0 +1,57 @@
+"""
+Hold model (maps to 'holds' table).
+- One row per hold session: a token, an owner, an expiry and the seats it covers.
+- Seats point back with event_seats.hold_id, so finalize / extend / cancel need only the token.
+"""
+from typing import Optional, List, TYPE_CHECKING
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, ForeignKey, Index, DateTime, Enum as SAEnum, text
+from db.base import Base
+
+if TYPE_CHECKING:
+    # type-only imports to avoid circular imports at runtime
+    from models.event_seat import EventSeat
+
+
+class Hold(Base):
+    __tablename__ = "holds"
+    __table_args__ = (
+        #the sweeper only ever looks for ACTIVE holds past their expiry
+        Index(
+            "ix_holds_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    #opaque handle given to the buyer
+    token: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
+
+    event_id: Mapped[int] = mapped_column(
+        ForeignKey("events.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+
+    #who placed the hold (customer email, client/session id); free-form
+    owner: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    status: Mapped[str] = mapped_column(
+        SAEnum("ACTIVE", "FINALIZED", "CANCELLED", "EXPIRED", name="hold_status", native_enum=False),
+        default="ACTIVE",
+        nullable=False,
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc)
+    )
+
+    # Relationships
+    event_seats: Mapped[List["EventSeat"]] = relationship(back_populates="hold")
+
+    def __repr__(self) -> str:
+        return f"<Hold id={self.id} token={self.token!r} status={self.status} expires_at={self.expires_at}>"
@@ -0,0 +1,32 @@
+"""
+IdempotencyKey model (maps to 'idempotency_keys' table).
+- One row per client-supplied key for a booking call, with the ticket ids it produced.
+- Rows expire (expires_at) and are purged, so storage stays bounded.
+"""
+from typing import Optional, List
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, DateTime, JSON
+from db.base import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+
+    #booking function that claimed the key (purchase / finalize / finalize_hold)
+    operation: Mapped[str] = mapped_column(String(50), nullable=False)
+    customer_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    #ticket ids created by the first call; replayed to every retry
+    ticket_ids: Mapped[List[int]] = mapped_column(JSON, nullable=False, default=list)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(tz=timezone.utc)
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey key={self.key!r} operation={self.operation} tickets={self.ticket_ids}>"
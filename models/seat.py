@@ -29,14 +29,16 @@ class Seat(Base):
 
 
     __table_args__ = (
-        #prevent the table from having dupicate seat positions
-        UniqueConstraint("venue_id", "row", "number"),
+        #prevent the table from having dupicate seat positions (row labels may repeat across sections)
+        UniqueConstraint("venue_id", "section", "row", "number"),
     )
     #cascade so that deleting a venue deletes its seats
     id: Mapped[int] = mapped_column(primary_key=True)
     venue_id: Mapped[int] = mapped_column(
         ForeignKey("venues.id", ondelete="CASCADE"), index=True, nullable = False
     )
+    #optional grouping of rows (e.g., "North Stand"); "" for venues without sections
+    section: Mapped[str] = mapped_column(String(50), nullable=False, default="", server_default="", index=True)
     #venue seat format
     # Human-friendly position (e.g., row "A", number 12)
     row: Mapped[str] = mapped_column(String(10), nullable=False, index=True)
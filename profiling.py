@@ -0,0 +1,183 @@
+"""
+Opt-in profiling for CLI actions and worker cycles.
+
+Off unless a profile directory is set, in the process environment or by a --profile flag:
+  PROFILE_DIR=profiles/        write one profile per action / cycle into this directory
+  PROFILE_MEMORY=1             also trace allocations (tracemalloc; slower)
+  PROFILE_ONLY=list,reclaim    only actions whose name contains one of these
+
+Wrap the code to capture:
+
+    with profiling.profile("admin_list_events"):
+        admin_list_events()
+
+Each profiled action writes two files, <time>-<pid>-<seq>-<name>.prof and .txt:
+- .prof: cProfile stats (python -m pstats FILE, or snakeviz)
+- .txt:  wall time, the SQL run during the action per get_session() scope
+         (db/instrumentation.py: calls, statements, ms), the top functions by
+         cumulative time and, with PROFILE_MEMORY, the top allocation sites and peak.
+Nested actions (a menu action inside the menu session) get their own files; the
+outer profile includes them.
+
+When off, profile() returns a shared no-op context manager: no profiler, no tracing,
+no files.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Sequence
+
+# cProfile / pstats, tracemalloc and the SQL stats are imported on first use: importing this module
+# costs the entry points nothing when profiling stays off
+
+# Functions listed in the .txt summary, and allocation sites with PROFILE_MEMORY.
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+_OFF: ContextManager[None] = nullcontext()
+_UNSET: Any = object()
+
+_directory: Any = _UNSET  # resolved from the environment on first use unless configure() ran
+_memory = False
+_only: Sequence[str] = ()
+_stack: List["_Profile"] = []
+_seq = 0
+
+
+def configure(directory: Optional[str] = None, memory: bool = False, only: Sequence[str] = ()) -> None:
+    """Turn profiling on (directory) or off (None), overriding PROFILE_* variables; for --profile flags."""
+    global _directory, _memory, _only
+    _directory = Path(directory) if directory else None
+    _memory = memory
+    _only = tuple(only)
+
+
+def _from_env() -> Optional[Path]:
+    # process environment only: reading .env (config.py) would cost every start-up the dotenv import
+    configure(
+        os.getenv("PROFILE_DIR") or None,
+        os.getenv("PROFILE_MEMORY", "").strip().lower() in {"1", "true", "yes", "on"},
+        [s.strip() for s in os.getenv("PROFILE_ONLY", "").split(",") if s.strip()],
+    )
+    return _directory
+
+
+def enabled() -> bool:
+    return (_from_env() if _directory is _UNSET else _directory) is not None
+
+
+def profile(name: str) -> ContextManager[None]:
+    """Profile the block as action `name` when profiling is on; a no-op otherwise."""
+    directory = _from_env() if _directory is _UNSET else _directory
+    if directory is None or (_only and not any(o in name for o in _only)):
+        return _OFF
+    return _Profile(name, directory)
+
+
+def _query_scopes() -> Dict[str, Dict[str, Any]]:
+    from db.instrumentation import query_stats
+
+    return query_stats(top=0)["scopes"]
+
+
+def _snapshot() -> Any:
+    # leave out the profiler's own bookkeeping (stats tables, snapshots)
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, f) for f in (tracemalloc.__file__, cProfile.__file__, pstats.__file__, __file__)
+    ])
+
+
+class _Profile:
+    def __init__(self, name: str, directory: Path) -> None:
+        import cProfile
+
+        self.name = name
+        self.directory = directory
+        self.profiler = cProfile.Profile()
+        self.children: List[Any] = []  # pstats.Stats of nested actions
+
+    def __enter__(self) -> None:
+        import tracemalloc
+
+        global _seq
+        _seq += 1
+        self.seq = _seq
+        if _stack:
+            _stack[-1].profiler.disable()  # one active profiler at a time; the parent adds ours on exit
+        elif _memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _stack.append(self)
+        self.queries_before = _query_scopes()
+        self.snapshot = _snapshot() if tracemalloc.is_tracing() else None
+        if self.snapshot is not None:
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        import pstats
+        import tracemalloc
+
+        self.profiler.disable()
+        seconds = time.perf_counter() - self.started
+        _stack.pop()
+        self.stats = pstats.Stats(self.profiler)
+        for child in self.children:
+            self.stats.add(child)
+        try:
+            self._write(seconds, exc_type)
+        finally:
+            if _stack:
+                _stack[-1].children.append(self.stats)
+                _stack[-1].profiler.enable()
+            elif tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def _write(self, seconds: float, exc_type) -> None:
+        import io
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.seq:03d}-{self.name.replace('/', '_')}"
+        self.stats.dump_stats(self.directory / f"{stem}.prof")
+
+        out = io.StringIO()
+        status = "ok" if exc_type is None else f"raised {exc_type.__name__}"
+        out.write(f"action: {self.name}\nwall seconds: {seconds:.4f}\nstatus: {status}\n\n")
+        out.write(self._query_summary())
+        if self.snapshot is not None:
+            out.write(self._memory_summary())
+        out.write(f"\ntop {TOP_FUNCTIONS} functions by cumulative time:\n")
+        self.stats.stream = out
+        self.stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        (self.directory / f"{stem}.txt").write_text(out.getvalue())
+
+    def _query_summary(self) -> str:
+        before, after = self.queries_before, _query_scopes()
+        lines = [f"{'sql scope':<58} {'calls':>6} {'stmts':>7} {'sql ms':>9}"]
+        for scope, t in after.items():
+            b = before.get(scope, {})
+            calls = t["calls"] - b.get("calls", 0)
+            if calls <= 0:
+                continue
+            stmts = t["statements"] - b.get("statements", 0)
+            ms = t["total_ms"] - b.get("total_ms", 0.0)
+            lines.append(f"{scope[-58:]:<58} {calls:>6} {stmts:>7} {ms:>9.2f}")
+        if len(lines) == 1:
+            lines.append("(no SQL, or SQL_INSTRUMENT is off)")
+        return "\n".join(lines) + "\n"
+
+    def _memory_summary(self) -> str:
+        import tracemalloc
+
+        _current, peak = tracemalloc.get_traced_memory()
+        diff = _snapshot().compare_to(self.snapshot, "lineno")
+        lines = [f"\npeak traced memory: {peak / 1024:.1f} KiB", f"top {TOP_ALLOCATIONS} allocation sites (net):"]
+        lines += [f"  {stat}" for stat in diff[:TOP_ALLOCATIONS]]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,112 @@
+"""
+Benchmark: concurrent holds per second, sync threads vs asyncio.
+
+- Reuses the hold benchmark venue/event (1,000 seats, see scripts/hold_benchmark.py).
+- Each client repeatedly places a hold on its own next seats (place_hold vs
+  place_hold_async) until the event's seats are used up; the inventory is reset between runs.
+- Sync: one thread per client on the sync engine. Async: one task per client on the
+  async engine, all on one event loop. Both engines use the configured pool
+  (SQL_POOL_SIZE / SQL_MAX_OVERFLOW); raise it to match large client counts.
+
+Run from project root:
+  python -m scripts.async_hold_benchmark [--clients 1 8 32] [--seats-per-hold 2]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from sqlalchemy import delete, update
+
+import models  # noqa: F401  register mappers
+
+from db import get_session
+from db.async_session import dispose_async_engine
+from models.event_seat import EventSeat
+from models.hold import Hold
+from services import availability_map
+from services.async_services import place_hold_async
+from services.hold_service import place_hold
+from services.inventory_stats import rebuild_stats
+from scripts.hold_benchmark import _setup
+
+
+def _reset(event_id: int) -> None:
+    """Put every seat of the event back to AVAILABLE and drop its holds."""
+    with get_session() as session:
+        session.execute(
+            update(EventSeat)
+            .where(EventSeat.event_id == event_id)
+            .values(status="AVAILABLE", held_until=None, hold_id=None)
+        )
+        session.execute(delete(Hold).where(Hold.event_id == event_id))
+        rebuild_stats(session, [event_id])
+    availability_map.invalidate(event_id)
+
+
+def _work(seat_ids: List[int], clients: int, per_hold: int) -> List[List[List[int]]]:
+    """Per client, the seat-id batches it will hold (disjoint, so every hold succeeds)."""
+    batches = [seat_ids[i:i + per_hold] for i in range(0, len(seat_ids) - per_hold + 1, per_hold)]
+    return [batches[c::clients] for c in range(clients)]
+
+
+def run_sync(event_id: int, work: List[List[List[int]]]) -> int:
+    def client(batches: List[List[int]]) -> int:
+        return sum(1 for b in batches if place_hold(event_id, b, minutes=10))
+
+    with ThreadPoolExecutor(max_workers=len(work)) as pool:
+        return sum(pool.map(client, work))
+
+
+async def run_async(event_id: int, work: List[List[List[int]]]) -> int:
+    async def client(batches: List[List[int]]) -> int:
+        held = 0
+        for b in batches:
+            if await place_hold_async(event_id, b, minutes=10):
+                held += 1
+        return held
+
+    try:
+        return sum(await asyncio.gather(*(client(w) for w in work)))
+    finally:
+        await dispose_async_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32], help="concurrent clients per run")
+    parser.add_argument("--seats-per-hold", type=int, default=2)
+    args = parser.parse_args()
+
+    event_id, seat_ids = _setup()
+    print(f"Event {event_id}: {len(seat_ids)} seats, {args.seats_per_hold} seats per hold")
+    print(f"{'clients':>7} {'sync holds/s':>13} {'async holds/s':>14} {'ratio':>7}")
+    for clients in args.clients:
+        work = _work(seat_ids, clients, args.seats_per_hold)
+
+        _reset(event_id)
+        t0 = time.perf_counter()
+        sync_holds = run_sync(event_id, work)
+        sync_rate = sync_holds / (time.perf_counter() - t0)
+
+        _reset(event_id)
+        t0 = time.perf_counter()
+        async_holds = asyncio.run(run_async(event_id, work))
+        async_rate = async_holds / (time.perf_counter() - t0)
+        _reset(event_id)
+
+        if sync_holds != async_holds:
+            print(f"  ! runs disagree at {clients} clients: sync {sync_holds}, async {async_holds} holds")
+        ratio = async_rate / sync_rate if sync_rate else float("inf")
+        print(f"{clients:>7} {sync_rate:>13,.0f} {async_rate:>14,.0f} {ratio:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
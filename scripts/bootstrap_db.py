@@ -3,7 +3,8 @@ Bootstrap the database schema for local development.
 
 - Imports models so SQLAlchemy registers their tables on Base.metadata.
 - Prints a DB healthcheck to confirm connectivity.
-- Creates any missing tables (safe to re-run).
+- Creates any missing tables, then applies the schema upgrades create_all cannot make
+  to existing tables (db/migrations.py: new columns, indexes, constraints). Safe to re-run.
 """
 from pathlib import Path
 import sys
@@ -12,6 +13,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from db import create_all, db_healthcheck
+from db.migrations import upgrade
 
 # Import models so their tables are registered with Base.metadata (import side effects)
 from models.venue import Venue  # noqa: F401
@@ -20,6 +22,9 @@ from models.event import Event  # noqa: F401
 from models.event_seat import EventSeat  # noqa: F401
 from models.customer import Customer  # noqa: F401
 from models.ticket import Ticket  # noqa: F401
+from models.hold import Hold  # noqa: F401
+from models.idempotency_key import IdempotencyKey  # noqa: F401
+from models.event_inventory_stats import EventInventoryStats  # noqa: F401
 
 
 def main() -> None:
@@ -27,6 +32,10 @@ def main() -> None:
     print(f"DB OK • version={info['server_version']} • now={info['now']}")
     create_all()
     print("Schema created (or already present).")
+    changes = upgrade()
+    for change in changes:
+        print(f"  upgraded {change}")
+    print(f"Schema upgrades: {len(changes)} applied." if changes else "Schema up to date.")
 
 
 if __name__ == "__main__":
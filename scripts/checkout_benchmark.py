@@ -0,0 +1,70 @@
+"""
+Benchmark: per-order checkout latency as orders grow from 1 to 50 seats.
+
+- Reuses the hold benchmark venue/event (1,000 seats).
+- Runs the set-based checkout (_checkout: one UPDATE ... RETURNING + one multi-row
+  INSERT) for each order size; every attempt is rolled back, so inventory stays AVAILABLE.
+- Every order must sell all of its seats; the run stops otherwise, so a checkout that
+  silently sold nothing can't be timed as a fast one.
+
+Run from project root:
+  python -m scripts.checkout_benchmark [--repeat 20]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+import models  # noqa: F401  register mappers
+
+from db import SessionLocal
+from models.event_seat import EventSeat
+from services.booking import _checkout
+from services.customer_service import get_or_create_customer
+from scripts.hold_benchmark import _setup
+
+SIZES = (1, 5, 10, 25, 50)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="orders per size")
+    args = parser.parse_args()
+
+    event_id, _ = _setup()
+    customer = get_or_create_customer("Checkout Benchmark", "checkout-bench@example.com")
+    with SessionLocal() as session:
+        es_ids = list(session.scalars(
+            select(EventSeat.id).where(EventSeat.event_id == event_id).order_by(EventSeat.seat_id)
+        ).all())
+
+    print(f"Event {event_id}: {args.repeat} orders per size (median ms)")
+    print(f"{'seats':>6} {'ms/order':>10} {'ms/seat':>9}")
+    for size in SIZES:
+        samples: list[float] = []
+        for _ in range(args.repeat):
+            now = datetime.now(tz=timezone.utc)
+            session = SessionLocal()
+            try:
+                t0 = time.perf_counter()
+                sold = _checkout(session, event_id, es_ids[:size], customer.id, now, "AVAILABLE")
+                samples.append((time.perf_counter() - t0) * 1000.0)
+                if len(sold) != size:
+                    sys.exit(f"checkout sold {len(sold)} of {size} seats; are the benchmark seats AVAILABLE?")
+            finally:
+                session.rollback()
+                session.close()
+        ms = statistics.median(samples)
+        print(f"{size:>6} {ms:>10.2f} {ms / size:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+Argument-driven CLI: the menu workflows as subcommands, for scripts and bulk operations.
+
+Every command prints NDJSON, one JSON object per line (--json: one JSON array instead):
+  create-event  venue + event, optionally a seat grid and seeded EventSeats  (1 record)
+  seed          seed EventSeats for an event from its venue's seats          (1 record)
+  list-events   events with seat counts and revenue                          (1 per event)
+  hold          hold seats by label / EventSeat id, or the best block of N   (1 record)
+  checkout      finalize a hold by token, or buy seats outright              (1 record)
+  my-bookings   a customer's tickets                                         (1 per ticket)
+  batch         run many of the above from a file, one command per line
+
+A failed command prints {"error": ...} and the process exits 1.
+--profile DIR (or PROFILE_DIR) writes a cProfile / SQL summary per command (profiling.py).
+
+Batch files hold one command per line, written exactly as on the command line
+(shell quoting, `#` comments, blank lines skipped). Every command runs in this one
+process over the one pooled engine, each in its own transaction, so a bad line fails
+alone; its records carry "line" and "command", failures an "error". --stop-on-error
+ends the batch at the first failure.
+
+Run from project root:
+  python -m scripts.cli_commands create-event --venue "KICC" --name "Jazz Night" --in-days 14 --capacity 200
+  python -m scripts.cli_commands hold --event 3 --seats A1,A2 --minutes 10
+  python -m scripts.cli_commands checkout --token <token> --email jane@example.com --name Jane
+  python -m scripts.cli_commands batch ops.txt [--stop-on-error]
+  (python -m scripts.cli_menu <command> ... is the same; without arguments it opens the menu)
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import hashlib
+import json
+import math
+import shlex
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import profiling
+
+# Models and services are imported inside the commands (see scripts/cli_menu.py):
+# a command only pays for what it uses.
+
+Record = Dict[str, Any]
+
+
+class _ArgumentError(ValueError):
+    """Bad arguments on a batch line (raised instead of argparse's exit)."""
+
+
+class _BatchParser(argparse.ArgumentParser):
+    def error(self, message: str) -> None:  # type: ignore[override]
+        raise _ArgumentError(f"{self.prog}: {message}")
+
+    def exit(self, status: int = 0, message: Optional[str] = None) -> None:  # type: ignore[override]
+        # --help / --version on a batch line: that line fails, the batch goes on
+        raise _ArgumentError(message.strip() if message else f"{self.prog}: no command run (exit {status})")
+
+    def print_help(self, file=None) -> None:
+        super().print_help(file or sys.stderr)  # keep stdout NDJSON
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _split_seats(spec: str) -> Tuple[List[int], List[str]]:
+    """'A1,A2,12' -> ([12], ['A1', 'A2']): digits are EventSeat ids, the rest seat labels."""
+    tokens = [t.strip() for t in spec.split(",") if t.strip()]
+    return [int(t) for t in tokens if t.isdigit()], [t for t in tokens if not t.isdigit()]
+
+
+def _start_at(args: argparse.Namespace) -> datetime:
+    if args.start:
+        start = datetime.fromisoformat(args.start)
+        return start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    return datetime.now(tz=timezone.utc) + timedelta(days=args.in_days)
+
+
+def _purchase_key(customer_id: int, event_id: int, spec: str) -> str:
+    """Idempotency key for a purchase: (customer, event, requested seats), the seats hashed."""
+    ids, labels = _split_seats(spec)
+    seats = ",".join([str(i) for i in sorted(set(ids))] + sorted({label.upper() for label in labels}))
+    return f"purchase:{customer_id}:{event_id}:{hashlib.sha256(seats.encode()).hexdigest()[:32]}"
+
+
+def _event_or_error(event_id: int):
+    from db import get_session
+    from models.event import Event
+
+    with get_session() as session:
+        event = session.get(Event, event_id)
+    if event is None:
+        raise LookupError(f"event {event_id} not found")
+    return event
+
+
+def _eventseat_ids_for_labels(event_id: int, labels: Sequence[str]) -> List[int]:
+    """EventSeat ids of the labelled seats, sold or not; an ambiguous label is an error, never a multi-seat buy."""
+    from sqlalchemy import func, select
+    from db import get_session
+    from models.event_seat import EventSeat
+    from models.seat import Seat
+    from services.seat_service import seat_label_expr
+
+    label_expr = func.upper(seat_label_expr())
+    with get_session() as session:
+        rows = session.execute(
+            select(EventSeat.id, label_expr)
+            .join(Seat, Seat.id == EventSeat.seat_id)
+            .where(EventSeat.event_id == event_id, label_expr.in_([label.upper() for label in labels]))
+            .order_by(EventSeat.seat_id)
+        ).all()
+    matches: Dict[str, List[int]] = {}
+    for esid, label in rows:
+        matches.setdefault(label, []).append(esid)
+    ambiguous = sorted(label for label, ids in matches.items() if len(ids) > 1)
+    if ambiguous:
+        raise LookupError(f"seat label(s) {', '.join(ambiguous)} match more than one seat; use the EventSeat id")
+    return [esid for esid, _ in rows]
+
+
+def _ticket_records(tickets) -> List[Record]:
+    return [
+        {
+            "ticket_id": t.id,
+            "event_seat_id": t.event_seat_id,
+            "seat": label,
+            "price_ksh": t.price_ksh,
+            "purchased_at": t.purchased_at,
+        }
+        for t, label in tickets
+    ]
+
+
+# ---------- Commands ----------
+
+def cmd_create_event(args: argparse.Namespace) -> Iterator[Record]:
+    from services.eventseat_setup_service import bulk_seed_event_seats
+    from services.event_service import get_or_create_event
+    from services.seat_service import ensure_grid
+    from services.venue_services import get_or_create_venue
+
+    venue = get_or_create_venue(args.venue, address=args.address)
+    event = get_or_create_event(venue.id, args.name, _start_at(args), args.description)
+    seeded = 0
+    if args.capacity:
+        # Same grid as the menu: --seats-per-row seats per row, rows A, B, ...
+        rows_count = max(1, math.ceil(args.capacity / args.seats_per_row))
+        ensure_grid(venue.id, [chr(ord("A") + i) for i in range(rows_count)], range(1, args.seats_per_row + 1))
+        seeded = bulk_seed_event_seats(event.id, venue.id, args.price, only_missing=True, seat_limit=args.capacity).created
+    yield {
+        "event_id": event.id,
+        "name": event.name,
+        "venue_id": venue.id,
+        "venue": venue.name,
+        "start_at": event.start_at,
+        "seeded": seeded,
+    }
+
+
+def cmd_seed(args: argparse.Namespace) -> Iterator[Record]:
+    from services.eventseat_setup_service import bulk_seed_event_seats
+
+    event = _event_or_error(args.event)
+    report = bulk_seed_event_seats(event.id, event.venue_id, args.price, only_missing=True, seat_limit=args.capacity)
+    yield {
+        "event_id": event.id,
+        "created": report.created,
+        "seconds": round(report.seconds, 4),
+        "rows_per_second": round(report.rows_per_second),
+    }
+
+
+def cmd_list_events(args: argparse.Namespace) -> Iterator[Record]:
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from db import get_session
+    from models.event import Event
+    from services.inventory_stats import get_inventory_stats
+
+    q = select(Event).options(selectinload(Event.venue)).order_by(Event.start_at)
+    if args.upcoming:
+        q = q.where(Event.start_at >= datetime.now(tz=timezone.utc))
+    with get_session() as session:
+        events = session.scalars(q).all()
+    stats = get_inventory_stats([e.id for e in events]) if events else {}
+    for e in events:
+        s = stats.get(e.id)
+        yield {
+            "event_id": e.id,
+            "name": e.name,
+            "venue": e.venue.name if e.venue else None,
+            "start_at": e.start_at,
+            "available": s.available if s else 0,
+            "held": s.held if s else 0,
+            "sold": s.sold if s else 0,
+            "total": s.total if s else 0,
+            "revenue_ksh": s.revenue_ksh if s else 0,
+        }
+
+
+def cmd_hold(args: argparse.Namespace) -> Iterator[Record]:
+    if args.best:
+        from services.seat_allocator import allocate_best_available
+
+        block = allocate_best_available(args.event, args.best, minutes=args.minutes)
+        if block is None:
+            raise LookupError(f"no block of {args.best} seats together is available")
+        yield {
+            "token": block.token,
+            "event_id": args.event,
+            "eventseat_ids": block.eventseat_ids,
+            "seats": block.labels,
+            "expires_at": block.held_until,
+        }
+        return
+
+    from services.eventseat_service import resolve_inventory
+    from services.hold_service import place_hold
+
+    ids, labels = _split_seats(args.seats)
+    rows = resolve_inventory(args.event, eventseat_ids=ids, labels=labels)
+    if not rows:
+        raise LookupError("none of the requested seats is available")
+    receipt = place_hold(args.event, [r.seat_id for r in rows], minutes=args.minutes, owner=args.owner)
+    if receipt is None:
+        raise LookupError("could not place the hold; the seats were taken")
+    held = set(receipt.eventseat_ids)
+    yield {
+        "token": receipt.token,
+        "event_id": receipt.event_id,
+        "eventseat_ids": receipt.eventseat_ids,
+        "seats": [r.label for r in rows if r.id in held],
+        "expires_at": receipt.expires_at,
+    }
+
+
+def cmd_checkout(args: argparse.Namespace) -> Iterator[Record]:
+    from services.customer_service import get_or_create_customer
+
+    if not args.token and not (args.event and args.seats):
+        raise _ArgumentError("checkout: give --token, or --event and --seats")
+    customer = get_or_create_customer(args.name or args.email, args.email, args.phone)
+
+    if args.token:
+        from services.hold_service import finalize_hold
+
+        # The hold token doubles as the idempotency key, as in the menu: re-running replays the tickets
+        result = finalize_hold(args.token, customer.id, idempotency_key=args.idempotency_key or f"finalize:{args.token}")
+        tickets, conflicts, skipped = result.tickets, result.conflicts, result.skipped
+    else:
+        from services.booking import purchase_event_seats
+
+        ids, labels = _split_seats(args.seats)
+        if labels:
+            # every labelled seat, sold or not: a replayed purchase must resolve the same ids
+            ids += _eventseat_ids_for_labels(args.event, labels)
+        # Without --idempotency-key the key is derived from the order itself, so re-running
+        # the same command replays its tickets instead of failing or buying twice
+        key = args.idempotency_key or _purchase_key(customer.id, args.event, args.seats)
+        tickets = purchase_event_seats(args.event, ids, customer.id, idempotency_key=key)
+        sold = {t.event_seat_id for t, _ in tickets}
+        conflicts, skipped = [], [i for i in dict.fromkeys(ids) if i not in sold]
+    if not tickets:
+        raise LookupError("no seats could be booked (unavailable or hold expired)")
+    yield {
+        "customer_id": customer.id,
+        "tickets": _ticket_records(tickets),
+        "total_ksh": sum(t.price_ksh for t, _ in tickets),
+        "conflicts": conflicts,
+        "skipped": skipped,
+    }
+
+
+def cmd_my_bookings(args: argparse.Namespace) -> Iterator[Record]:
+    from sqlalchemy import select
+    from db import get_session
+    from models.customer import Customer
+    from models.event import Event
+    from models.event_seat import EventSeat
+    from models.seat import Seat
+    from models.ticket import Ticket
+    from services.seat_service import seat_label
+
+    with get_session() as session:
+        rows = session.execute(
+            select(Ticket, Event.id, Event.name, Seat.section, Seat.row, Seat.number)
+            .join(Customer, Customer.id == Ticket.customer_id)
+            .join(EventSeat, EventSeat.id == Ticket.event_seat_id)
+            .join(Seat, Seat.id == EventSeat.seat_id)
+            .join(Event, Event.id == EventSeat.event_id)
+            .where(Customer.email == args.email.strip().lower())
+            .order_by(Ticket.purchased_at.desc())
+        ).all()
+    for ticket, event_id, event_name, section, row, number in rows:
+        yield {
+            "ticket_id": ticket.id,
+            "event_id": event_id,
+            "event": event_name,
+            "seat": seat_label(section, row, number),
+            "price_ksh": ticket.price_ksh,
+            "purchased_at": ticket.purchased_at,
+        }
+
+
+# ---------- Parser / runners ----------
+
+def build_parser(parser_class: type = argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser = parser_class(prog="cli_commands", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="print one JSON array instead of NDJSON lines")
+    parser.add_argument("--profile", metavar="DIR", help="profile each command into DIR (see profiling.py)")
+    parser.add_argument("--profile-memory", action="store_true", help="with --profile: trace allocations too")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    p = sub.add_parser("create-event", help="create (or find) a venue and event")
+    p.add_argument("--venue", required=True, help="venue name (created if missing)")
+    p.add_argument("--address", help="address for a new venue")
+    p.add_argument("--name", required=True, help="event name")
+    when = p.add_mutually_exclusive_group()
+    when.add_argument("--start", help="start time, ISO 8601 (UTC if no offset)")
+    when.add_argument("--in-days", type=int, default=7, help="start this many days from now [7]")
+    p.add_argument("--description")
+    p.add_argument("--capacity", type=int, help="seed this many seats (grid created as needed)")
+    p.add_argument("--seats-per-row", type=int, default=10)
+    p.add_argument("--price", type=int, default=1500, help="seat price in KSh [1500]")
+    p.set_defaults(func=cmd_create_event)
+
+    p = sub.add_parser("seed", help="seed EventSeats from the event's venue seats")
+    p.add_argument("--event", type=int, required=True)
+    p.add_argument("--price", type=int, default=1500, help="seat price in KSh [1500]")
+    p.add_argument("--capacity", type=int, help="seed at most this many seats")
+    p.set_defaults(func=cmd_seed)
+
+    p = sub.add_parser("list-events", help="events with seat counts and revenue")
+    p.add_argument("--upcoming", action="store_true", help="only events that have not started")
+    p.set_defaults(func=cmd_list_events)
+
+    p = sub.add_parser("hold", help="hold seats for payment")
+    p.add_argument("--event", type=int, required=True)
+    pick = p.add_mutually_exclusive_group(required=True)
+    pick.add_argument("--seats", help="seat labels or EventSeat ids, comma-separated (A1,A2 / North-A1 or 12,13)")
+    pick.add_argument("--best", type=int, metavar="N", help="best block of N seats together in one row")
+    p.add_argument("--minutes", type=int, default=10, help="hold length [10]")
+    p.add_argument("--owner", help="who the hold is for (recorded on the hold)")
+    p.set_defaults(func=cmd_hold)
+
+    p = sub.add_parser("checkout", help="finalize a hold, or buy seats outright")
+    p.add_argument("--token", help="hold token from `hold`")
+    p.add_argument("--event", type=int, help="buy without a hold: the event ...")
+    p.add_argument("--seats", help="... and its seat labels or EventSeat ids")
+    p.add_argument("--email", required=True)
+    p.add_argument("--name", help="customer name [the email]")
+    p.add_argument("--phone")
+    p.add_argument("--idempotency-key", help="retry key [finalize:<token>, or derived from customer, event and seats]")
+    p.set_defaults(func=cmd_checkout)
+
+    p = sub.add_parser("my-bookings", help="a customer's tickets, newest first")
+    p.add_argument("--email", required=True)
+    p.set_defaults(func=cmd_my_bookings)
+
+    p = sub.add_parser("batch", help="run commands from a file, one per line ('-' reads stdin)")
+    p.add_argument("file")
+    p.add_argument("--stop-on-error", action="store_true", help="stop at the first failing line")
+    p.set_defaults(func=None)
+    return parser
+
+
+def _error(exc: BaseException) -> str:
+    if isinstance(exc, (_ArgumentError, LookupError)):
+        return str(exc)
+    return f"{type(exc).__name__}: {exc}"
+
+
+def run_batch(lines: Iterable[str], stop_on_error: bool = False) -> Iterator[Tuple[bool, Record]]:
+    """Run one command per line; yields (ok, record) with the line number and command attached."""
+    parser = build_parser(_BatchParser)
+    for lineno, line in enumerate(lines, 1):
+        tag: Record = {"line": lineno, "command": line.split(maxsplit=1)[0] if line.strip() else ""}
+        try:
+            argv = shlex.split(line, comments=True)  # an unclosed quote fails this line only
+            if not argv:
+                continue
+            tag["command"] = argv[0]
+            args = parser.parse_args(argv)
+            if args.func is None:
+                raise _ArgumentError("batch: files cannot run other batches")
+            with profiling.profile(f"cli.{args.command}"):
+                records = list(args.func(args))
+        except (Exception, SystemExit) as exc:  # one failing line must not end the batch
+            yield False, {**tag, "error": _error(exc)}
+            if stop_on_error:
+                return
+            continue
+        for rec in records:
+            yield True, {**tag, **rec}
+
+
+def _emit(results: Iterable[Tuple[bool, Record]], as_array: bool) -> bool:
+    """Print the records (NDJSON as they come, or one array); True if every command succeeded."""
+    ok_all = True
+    collected: List[Record] = []
+    for ok, rec in results:
+        ok_all = ok_all and ok
+        if as_array:
+            collected.append(rec)
+        else:
+            print(json.dumps(rec, default=_json_default, ensure_ascii=False), flush=True)
+    if as_array:
+        print(json.dumps(collected, default=_json_default, ensure_ascii=False, indent=2))
+    return ok_all
+
+
+def _single(args: argparse.Namespace) -> Iterator[Tuple[bool, Record]]:
+    try:
+        with profiling.profile(f"cli.{args.command}"):
+            records = list(args.func(args))
+    except Exception as exc:
+        yield False, {"command": args.command, "error": _error(exc)}
+        return
+    for rec in records:
+        yield True, rec
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        profiling.configure(args.profile, memory=args.profile_memory)
+    if args.command == "batch":
+        if args.file == "-":
+            ok = _emit(run_batch(sys.stdin, args.stop_on_error), args.json)
+        else:
+            with open(args.file, encoding="utf-8") as fh:
+                ok = _emit(run_batch(fh, args.stop_on_error), args.json)
+    else:
+        ok = _emit(_single(args), args.json)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,16 @@ from __future__ import annotations
 """
 Text-menu CLI with Admin and Customer workflows.
 
+Given arguments it runs them as a non-interactive command instead:
+  python -m scripts.cli_menu list-events      (see scripts/cli_commands.py)
 """
 import sys
 from pathlib import Path
 import math
+import uuid
 from datetime import datetime, timezone, timedelta
-from typing import List, Tuple
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, List, Tuple
 import logging
 
 # Hard-disable all logging noise for this interactive CLI
@@ -38,30 +42,14 @@ def _quiet_sqlalchemy_logs() -> None:
 
 _quiet_sqlalchemy_logs()
 
-# Register all model mappers
-import models  # noqa: F401
+import profiling
 
-from sqlalchemy import select, func, case
-from sqlalchemy.orm import selectinload
-
-from db import get_session
-from models.venue import Venue
-from models.event import Event
-from models.event_seat import EventSeat
-from models.seat import Seat
-
-from services.venue_services import get_or_create_venue
-from services.event_service import (
-    get_or_create_event,
-    list_all_events,
-    delete_event,
-)
-from services.eventseat_setup_service import seed_event_seats
-from services.eventseat_service import sell_event_seat
-from services.seat_service import ensure_grid
-from services.customer_service import get_or_create_customer
-from services.booking import purchase_event_seats, finalize_held_seats
-from services.eventseat_service import hold_event_seats
+# Models, services and the database engine are imported inside the workflow functions:
+# the menu shows immediately and each workflow pays only for the modules it uses
+# (importing any models.* module registers every mapper, see models/__init__.py).
+if TYPE_CHECKING:
+    from models.event import Event
+    from services.eventseat_service import InventoryRow
 
 
 def input_nonempty(prompt: str) -> str:
@@ -75,9 +63,23 @@ def pause() -> None:
     input("\nPress Enter to continue...")
 
 
+def run_action(action: Callable[[], object]) -> None:
+    # PROFILE_DIR=profiles/ writes a profile + SQL summary per action (profiling.py); off: no cost
+    with profiling.profile(action.__name__):
+        action()
+
+
 # ---------- Admin workflow ----------
 
 def admin_create_event() -> None:
+    from sqlalchemy import select
+    from db import get_session
+    from models.venue import Venue
+    from services.venue_services import get_or_create_venue
+    from services.event_service import get_or_create_event
+    from services.seat_service import ensure_grid
+    from services.eventseat_setup_service import bulk_seed_event_seats
+
     venue_name = input_nonempty("Venue name: ")
     with get_session() as session:
         venue = session.scalar(select(Venue).where(Venue.name == venue_name))
@@ -122,41 +124,38 @@ def admin_create_event() -> None:
         price = int(price_str)
     except ValueError:
         price = 1500
-    created = seed_event_seats(event.id, venue.id, price, only_missing=True, seat_limit=capacity)
-    print(f"Seeded {created} EventSeat rows.")
+    report = bulk_seed_event_seats(event.id, venue.id, price, only_missing=True, seat_limit=capacity)
+    print(f"Seeded {report.created} EventSeat rows ({report.rows_per_second:,.0f} rows/s).")
 
 
 def admin_list_events() -> None:
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from db import get_session
+    from models.event import Event
+    from services.inventory_stats import get_inventory_stats
+
     with get_session() as session:
         rows = session.scalars(
             select(Event).options(selectinload(Event.venue)).order_by(Event.start_at)
         ).all()
-        # Aggregate EventSeat counts per event for visibility
-        if rows:
-            event_ids = [e.id for e in rows]
-            counts = session.execute(
-                select(
-                    EventSeat.event_id,
-                    func.count().label("total"),
-                    func.sum(case((EventSeat.status == "AVAILABLE", 1), else_=0)).label("avail"),
-                )
-                .where(EventSeat.event_id.in_(event_ids))
-                .group_by(EventSeat.event_id)
-            ).all()
-            count_map = {eid: (avail or 0, total or 0) for eid, total, avail in counts}
-        else:
-            count_map = {}
+    # EventSeat counts per event: one event_inventory_stats row each
+    stats = get_inventory_stats([e.id for e in rows]) if rows else {}
     if not rows:
         print("No events.")
         return
     for e in rows:
         vname = e.venue.name if e.venue else "?"
-        avail, total = count_map.get(e.id, (0, 0))
-        suffix = f" [seats: {avail}/{total} available]" if total else ""
+        s = stats.get(e.id)
+        suffix = ""
+        if s is not None and s.total:
+            suffix = f" [seats: {s.available}/{s.total} available, {s.held} held, {s.sold} sold — KSh {s.revenue_ksh}]"
         print(f"{e.id}: {e.name} — {vname} — {e.start_at.isoformat()}{suffix}")
 
 
 def admin_delete_event() -> None:
+    from services.event_service import delete_event
+
     eid_str = input_nonempty("Event ID to delete: ")
     try:
         eid = int(eid_str)
@@ -176,13 +175,13 @@ def admin_menu() -> None:
         print("0) Back")
         choice = input("Select: ").strip()
         if choice == "1":
-            admin_create_event()
+            run_action(admin_create_event)
             pause()
         elif choice == "2":
-            admin_list_events()
+            run_action(admin_list_events)
             pause()
         elif choice == "3":
-            admin_delete_event()
+            run_action(admin_delete_event)
             pause()
         elif choice == "0":
             return
@@ -193,6 +192,11 @@ def admin_menu() -> None:
 # ---------- Customer workflow ----------
 
 def customer_list_events() -> List[Event]:
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from db import get_session
+    from models.event import Event
+
     with get_session() as session:
         rows = session.scalars(
             select(Event).options(selectinload(Event.venue)).order_by(Event.start_at)
@@ -206,26 +210,57 @@ def customer_list_events() -> List[Event]:
     return rows
 
 
-def fetch_available_with_labels(event_id: int, limit: int | None = None) -> List[Tuple[EventSeat, str]]:
-    with get_session() as session:
-        q = (
-            select(EventSeat)
-            .where(EventSeat.event_id == event_id, EventSeat.status == "AVAILABLE")
-            .options(selectinload(EventSeat.seat))
-            .order_by(EventSeat.seat_id)
-        )
-        if isinstance(limit, int) and limit > 0:
-            q = q.limit(limit)
-        es_rows = session.scalars(q).all()
-    labeled: List[Tuple[EventSeat, str]] = []
-    for es in es_rows:
-        seat = es.seat  # loaded by selectinload
-        label = f"{seat.row}{seat.number}" if seat else f"seat#{es.seat_id}"
-        labeled.append((es, label))
-    return labeled
+def fetch_available_with_labels(event_id: int, limit: int | None = None) -> List[Tuple[InventoryRow, str]]:
+    from services.eventseat_service import iter_available_inventory
+
+    # Streams keyset pages of lightweight rows; only `limit` rows are kept (all if None)
+    rows = iter_available_inventory(event_id)
+    if isinstance(limit, int) and limit > 0:
+        rows = islice(rows, limit)
+    return [(r, r.label) for r in rows]
+
+
+def print_available_seats(event_id: int) -> int:
+    """Print every available seat as it streams in; returns how many were shown."""
+    from services.eventseat_service import iter_available_inventory
+
+    shown = 0
+    for r in iter_available_inventory(event_id):
+        if not shown:
+            print("\nAvailable seats:")
+        print(f"EventSeat #{r.id} — {r.label} — KSh {r.price_ksh}")
+        shown += 1
+    return shown
+
+
+def resolve_selection(event_id: int, choice: str) -> List[InventoryRow]:
+    """Turn 'A1,A2' / 'North-A1' / '12,13' into available inventory rows, keeping the typed order."""
+    from services.eventseat_service import resolve_inventory
+
+    tokens = [t.strip() for t in choice.split(",") if t.strip()]
+    ids = [int(t) for t in tokens if t.isdigit()]
+    labels = [t for t in tokens if not t.isdigit()]
+    try:
+        found = resolve_inventory(event_id, eventseat_ids=ids, labels=labels)
+    except ValueError as exc:  # a label matching several seats
+        print(exc)
+        return []
+    by_token = {str(r.id): r for r in found}
+    by_token.update({r.label.upper(): r for r in found})
+    picked: List[InventoryRow] = []
+    for t in tokens:
+        r = by_token.get(t.upper())
+        if r and r not in picked:
+            picked.append(r)
+    return picked
 
 
 def customer_book_seats() -> None:
+    from db import get_session
+    from models.event import Event
+    from services.customer_service import get_or_create_customer
+    from services.hold_service import place_hold, finalize_hold
+
     rows = customer_list_events()
     if not rows:
         return
@@ -236,28 +271,14 @@ def customer_book_seats() -> None:
         print("Invalid Event ID.")
         return
 
-    # Show all available seats (no prompt)
-    avail = fetch_available_with_labels(event_id, limit=None)
-    if not avail:
+    # Show all available seats (no prompt), streamed page by page
+    if not print_available_seats(event_id):
         print("No available seats.")
         return
 
-    print("\nAvailable seats:")
-    for es, label in avail:
-        print(f"EventSeat #{es.id} — {label} — KSh {es.price_ksh}")
-
     choice = input_nonempty("Enter EventSeat IDs or seat labels (comma-separated, e.g., '12,13' or 'A1,A2'): ")
-    tokens = [t.strip() for t in choice.split(",") if t.strip()]
-
-    label_map = {label.upper(): es.id for es, label in avail}
-    to_sell_ids: List[int] = []
-    for t in tokens:
-        if t.isdigit():
-            to_sell_ids.append(int(t))
-        else:
-            esid = label_map.get(t.upper())
-            if esid:
-                to_sell_ids.append(esid)
+    selected = resolve_selection(event_id, choice)
+    to_sell_ids = [r.id for r in selected]
 
     if not to_sell_ids:
         print("Seat selection is not valid, please select a seat from the list ")
@@ -268,44 +289,21 @@ def customer_book_seats() -> None:
         ev = session.get(Event, event_id)
         event_name = ev.name if ev else f"Event {event_id}"
 
-    # Build a map from the displayed avail list for quick labels, and fetch any missing details
-    avail_map = {es.id: (es, label) for es, label in avail}
-    missing_ids = [i for i in to_sell_ids if i not in avail_map]
-    extra_map = {}
-    if missing_ids:
-        with get_session() as session:
-            extra_rows = session.scalars(
-                select(EventSeat)
-                .where(EventSeat.event_id == event_id, EventSeat.id.in_(missing_ids))
-                .options(selectinload(EventSeat.seat))
-            ).all()
-            for es in extra_rows:
-                seat = es.seat
-                label = f"{seat.row}{seat.number}" if seat else f"seat#{es.seat_id}"
-                extra_map[es.id] = (es, label)
-
     # Place a 10-minute hold on selected seats (by seat_id) before payment
-    seat_ids_to_hold: List[int] = []
-    for esid in to_sell_ids:
-        pair = avail_map.get(esid) or extra_map.get(esid)
-        if pair:
-            es, _ = pair
-            seat_ids_to_hold.append(es.seat_id)
-
-    held_eventseat_ids = hold_event_seats(event_id, seat_ids_to_hold, minutes=10)
-    if not held_eventseat_ids:
+    receipt = place_hold(event_id, [r.seat_id for r in selected], minutes=10)
+    if receipt is None:
         print("Could not place holds; seats may have been taken.")
         return
 
     # Recompute total from held items only
-    held_map = {es.id: (es, lbl) for (es, lbl) in (avail + list(extra_map.values())) if es.id in held_eventseat_ids}
-    total_amount = sum(es.price_ksh for es, _ in held_map.values())
+    held = [r for r in selected if r.id in receipt.eventseat_ids]
+    total_amount = sum(r.price_ksh for r in held)
 
     print("\nYour seats are on HOLD for 10 minutes:")
-    for es, label in held_map.values():
-        until = es.held_until.isoformat() if es.held_until else "in 10 minutes"
-        print(f" - {label} — KSh {es.price_ksh} (held until {until})")
+    for r in held:
+        print(f" - {r.label} — KSh {r.price_ksh}")
     print(f"Total: KSh {total_amount}")
+    print(f"Hold reference: {receipt.token}")
     print("Pay with M-Pesa to Till No. 0000.")
     confirm = input_nonempty("Have you completed payment? (yes/no): ").strip().lower()
     if confirm not in ("y", "yes"):
@@ -320,8 +318,12 @@ def customer_book_seats() -> None:
     print(f"Customer ID: {customer.id}")
 
     # Purchase (create tickets) and print confirmations
-    # Finalize purchase of held seats
-    tickets = finalize_held_seats(event_id, held_eventseat_ids, customer.id)
+    # Finalize purchase of held seats; seats changed concurrently are reported, not fatal
+    # The hold token doubles as the idempotency key: a retried confirmation replays the tickets
+    result = finalize_hold(receipt.token, customer.id, idempotency_key=f"finalize:{receipt.token}")
+    tickets = result.tickets
+    if result.conflicts:
+        print(f"{len(result.conflicts)} seat(s) changed while checking out and were not booked.")
     if not tickets:
         print("No seats could be booked (unavailable).")
         return
@@ -334,21 +336,79 @@ def customer_book_seats() -> None:
     print(f"\nSOLD {len(tickets)}/{len(to_sell_ids)} seats.")
 
 
+def customer_book_best_available() -> None:
+    from services.customer_service import get_or_create_customer
+    from services.hold_service import finalize_hold
+    from services.seat_allocator import AllocationContended, allocate_best_available
+
+    rows = customer_list_events()
+    if not rows:
+        return
+    eid_str = input_nonempty("Enter Event ID to book: ")
+    try:
+        event_id = int(eid_str)
+    except ValueError:
+        print("Invalid Event ID.")
+        return
+    size_str = input_nonempty("How many seats together? ")
+    try:
+        party_size = int(size_str)
+    except ValueError:
+        print("Invalid number of seats.")
+        return
+
+    # Find the best contiguous run in one row and place a 10-minute hold on all of it
+    try:
+        block = allocate_best_available(event_id, party_size, minutes=10)
+    except AllocationContended:
+        print("Those seats are in high demand right now; please try again in a moment.")
+        return
+    if block is None:
+        print(f"No block of {party_size} seats together is available.")
+        return
+
+    print(f"\nSeats {', '.join(block.labels)} are on HOLD until {block.held_until.isoformat()}.")
+    print("Pay with M-Pesa to Till No. 0000.")
+    confirm = input_nonempty("Have you completed payment? (yes/no): ").strip().lower()
+    if confirm not in ("y", "yes"):
+        print("Payment not confirmed. Holds will expire automatically in 10 minutes.")
+        return
+
+    cust_name = input_nonempty("Your name: ")
+    cust_email = input_nonempty("Your email: ")
+    cust_phone = input("Your phone (optional): ").strip() or None
+    customer = get_or_create_customer(cust_name, cust_email, cust_phone)
+
+    tickets = finalize_hold(block.token, customer.id, idempotency_key=f"finalize:{block.token}").tickets
+    if not tickets:
+        print("No seats could be booked (holds may have expired).")
+        return
+    print("")
+    for ticket, label in tickets:
+        when = ticket.purchased_at.isoformat()
+        print(f"Booked: Seat {label} — KSh {ticket.price_ksh} — at {when} — Customer #{customer.id}")
+    print(f"\nSOLD {len(tickets)}/{party_size} seats.")
+
+
 def customer_menu() -> None:
     while True:
         # Show events immediately when entering customer menu
         print("\nAvailable events:")
-        customer_list_events()
+        run_action(customer_list_events)
         print("\nCustomer Menu")
         print("1) Book available seats")
         print("2) My bookings")
+        print("3) Book best available seats together")
         print("0) Back")
         choice = input("Select: ").strip()
         if choice == "1":
-            customer_book_seats()
+            run_action(customer_book_seats)
             pause()
         elif choice == "2":
-            customer_list_my_bookings()
+            run_action(customer_list_my_bookings)
+            pause()
+        elif choice == "3":
+            run_action(customer_book_best_available)
             pause()
         elif choice == "0":
             return
@@ -357,6 +417,13 @@ def customer_menu() -> None:
 
 
 def customer_reserve_and_pay() -> None:
+    from db import get_session
+    from models.event import Event
+    from sqlalchemy.exc import OperationalError
+    from services.booking import purchase_event_seats
+    from services.customer_service import get_or_create_customer
+    from services.eventseat_service import hold_event_seats
+
     rows = customer_list_events()
     if not rows:
         return
@@ -367,35 +434,13 @@ def customer_reserve_and_pay() -> None:
         print("Invalid Event ID.")
         return
 
-    # Show available seats
-    avail = fetch_available_with_labels(event_id, limit=None)
-    if not avail:
+    # Show available seats, streamed page by page
+    if not print_available_seats(event_id):
         print("No available seats.")
         return
 
-    print("\nAvailable seats:")
-    for es, label in avail:
-        print(f"EventSeat #{es.id} — {label} — KSh {es.price_ksh}")
-
     choice = input_nonempty("Enter seat labels or EventSeat IDs to reserve (comma-separated): ")
-    tokens = [t.strip() for t in choice.split(",") if t.strip()]
-
-    label_map = {label.upper(): es.seat_id for es, label in avail}
-    to_hold_seat_ids: List[int] = []
-    for t in tokens:
-        if t.isdigit():
-            # An EventSeat ID was given; map to its seat_id
-            try:
-                esid = int(t)
-            except ValueError:
-                continue
-            es = next((es for es, _ in avail if es.id == esid), None)
-            if es:
-                to_hold_seat_ids.append(es.seat_id)
-        else:
-            sid = label_map.get(t.upper())
-            if sid:
-                to_hold_seat_ids.append(sid)
+    to_hold_seat_ids = [r.seat_id for r in resolve_selection(event_id, choice)]
 
     if not to_hold_seat_ids:
         print("No valid selections.")
@@ -407,6 +452,10 @@ def customer_reserve_and_pay() -> None:
         print("Could not place holds (perhaps already taken).")
         return
 
+    # One key per order, fixed when the hold is placed: every confirmation attempt for
+    # this order (a retry after a failure included) replays instead of reselling
+    order_key = f"purchase:{uuid.uuid4().hex}"
+
     print("\nHOLD PLACED on the following EventSeat IDs:", held_eventseat_ids)
     print("Please make MPESA payment to Till No. 0000 now.")
     print("You have 10 minutes before the hold expires.")
@@ -421,8 +470,16 @@ def customer_reserve_and_pay() -> None:
     cust_phone = input("Your phone (optional): ").strip() or None
     customer = get_or_create_customer(cust_name, cust_email, cust_phone)
 
-    # Convert held EventSeat IDs into tickets
-    tickets = purchase_event_seats(event_id, held_eventseat_ids, customer.id)
+    # Convert held EventSeat IDs into tickets; on a database error the same order key is retried
+    while True:
+        try:
+            tickets = purchase_event_seats(event_id, held_eventseat_ids, customer.id, idempotency_key=order_key)
+            break
+        except OperationalError as exc:
+            print(f"Could not confirm the order right now ({type(exc).__name__}).")
+            if input_nonempty("Retry? (yes/no): ").strip().lower() not in ("y", "yes"):
+                print("Order not confirmed. Holds will expire automatically.")
+                return
     if not tickets:
         print("Payment confirmed, but could not finalize tickets (holds may have expired).")
         return
@@ -440,10 +497,16 @@ def customer_reserve_and_pay() -> None:
 
 
 def customer_list_my_bookings() -> None:
+    from sqlalchemy import select
+    from db import get_session
+    from models.customer import Customer
+    from models.event import Event
+    from models.event_seat import EventSeat
+    from models.ticket import Ticket
+    from services.seat_service import seat_label
+
     email = input_nonempty("Enter your email to view bookings: ").strip().lower()
     with get_session() as session:
-        from models.customer import Customer
-        from models.ticket import Ticket
         cust = session.scalar(select(Customer).where(Customer.email == email))
         if not cust:
             print("No customer found for that email.")
@@ -464,7 +527,7 @@ def customer_list_my_bookings() -> None:
             seat = es.seat if hasattr(es, "seat") else None
             if seat is None:
                 seat = session.get(type(es).seat.property.mapper.class_, es.seat_id)  # fallback
-            label = f"{seat.row}{seat.number}" if seat else f"seat#{es.seat_id}"
+            label = seat_label(seat.section, seat.row, seat.number) if seat else f"seat#{es.seat_id}"
             when = ticket.purchased_at.isoformat()
             price = ticket.price_ksh
             ename = ev.name if ev else f"Event {es.event_id}"
@@ -474,6 +537,11 @@ def customer_list_my_bookings() -> None:
 # ---------- Main ----------
 
 def main() -> None:
+    with profiling.profile("cli_menu"):
+        _main_loop()
+
+
+def _main_loop() -> None:
     while True:
         print("\nMain Menu")
         print("1) Admin")
@@ -491,4 +559,8 @@ def main() -> None:
             print("Invalid choice.")
 
 if __name__ == "__main__":
+    # With arguments, run one non-interactive command instead (see scripts/cli_commands.py)
+    if len(sys.argv) > 1:
+        from scripts.cli_commands import main as run_command
+        sys.exit(run_command(sys.argv[1:]))
     main()
\ No newline at end of file
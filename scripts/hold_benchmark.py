@@ -0,0 +1,89 @@
+"""
+Benchmark: row-at-a-time ORM hold vs set-based UPDATE ... RETURNING hold.
+
+- Ensures a benchmark venue with 1,000 seats and an event seeded with them.
+- Holds 10, 100 and 1,000 seats per request through both paths.
+- Every attempt runs in its own transaction and is rolled back, so inventory stays AVAILABLE.
+
+Run from project root:
+  python -m scripts.hold_benchmark [--repeat 20]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import select
+
+import models  # noqa: F401  register mappers
+
+from db import SessionLocal
+from models.event_seat import EventSeat
+from services.venue_services import get_or_create_venue
+from services.seat_service import ensure_grid
+from services.event_service import get_or_create_event
+from services.eventseat_setup_service import seed_event_seats
+from services.eventseat_service import _hold_rows, _hold_rows_orm
+
+VENUE_NAME = "Hold Benchmark Arena"
+EVENT_NAME = "Hold Benchmark Night"
+SIZES = (10, 100, 1000)
+
+
+def _setup() -> tuple[int, list[int]]:
+    venue = get_or_create_venue(VENUE_NAME, address="benchmark")
+    rows = [f"R{i:02d}" for i in range(1, 41)]
+    ensure_grid(venue.id, rows, range(1, 26))  # 40 x 25 = 1,000 seats
+    event = get_or_create_event(venue.id, EVENT_NAME, datetime.now(tz=timezone.utc) + timedelta(days=30))
+    seed_event_seats(event.id, venue.id, 1500, only_missing=True)
+
+    with SessionLocal() as session:
+        seat_ids = session.scalars(
+            select(EventSeat.seat_id).where(EventSeat.event_id == event.id).order_by(EventSeat.seat_id)
+        ).all()
+    return event.id, list(seat_ids)
+
+
+def _time_path(fn, event_id: int, seat_ids: list[int], repeat: int) -> tuple[float, int]:
+    """Return (median ms, seats held) for `repeat` rolled-back hold attempts."""
+    hold_until = datetime.now(tz=timezone.utc) + timedelta(minutes=10)
+    samples: list[float] = []
+    held = 0
+    for _ in range(repeat):
+        session = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            held = len(fn(session, event_id, seat_ids, hold_until))
+            samples.append((time.perf_counter() - t0) * 1000.0)
+        finally:
+            session.rollback()
+            session.close()
+    return statistics.median(samples), held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="attempts per path and size")
+    args = parser.parse_args()
+
+    event_id, all_seat_ids = _setup()
+    print(f"Event {event_id}: {len(all_seat_ids)} seats, {args.repeat} attempts per cell (median ms)")
+    print(f"{'seats':>6} {'orm ms':>10} {'set ms':>10} {'speedup':>8}")
+    for size in SIZES:
+        seat_ids = all_seat_ids[:size]
+        orm_ms, orm_held = _time_path(_hold_rows_orm, event_id, seat_ids, args.repeat)
+        set_ms, set_held = _time_path(_hold_rows, event_id, seat_ids, args.repeat)
+        if orm_held != set_held:
+            print(f"  ! paths disagree at {size}: orm held {orm_held}, set held {set_held}")
+        speedup = orm_ms / set_ms if set_ms else float("inf")
+        print(f"{size:>6} {orm_ms:>10.2f} {set_ms:>10.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Import a venue seat map from a CSV or JSON-lines layout file.
+
+- CSV header: section,row,number (one seat per line) or section,row,seats (one row per line).
+- JSON lines: {"section": "North", "row": "A", "seats": 30} or {"row": "A", "number": 7}.
+- section is optional. The file is streamed and inserted in bounded batches; seats that
+  already exist are skipped, so an interrupted import can be re-run.
+
+Run from project root:
+  python -m scripts.import_seat_map "Nyayo National Stadium" layouts/nyayo.csv [--batch-size 5000]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+
+import models  # noqa: F401  register mappers
+
+from services.venue_services import get_or_create_venue
+from services.venue_layout_service import (
+    DEFAULT_BATCH_SIZE,
+    ImportReport,
+    import_layout_seats,
+    iter_layout_file,
+)
+
+
+def _print_progress(report: ImportReport) -> None:
+    print(
+        f"  {report.read:>9,} read  {report.created:>9,} created  "
+        f"{report.seconds:>7.1f}s  {report.rows_per_second:>9,.0f} rows/s",
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("venue", help="venue name (created if missing)")
+    parser.add_argument("path", help="layout file (.csv or .jsonl)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="override format detection")
+    parser.add_argument("--address", help="address for a newly created venue")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    venue = get_or_create_venue(args.venue, address=args.address)
+    print(f"Importing {args.path} into venue {venue.id}: {venue.name}")
+    report = import_layout_seats(
+        venue.id,
+        iter_layout_file(args.path, args.format),
+        batch_size=args.batch_size,
+        progress=_print_progress,
+    )
+    print(
+        f"Done: {report.read:,} seats read, {report.created:,} created, "
+        f"{report.rows_per_second:,.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+"""
+Load generator: N simulated buyers competing for one event's seats (an on-sale).
+
+- Creates a fresh event with --seats seats (venue "Load Test Arena", 50 seats a row),
+  deleted afterwards unless --keep.
+- Each buyer makes up to --attempts orders: pick --seats-per-order seats (--strategy),
+  hold_event_seats, think (exponential, mean --think-ms: the payment), then
+  finalize_held_seats (--checkout finalize) or purchase_event_seats (--checkout purchase).
+  A buyer gives up after --give-up holds in a row that got no seat.
+- Buyers run as threads, processes or asyncio tasks (--mode); asyncio uses the
+  async services on the async engine. Processes are spawned, each with its own pool.
+- Strategies: random   any seats, uniformly
+              hotspot  80% of buyers want the front tenth of the house (high contention)
+              browse   read the first page of available seats, pick from it (a fresh,
+                       shared view: buyers race for the same seats)
+- Reports throughput, p50/p95/p99 latency of hold, checkout and order (hold + checkout,
+  think excluded), the hold conflict rate, time spent waiting for a pooled connection,
+  errors by type, and an oversell check of the database afterwards (exit 1 if it fails).
+  --json prints the report as one JSON object, to keep and compare between changes.
+
+Pool size comes from SQL_POOL_SIZE / SQL_MAX_OVERFLOW: size it to the buyer count, or
+read the pool wait line as the cost of not doing so.
+SQLite stand-in: DATABASE_URL=sqlite:///load.db (a file, not :memory:); tables are
+created if missing. SQLite serializes writers, so compare runs against the same backend.
+
+Run from project root:
+  python -m scripts.onsale_load [--buyers 32] [--mode threads|processes|asyncio]
+      [--strategy random|hotspot|browse] [--seats 2000] [--seats-per-order 2]
+      [--think-ms 200] [--checkout finalize|purchase] [--json]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import distinct, func, select
+
+import models  # noqa: F401  register mappers
+
+from db import create_all, get_engine, get_session
+from models.event_seat import EventSeat
+from models.ticket import Ticket
+from services.booking import finalize_held_seats, purchase_event_seats
+from services.customer_service import get_or_create_customer
+from services.event_service import delete_event, get_or_create_event
+from services.eventseat_service import get_inventory_page, hold_event_seats
+from services.eventseat_setup_service import bulk_seed_event_seats
+from services.inventory_stats import reconcile_inventory_stats
+from services.seat_service import ensure_grid
+from services.venue_services import get_or_create_venue
+
+VENUE_NAME = "Load Test Arena"
+SEATS_PER_ROW = 50
+STRATEGIES = ("random", "hotspot", "browse")
+# hotspot: share of buyers after the front seats, and how much of the house counts as front
+HOT_BUYERS = 0.8
+HOT_FRACTION = 0.1
+# browse: available seats read per look
+BROWSE_PAGE = 50
+
+
+@dataclass
+class LoadConfig:
+    event_id: int
+    seat_ids: List[int]
+    customer_ids: List[int]  # one customer per buyer
+    strategy: str = "random"
+    seats_per_order: int = 2
+    attempts: int = 10
+    give_up: int = 5
+    think_ms: float = 200.0
+    checkout: str = "finalize"
+    hold_minutes: int = 10
+    seed: int = 0
+
+
+@dataclass
+class BuyerStats:
+    orders: int = 0
+    tickets: int = 0
+    holds: int = 0
+    holds_full: int = 0
+    holds_partial: int = 0
+    holds_empty: int = 0
+    seats_requested: int = 0
+    seats_held: int = 0
+    checkout_lost: int = 0  # held seats that did not sell at checkout (hold lapsed, raced)
+    errors: Counter = field(default_factory=Counter)
+    hold_ms: List[float] = field(default_factory=list)
+    checkout_ms: List[float] = field(default_factory=list)
+    order_ms: List[float] = field(default_factory=list)
+    pool_wait_ms: List[float] = field(default_factory=list)
+
+    def merge(self, other: "BuyerStats") -> None:
+        for name, value in vars(other).items():
+            mine = getattr(self, name)
+            if isinstance(value, list):
+                mine.extend(value)
+            elif isinstance(value, Counter):
+                mine.update(value)
+            else:
+                setattr(self, name, mine + value)
+
+
+def _time_pool_waits(pool: Any, sink: List[float]) -> None:
+    """Record how long each connection checkout waits on the pool (new connections included).
+
+    Wraps the pool's internal _do_get: SQLAlchemy has no event for the start of a checkout.
+    """
+    do_get = pool._do_get
+
+    def timed():
+        t0 = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            sink.append((time.perf_counter() - t0) * 1000.0)
+
+    pool._do_get = timed
+
+
+# ---------- Seat picking ----------
+
+def _pick(cfg: LoadConfig, rng: random.Random, hot: bool, browse: Optional[List[int]]) -> List[int]:
+    k = cfg.seats_per_order
+    if cfg.strategy == "browse":
+        pool = browse or []
+    elif cfg.strategy == "hotspot" and hot:
+        pool = cfg.seat_ids[:max(k, int(len(cfg.seat_ids) * HOT_FRACTION))]
+    else:
+        pool = cfg.seat_ids
+    return rng.sample(pool, min(k, len(pool)))
+
+
+def _record_hold(stats: BuyerStats, requested: int, held: int) -> None:
+    stats.holds += 1
+    stats.seats_requested += requested
+    stats.seats_held += held
+    if held == 0:
+        stats.holds_empty += 1
+    elif held < requested:
+        stats.holds_partial += 1
+    else:
+        stats.holds_full += 1
+
+
+def _record_checkout(stats: BuyerStats, held: int, sold: int) -> None:
+    stats.tickets += sold
+    stats.checkout_lost += held - sold
+    if sold:
+        stats.orders += 1
+
+
+# ---------- Buyers ----------
+
+def run_buyer(cfg: LoadConfig, buyer_no: int, pool_waits: Optional[List[float]] = None) -> BuyerStats:
+    """One buyer on the sync services (a thread, or the body of a spawned process)."""
+    stats = BuyerStats()
+    rng = random.Random(cfg.seed * 100003 + buyer_no)
+    hot = rng.random() < HOT_BUYERS
+    checkout: Callable = finalize_held_seats if cfg.checkout == "finalize" else purchase_event_seats
+    customer_id = cfg.customer_ids[buyer_no]
+
+    empty_in_a_row = 0
+    for _ in range(cfg.attempts):
+        if empty_in_a_row >= cfg.give_up:
+            break
+        try:
+            browse = None
+            if cfg.strategy == "browse":
+                browse = [r.seat_id for r in get_inventory_page(cfg.event_id, limit=BROWSE_PAGE).rows]
+            wanted = _pick(cfg, rng, hot, browse)
+            if not wanted:
+                break  # nothing left to see
+            t0 = time.perf_counter()
+            held = hold_event_seats(cfg.event_id, wanted, minutes=cfg.hold_minutes)
+            hold_ms = (time.perf_counter() - t0) * 1000.0
+            stats.hold_ms.append(hold_ms)
+            _record_hold(stats, len(wanted), len(held))
+            if not held:
+                empty_in_a_row += 1
+                continue
+            empty_in_a_row = 0
+            if cfg.think_ms > 0:
+                time.sleep(rng.expovariate(1000.0 / cfg.think_ms))
+            t0 = time.perf_counter()
+            tickets = checkout(cfg.event_id, held, customer_id)
+            checkout_ms = (time.perf_counter() - t0) * 1000.0
+            stats.checkout_ms.append(checkout_ms)
+            stats.order_ms.append(hold_ms + checkout_ms)
+            _record_checkout(stats, len(held), len(tickets))
+        except Exception as exc:  # a failed call is a data point, not the end of the run
+            stats.errors[type(exc).__name__] += 1
+    if pool_waits is not None:
+        stats.pool_wait_ms.extend(pool_waits)
+    return stats
+
+
+def _process_buyer(cfg: LoadConfig, buyer_no: int) -> BuyerStats:
+    # fresh interpreter: its own engine and pool, its own pool-wait samples
+    waits: List[float] = []
+    _time_pool_waits(get_engine().pool, waits)
+    return run_buyer(cfg, buyer_no, waits)
+
+
+async def run_buyer_async(cfg: LoadConfig, buyer_no: int) -> BuyerStats:
+    """One buyer as an asyncio task on the async services."""
+    from services.async_services import (
+        finalize_held_seats_async,
+        get_inventory_page_async,
+        hold_event_seats_async,
+        purchase_event_seats_async,
+    )
+
+    stats = BuyerStats()
+    rng = random.Random(cfg.seed * 100003 + buyer_no)
+    hot = rng.random() < HOT_BUYERS
+    checkout = finalize_held_seats_async if cfg.checkout == "finalize" else purchase_event_seats_async
+    customer_id = cfg.customer_ids[buyer_no]
+
+    empty_in_a_row = 0
+    for _ in range(cfg.attempts):
+        if empty_in_a_row >= cfg.give_up:
+            break
+        try:
+            browse = None
+            if cfg.strategy == "browse":
+                browse = [r.seat_id for r in (await get_inventory_page_async(cfg.event_id, limit=BROWSE_PAGE)).rows]
+            wanted = _pick(cfg, rng, hot, browse)
+            if not wanted:
+                break
+            t0 = time.perf_counter()
+            held = await hold_event_seats_async(cfg.event_id, wanted, minutes=cfg.hold_minutes)
+            hold_ms = (time.perf_counter() - t0) * 1000.0
+            stats.hold_ms.append(hold_ms)
+            _record_hold(stats, len(wanted), len(held))
+            if not held:
+                empty_in_a_row += 1
+                continue
+            empty_in_a_row = 0
+            if cfg.think_ms > 0:
+                await asyncio.sleep(rng.expovariate(1000.0 / cfg.think_ms))
+            t0 = time.perf_counter()
+            tickets = await checkout(cfg.event_id, held, customer_id)
+            checkout_ms = (time.perf_counter() - t0) * 1000.0
+            stats.checkout_ms.append(checkout_ms)
+            stats.order_ms.append(hold_ms + checkout_ms)
+            _record_checkout(stats, len(held), len(tickets))
+        except Exception as exc:
+            stats.errors[type(exc).__name__] += 1
+    return stats
+
+
+# ---------- Runners ----------
+
+def run_threads(cfg: LoadConfig, buyers: int) -> BuyerStats:
+    waits: List[float] = []
+    _time_pool_waits(get_engine().pool, waits)
+    total = BuyerStats()
+    with ThreadPoolExecutor(max_workers=buyers) as pool:
+        for stats in pool.map(lambda n: run_buyer(cfg, n), range(buyers)):
+            total.merge(stats)
+    total.pool_wait_ms.extend(waits)
+    return total
+
+
+def run_processes(cfg: LoadConfig, buyers: int) -> BuyerStats:
+    total = BuyerStats()
+    ctx = multiprocessing.get_context("spawn")  # no inherited engine or pooled sockets
+    with ProcessPoolExecutor(max_workers=buyers, mp_context=ctx) as pool:
+        for stats in pool.map(_process_buyer, [cfg] * buyers, range(buyers)):
+            total.merge(stats)
+    return total
+
+
+async def run_asyncio(cfg: LoadConfig, buyers: int) -> BuyerStats:
+    from db.async_session import dispose_async_engine, get_async_engine
+
+    waits: List[float] = []
+    _time_pool_waits(get_async_engine().sync_engine.pool, waits)
+    total = BuyerStats()
+    try:
+        for stats in await asyncio.gather(*(run_buyer_async(cfg, n) for n in range(buyers))):
+            total.merge(stats)
+    finally:
+        await dispose_async_engine()
+    total.pool_wait_ms.extend(waits)
+    return total
+
+
+# ---------- Setup / checks / report ----------
+
+def setup_event(seats: int, price: int) -> tuple[int, List[int]]:
+    if get_engine().dialect.name == "sqlite":
+        create_all()  # stand-in database: make sure the tables exist
+    venue = get_or_create_venue(VENUE_NAME, address="load test")
+    rows = [f"R{i:03d}" for i in range(1, math.ceil(seats / SEATS_PER_ROW) + 1)]
+    ensure_grid(venue.id, rows, range(1, SEATS_PER_ROW + 1))
+    start_at = datetime.now(tz=timezone.utc) + timedelta(days=30)
+    event = get_or_create_event(venue.id, f"On-sale load {time.time_ns()}", start_at)
+    bulk_seed_event_seats(event.id, venue.id, price, seat_limit=seats)
+    with get_session() as session:
+        seat_ids = session.scalars(
+            select(EventSeat.seat_id).where(EventSeat.event_id == event.id).order_by(EventSeat.seat_id)
+        ).all()
+    return event.id, list(seat_ids)
+
+
+def setup_buyers(buyers: int) -> List[int]:
+    """One customer per buyer (reused across runs), created before the clock starts."""
+    return [get_or_create_customer(f"Load buyer {n}", f"buyer{n}@load.test").id for n in range(buyers)]
+
+
+def check_oversell(event_id: int, tickets_reported: int) -> Dict[str, Any]:
+    """Cross-check the event's seats and tickets after the run; `ok` is False on any oversell sign."""
+    with get_session() as session:
+        sold = session.scalar(
+            select(func.count()).select_from(EventSeat).where(EventSeat.event_id == event_id, EventSeat.status == "SOLD")
+        )
+        tickets, ticketed_seats = session.execute(
+            select(func.count(Ticket.id), func.count(distinct(Ticket.event_seat_id)))
+            .join(EventSeat, EventSeat.id == Ticket.event_seat_id)
+            .where(EventSeat.event_id == event_id)
+        ).one()
+        unsold_ticketed = session.scalar(
+            select(func.count(Ticket.id))
+            .join(EventSeat, EventSeat.id == Ticket.event_seat_id)
+            .where(EventSeat.event_id == event_id, EventSeat.status != "SOLD")
+        )
+    drift = reconcile_inventory_stats([event_id], dry_run=True)
+    report = {
+        "sold_seats": sold,
+        "tickets": tickets,
+        "tickets_reported": tickets_reported,
+        "duplicate_tickets": tickets - ticketed_seats,
+        "tickets_on_unsold_seats": unsold_ticketed,
+        "sold_without_ticket": sold - ticketed_seats + unsold_ticketed,
+        "counter_drift": len(drift),
+    }
+    report["ok"] = (
+        report["duplicate_tickets"] == 0
+        and unsold_ticketed == 0
+        and report["sold_without_ticket"] == 0
+        and tickets == tickets_reported
+        and not drift
+    )
+    return report
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    xs = sorted(samples)
+
+    def rank(p: float) -> float:  # nearest rank
+        return xs[max(0, math.ceil(p / 100.0 * len(xs)) - 1)]
+
+    return {"n": len(xs), "p50": round(rank(50), 3), "p95": round(rank(95), 3), "p99": round(rank(99), 3), "max": round(xs[-1], 3)}
+
+
+def build_report(args: argparse.Namespace, stats: BuyerStats, seconds: float, oversell: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "backend": get_engine().dialect.name,
+        "mode": args.mode,
+        "buyers": args.buyers,
+        "strategy": args.strategy,
+        "checkout": args.checkout,
+        "seats": args.seats,
+        "seats_per_order": args.seats_per_order,
+        "think_ms": args.think_ms,
+        "seconds": round(seconds, 3),
+        "orders": stats.orders,
+        "tickets": stats.tickets,
+        "orders_per_second": round(stats.orders / seconds, 2) if seconds else 0.0,
+        "tickets_per_second": round(stats.tickets / seconds, 2) if seconds else 0.0,
+        "holds": stats.holds,
+        "holds_full": stats.holds_full,
+        "holds_partial": stats.holds_partial,
+        "holds_empty": stats.holds_empty,
+        # share of hold attempts that lost at least one seat to another buyer
+        "hold_conflict_rate": round((stats.holds_partial + stats.holds_empty) / stats.holds, 4) if stats.holds else 0.0,
+        "seat_conflict_rate": round(1 - stats.seats_held / stats.seats_requested, 4) if stats.seats_requested else 0.0,
+        "checkout_lost": stats.checkout_lost,
+        "errors": dict(stats.errors),
+        "latency_ms": {
+            "hold": _percentiles(stats.hold_ms),
+            "checkout": _percentiles(stats.checkout_ms),
+            "order": _percentiles(stats.order_ms),
+            "pool_wait": _percentiles(stats.pool_wait_ms),
+        },
+        "pool_wait_total_ms": round(sum(stats.pool_wait_ms), 3),
+        "oversell": oversell,
+    }
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    print(
+        f"{r['backend']}: {r['buyers']} buyers ({r['mode']}), strategy {r['strategy']}, "
+        f"{r['seats_per_order']} seats/order, checkout {r['checkout']}, think {r['think_ms']:.0f} ms"
+    )
+    print(
+        f"{r['seconds']:.2f} s: {r['orders']} orders, {r['tickets']} tickets of {r['seats']} "
+        f"({r['orders_per_second']:,.1f} orders/s, {r['tickets_per_second']:,.1f} tickets/s)"
+    )
+    print(
+        f"holds: {r['holds']} ({r['holds_full']} full, {r['holds_partial']} partial, {r['holds_empty']} empty), "
+        f"conflict rate {r['hold_conflict_rate']:.1%} of holds, {r['seat_conflict_rate']:.1%} of seats; "
+        f"{r['checkout_lost']} held seats lost at checkout"
+    )
+    print(f"{'latency ms':<12} {'n':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, p in r["latency_ms"].items():
+        print(f"{name:<12} {p['n']:>7} {p['p50']:>9.2f} {p['p95']:>9.2f} {p['p99']:>9.2f} {p['max']:>9.2f}")
+    print(f"pool wait total: {r['pool_wait_total_ms'] / 1000.0:.3f} s")
+    if r["errors"]:
+        print("errors: " + ", ".join(f"{name} x{n}" for name, n in sorted(r["errors"].items())))
+    o = r["oversell"]
+    print(
+        f"oversell check: {o['sold_seats']} seats SOLD, {o['tickets']} tickets ({o['tickets_reported']} reported), "
+        f"{o['duplicate_tickets']} duplicate, {o['tickets_on_unsold_seats']} on unsold seats, "
+        f"{o['sold_without_ticket']} sold without ticket, {o['counter_drift']} counter drift -> "
+        f"{'OK' if o['ok'] else 'FAILED'}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=32, help="concurrent simulated buyers")
+    parser.add_argument("--mode", choices=("threads", "processes", "asyncio"), default="threads")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="random", help="how buyers pick seats")
+    parser.add_argument("--seats", type=int, default=2000, help="seats on sale")
+    parser.add_argument("--seats-per-order", type=int, default=2)
+    parser.add_argument("--attempts", type=int, default=10, help="orders each buyer tries")
+    parser.add_argument("--give-up", type=int, default=5, help="empty holds in a row before a buyer leaves")
+    parser.add_argument("--think-ms", type=float, default=200.0, help="mean pause between hold and checkout")
+    parser.add_argument("--checkout", choices=("finalize", "purchase"), default="finalize")
+    parser.add_argument("--price", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=0, help="random seed (same seed, same picks)")
+    parser.add_argument("--keep", action="store_true", help="keep the load-test event afterwards")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    event_id, seat_ids = setup_event(args.seats, args.price)
+    cfg = LoadConfig(
+        event_id=event_id,
+        seat_ids=seat_ids,
+        customer_ids=setup_buyers(args.buyers),
+        strategy=args.strategy,
+        seats_per_order=args.seats_per_order,
+        attempts=args.attempts,
+        give_up=args.give_up,
+        think_ms=args.think_ms,
+        checkout=args.checkout,
+        seed=args.seed,
+    )
+    try:
+        t0 = time.perf_counter()
+        if args.mode == "threads":
+            stats = run_threads(cfg, args.buyers)
+        elif args.mode == "processes":
+            stats = run_processes(cfg, args.buyers)
+        else:
+            stats = asyncio.run(run_asyncio(cfg, args.buyers))
+        seconds = time.perf_counter() - t0
+        report = build_report(args, stats, seconds, check_oversell(event_id, stats.tickets))
+    finally:
+        if not args.keep:
+            delete_event(event_id)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if not report["oversell"]["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Rebuild the per-event inventory counters (event_inventory_stats) from event_seats.
+
+- Recounts AVAILABLE / HELD / SOLD seats and SOLD revenue per event in one query and
+  rewrites only the counter rows that disagree, in one transaction.
+- Prints every event whose stored counters disagreed (or were missing).
+- Use after restoring data, after manual SQL on event_seats, or once after creating the
+  table on an existing database. Drifted rows are locked before they are recounted, so
+  it is safe to run while bookings are live.
+
+Run from project root:
+  python -m scripts.reconcile_inventory_stats [--event 12 --event 13] [--dry-run]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+
+import models  # noqa: F401  register mappers
+
+from services.inventory_stats import InventoryStats, reconcile_inventory_stats
+
+
+def _fmt(stats: InventoryStats | None) -> str:
+    if stats is None:
+        return "missing"
+    return f"{stats.available}/{stats.held}/{stats.sold} KSh {stats.revenue_ksh}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--event", type=int, action="append", dest="events", help="only this event id (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without rewriting counters")
+    args = parser.parse_args()
+
+    drift = reconcile_inventory_stats(args.events, dry_run=args.dry_run)
+    if not drift:
+        print("Inventory counters match event_seats.")
+        return
+    print(f"{'event':>7}  {'stored (avail/held/sold)':<32} actual")
+    for d in drift:
+        print(f"{d.event_id:>7}  {_fmt(d.stored):<32} {_fmt(d.actual)}")
+    verb = "would be rebuilt" if args.dry_run else "rebuilt"
+    print(f"{len(drift)} event(s) {verb}.")
+
+
+if __name__ == "__main__":
+    main()
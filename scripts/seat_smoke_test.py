@@ -43,7 +43,7 @@ def main() -> None:
         rows = session.scalars(
             select(Seat)
             .where(Seat.venue_id == venue.id)
-            .order_by(Seat.row, Seat.number)
+            .order_by(Seat.section, Seat.row, Seat.number)
         ).all()
         for s in rows:
             print(f"{VENUE_NAME}: {s.row}{s.number}")
@@ -0,0 +1,60 @@
+"""
+Benchmark: ORM seeding (seed_event_seats) vs server-side INSERT ... SELECT (bulk_seed_event_seats).
+
+- Ensures a benchmark venue with --seats seats.
+- Seeds a fresh event with each path and prints rows per second.
+- Deletes the two benchmark events afterwards.
+
+Run from project root:
+  python -m scripts.seed_benchmark [--seats 60000]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import math
+import time
+from datetime import datetime, timezone, timedelta
+
+import models  # noqa: F401  register mappers
+
+from services.venue_services import get_or_create_venue
+from services.seat_service import ensure_grid
+from services.event_service import get_or_create_event, delete_event
+from services.eventseat_setup_service import seed_event_seats, bulk_seed_event_seats
+
+VENUE_NAME = "Seed Benchmark Stadium"
+SEATS_PER_ROW = 100
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seats", type=int, default=60000, help="venue capacity to seed")
+    args = parser.parse_args()
+
+    venue = get_or_create_venue(VENUE_NAME, address="benchmark")
+    rows = [f"R{i:04d}" for i in range(1, math.ceil(args.seats / SEATS_PER_ROW) + 1)]
+    ensure_grid(venue.id, rows, range(1, SEATS_PER_ROW + 1))
+    start_at = datetime.now(tz=timezone.utc) + timedelta(days=30)
+
+    orm_event = get_or_create_event(venue.id, f"Seed bench ORM {time.time_ns()}", start_at)
+    t0 = time.perf_counter()
+    orm_created = seed_event_seats(orm_event.id, venue.id, 1500, seat_limit=args.seats)
+    orm_s = time.perf_counter() - t0
+
+    bulk_event = get_or_create_event(venue.id, f"Seed bench bulk {time.time_ns()}", start_at)
+    report = bulk_seed_event_seats(bulk_event.id, venue.id, 1500, seat_limit=args.seats)
+
+    print(f"{'path':>6} {'rows':>8} {'seconds':>9} {'rows/s':>10}")
+    print(f"{'orm':>6} {orm_created:>8} {orm_s:>9.3f} {orm_created / orm_s if orm_s else 0:>10,.0f}")
+    print(f"{'bulk':>6} {report.created:>8} {report.seconds:>9.3f} {report.rows_per_second:>10,.0f}")
+
+    delete_event(orm_event.id)
+    delete_event(bulk_event.id)
+
+
+if __name__ == "__main__":
+    main()
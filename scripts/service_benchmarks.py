@@ -0,0 +1,369 @@
+"""
+Service microbenchmarks at several inventory sizes, with JSON baselines.
+
+- For each size (--sizes, default 100 10000 100000 seats) a benchmark venue is kept
+  (grid of 100-seat rows) and a fresh event is seeded; the event is deleted at the end.
+- Each benchmark times one service call per sample. Setup runs outside the clock and
+  the event's inventory is reset (all AVAILABLE, no holds or tickets) after each one.
+  Samples per benchmark: --repeat, or --heavy-repeat for the calls that write the
+  whole inventory (grid creation and seeding).
+- Reports the median and minimum milliseconds per benchmark and size.
+- --save FILE writes the results as a JSON baseline. --baseline FILE compares against
+  one and flags every median that is more than --threshold slower (default 0.20 = 20%)
+  and more than --min-delta-ms slower in absolute terms (timer noise on fast calls).
+  The exit code is 1 when anything regressed.
+  Baselines are per machine and backend: compare runs from the same environment.
+
+Run from project root:
+  python -m scripts.service_benchmarks [--sizes 100 10000] [--only hold] [--repeat 5]
+      [--save benchmarks/baseline.json | --baseline benchmarks/baseline.json [--threshold 0.2]]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import sqlalchemy
+from sqlalchemy import delete, select, update
+
+import models  # noqa: F401  register mappers
+
+from db import get_engine, get_session
+from models.customer import Customer
+from models.event_seat import EventSeat
+from models.hold import Hold
+from models.ticket import Ticket
+from models.venue import Venue
+from services import availability_map
+from services.booking import finalize_held_seats, purchase_event_seats
+from services.customer_service import get_or_create_customer
+from services.event_service import delete_event, get_or_create_event
+from services.eventseat_service import (
+    get_available_event_seats,
+    hold_event_seats,
+    release_expired_holds,
+    sell_event_seat,
+)
+from services.eventseat_setup_service import bulk_seed_event_seats, seed_event_seats
+from services.inventory_stats import rebuild_stats
+from services.seat_service import ensure_grid
+from services.venue_services import get_or_create_venue
+
+SIZES = (100, 10_000, 100_000)
+SEATS_PER_ROW = 100
+# seats per hold / purchase / finalize call, and per release sweep
+ORDER_SEATS = 10
+CUSTOMER_DOMAIN = "bench.test"
+FORMAT_VERSION = 1
+
+
+@dataclass
+class Fixture:
+    size: int
+    venue_id: int
+    event_id: int
+    seat_ids: List[int]
+    rows: List[str]
+    next_seat: int = 0
+
+    def take(self, n: int) -> List[int]:
+        """The next n seat ids; each sample works on seats no earlier sample touched."""
+        ids = self.seat_ids[self.next_seat:self.next_seat + n]
+        self.next_seat += n
+        return ids
+
+    def take_eventseats(self, n: int) -> List[int]:
+        seat_ids = self.take(n)
+        with get_session() as session:
+            return list(session.scalars(
+                select(EventSeat.id).where(EventSeat.event_id == self.event_id, EventSeat.seat_id.in_(seat_ids))
+            ))
+
+
+class Result(NamedTuple):
+    name: str
+    size: int
+    samples: List[float]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def min_ms(self) -> float:
+        return min(self.samples)
+
+
+@dataclass
+class Bench:
+    name: str
+    # (fixture) -> (timed callable, teardown or None); called once per sample, outside the clock
+    prepare: Callable[[Fixture], Any]
+    heavy: bool = False
+
+
+def _grid_rows(size: int) -> List[str]:
+    return [f"R{i:04d}" for i in range(1, math.ceil(size / SEATS_PER_ROW) + 1)]
+
+
+def _start_at() -> datetime:
+    return datetime.now(tz=timezone.utc) + timedelta(days=30)
+
+
+def _reset(event_id: int) -> None:
+    """Put every seat of the event back to AVAILABLE, drop its holds and tickets."""
+    with get_session() as session:
+        es_ids = select(EventSeat.id).where(EventSeat.event_id == event_id)
+        session.execute(delete(Ticket).where(Ticket.event_seat_id.in_(es_ids)))
+        session.execute(
+            update(EventSeat)
+            .where(EventSeat.event_id == event_id)
+            .values(status="AVAILABLE", held_until=None, hold_id=None)
+        )
+        session.execute(delete(Hold).where(Hold.event_id == event_id))
+        rebuild_stats(session, [event_id])
+    availability_map.invalidate(event_id)
+
+
+def _delete_venue(venue_id: int) -> None:
+    with get_session() as session:
+        session.execute(delete(Venue).where(Venue.id == venue_id))  # seats go with it (ON DELETE CASCADE)
+
+
+def setup_fixture(size: int) -> Fixture:
+    venue = get_or_create_venue(f"Service Bench {size}", address="benchmark")
+    rows = _grid_rows(size)
+    ensure_grid(venue.id, rows, range(1, SEATS_PER_ROW + 1))
+    event = get_or_create_event(venue.id, f"Service bench {size} {time.time_ns()}", _start_at())
+    bulk_seed_event_seats(event.id, venue.id, 1500, seat_limit=size)
+    with get_session() as session:
+        seat_ids = list(session.scalars(
+            select(EventSeat.seat_id).where(EventSeat.event_id == event.id).order_by(EventSeat.seat_id)
+        ))
+    return Fixture(size, venue.id, event.id, seat_ids, rows)
+
+
+# ---------- Benchmarks: prepare(fixture) -> (timed call, teardown) ----------
+
+def _ensure_grid_new(fx: Fixture):
+    venue = get_or_create_venue(f"Service Bench grid {fx.size} {time.time_ns()}", address="benchmark")
+    return (lambda: ensure_grid(venue.id, fx.rows, range(1, SEATS_PER_ROW + 1))), (lambda: _delete_venue(venue.id))
+
+
+def _ensure_grid_existing(fx: Fixture):
+    return (lambda: ensure_grid(fx.venue_id, fx.rows, range(1, SEATS_PER_ROW + 1))), None
+
+
+def _seed(bulk: bool):
+    def prepare(fx: Fixture):
+        event = get_or_create_event(fx.venue_id, f"Service bench seed {time.time_ns()}", _start_at())
+        seed = bulk_seed_event_seats if bulk else seed_event_seats
+        return (lambda: seed(event.id, fx.venue_id, 1500, seat_limit=fx.size)), (lambda: delete_event(event.id))
+    return prepare
+
+
+def _available_cold(fx: Fixture):
+    availability_map.invalidate(fx.event_id)  # first call rebuilds the event's map
+    return (lambda: get_available_event_seats(fx.event_id, limit=10)), None
+
+
+def _available_warm(fx: Fixture):
+    availability_map.get_availability_map(fx.event_id)
+    return (lambda: get_available_event_seats(fx.event_id, limit=10)), None
+
+
+def _hold(fx: Fixture):
+    seat_ids = fx.take(ORDER_SEATS)
+    return (lambda: hold_event_seats(fx.event_id, seat_ids, minutes=10)), None
+
+
+def _sell(fx: Fixture):
+    eventseat_id = fx.take_eventseats(1)[0]
+    return (lambda: sell_event_seat(eventseat_id)), None
+
+
+def _release(fx: Fixture):
+    # ORDER_SEATS seats under a hold that lapsed a minute ago
+    held = hold_event_seats(fx.event_id, fx.take(ORDER_SEATS), minutes=10)
+    with get_session() as session:
+        session.execute(
+            update(EventSeat)
+            .where(EventSeat.id.in_(held))
+            .values(held_until=datetime.now(tz=timezone.utc) - timedelta(minutes=1))
+        )
+    return release_expired_holds, None
+
+
+def _purchase(customer_id: int):
+    def prepare(fx: Fixture):
+        ids = fx.take_eventseats(ORDER_SEATS)
+        return (lambda: purchase_event_seats(fx.event_id, ids, customer_id)), None
+    return prepare
+
+
+def _finalize(customer_id: int):
+    def prepare(fx: Fixture):
+        held = hold_event_seats(fx.event_id, fx.take(ORDER_SEATS), minutes=10)
+        return (lambda: finalize_held_seats(fx.event_id, held, customer_id)), None
+    return prepare
+
+
+def _customer_existing(fx: Fixture):
+    return (lambda: get_or_create_customer("Bench Buyer", f"buyer@{CUSTOMER_DOMAIN}")), None
+
+
+def _customer_new(fx: Fixture):
+    email = f"new{time.time_ns()}@{CUSTOMER_DOMAIN}"
+    return (lambda: get_or_create_customer("Bench New", email)), None
+
+
+def build_benches(customer_id: int) -> List[Bench]:
+    return [
+        Bench("ensure_grid.new", _ensure_grid_new, heavy=True),
+        Bench("ensure_grid.existing", _ensure_grid_existing),
+        Bench("seed_event_seats", _seed(bulk=False), heavy=True),
+        Bench("bulk_seed_event_seats", _seed(bulk=True), heavy=True),
+        Bench("get_available_event_seats.cold", _available_cold),
+        Bench("get_available_event_seats.warm", _available_warm),
+        Bench("hold_event_seats", _hold),
+        Bench("sell_event_seat", _sell),
+        Bench("release_expired_holds", _release),
+        Bench("purchase_event_seats", _purchase(customer_id)),
+        Bench("finalize_held_seats", _finalize(customer_id)),
+        Bench("get_or_create_customer.existing", _customer_existing),
+        Bench("get_or_create_customer.new", _customer_new),
+    ]
+
+
+def run_bench(bench: Bench, fx: Fixture, repeat: int) -> Result:
+    samples: List[float] = []
+    try:
+        for _ in range(repeat):
+            call, teardown = bench.prepare(fx)
+            try:
+                t0 = time.perf_counter()
+                call()
+                samples.append((time.perf_counter() - t0) * 1000.0)
+            finally:
+                if teardown is not None:
+                    teardown()
+    finally:
+        _reset(fx.event_id)
+        fx.next_seat = 0
+    return Result(bench.name, fx.size, samples)
+
+
+# ---------- Baselines ----------
+
+def results_doc(results: List[Result], args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "created_at": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+            "backend": get_engine().dialect.name,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": platform.node(),
+            "repeat": args.repeat,
+            "heavy_repeat": args.heavy_repeat,
+        },
+        "results": {
+            r.key: {"median_ms": round(r.median_ms, 4), "min_ms": round(r.min_ms, 4), "n": len(r.samples)}
+            for r in results
+        },
+    }
+
+
+def change_vs(r: Result, baseline: Dict[str, Any]) -> Optional[float]:
+    """Relative change of the median against the baseline; None if the baseline lacks it."""
+    b = baseline.get("results", {}).get(r.key)
+    if not b or b["median_ms"] <= 0:
+        return None
+    return r.median_ms / b["median_ms"] - 1.0
+
+
+def is_regression(r: Result, baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> bool:
+    change = change_vs(r, baseline)
+    if change is None:
+        return False
+    return change > threshold and r.median_ms - baseline["results"][r.key]["median_ms"] > min_delta_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="seats per benchmark event")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument("--heavy-repeat", type=int, default=3, help="samples for grid creation and seeding")
+    parser.add_argument("--save", type=Path, help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative slowdown flagged as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark events afterwards")
+    args = parser.parse_args()
+
+    smallest = min(args.sizes)
+    if args.repeat * ORDER_SEATS > smallest:
+        parser.error(f"--repeat {args.repeat} needs {args.repeat * ORDER_SEATS} seats; the smallest size is {smallest}")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    if baseline and baseline.get("meta", {}).get("backend") != get_engine().dialect.name:
+        print(f"! baseline was recorded on {baseline['meta'].get('backend')}, this run is on {get_engine().dialect.name}")
+
+    customer_id = get_or_create_customer("Bench Buyer", f"buyer@{CUSTOMER_DOMAIN}").id
+    benches = [b for b in build_benches(customer_id) if not args.only or any(o in b.name for o in args.only)]
+
+    print(f"{'benchmark':<34} {'size':>7} {'n':>3} {'median ms':>10} {'min ms':>9} {'base ms':>9} {'change':>8}")
+    results: List[Result] = []
+    regressions = 0
+    for size in sorted(args.sizes):
+        fx = setup_fixture(size)
+        try:
+            for bench in benches:
+                r = run_bench(bench, fx, args.heavy_repeat if bench.heavy else args.repeat)
+                results.append(r)
+                line = f"{r.name:<34} {r.size:>7} {len(r.samples):>3} {r.median_ms:>10.3f} {r.min_ms:>9.3f}"
+                if baseline:
+                    change = change_vs(r, baseline)
+                    if change is None:
+                        line += f" {'-':>9} {'new':>8}"
+                    else:
+                        line += f" {baseline['results'][r.key]['median_ms']:>9.3f} {change:>+7.1%}"
+                        if is_regression(r, baseline, args.threshold, args.min_delta_ms):
+                            regressions += 1
+                            line += "  REGRESSION"
+                print(line, flush=True)
+        finally:
+            if not args.keep:
+                delete_event(fx.event_id)
+
+    with get_session() as session:
+        session.execute(delete(Customer).where(Customer.email.like(f"new%@{CUSTOMER_DOMAIN}")))
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results_doc(results, args), indent=2) + "\n")
+        print(f"\nBaseline written to {args.save}")
+    if baseline:
+        print(f"\n{regressions} regression(s) over {args.threshold:.0%} (and {args.min_delta_ms} ms).")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Startup-time check for the CLI and worker entry points.
+
+- Runs each entry point in a fresh interpreter --runs times and takes the median
+  wall time; a bare `python -c pass` is measured too, as the interpreter floor.
+- None of them should create the engine or connect: imports alone must stay cheap
+  (the engine and SessionLocal bind on first use, see db/session.py).
+- Exits 1 when an entry point's median is over its budget (milliseconds, see
+  BUDGETS_MS; --budget-ms overrides all of them), so cron and CI can gate on it.
+- --importtime N prints the N slowest modules (cumulative, from `python -X importtime`)
+  of each entry point, to find what to defer when a budget is blown.
+
+Run from project root:
+  python -m scripts.startup_budget [--runs 5] [--budget-ms 500] [--importtime 10]
+"""
+from pathlib import Path
+import sys
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import argparse
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+# name -> (interpreter arguments, stdin); the CLI menu is opened and exited straight away
+ENTRY_POINTS: Dict[str, Tuple[List[str], Optional[str]]] = {
+    "import db": (["-c", "import db"], None),
+    "import services": (["-c", "import services"], None),
+    "cli_menu": (["-m", "scripts.cli_menu"], "0\n"),
+    "worker.daemon --help": (["-m", "worker.daemon", "--help"], None),
+    "worker.reclaimer --help": (["-m", "worker.reclaimer", "--help"], None),
+}
+
+# Median wall time per entry point, milliseconds, interpreter startup included.
+BUDGETS_MS: Dict[str, float] = {
+    "import db": 500.0,
+    "import services": 700.0,
+    "cli_menu": 150.0,
+    "worker.daemon --help": 800.0,
+    "worker.reclaimer --help": 800.0,
+}
+
+
+def _run(args: List[str], stdin: Optional[str]) -> float:
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        input=stdin,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited {proc.returncode}:\n{proc.stderr.strip()}")
+    return elapsed
+
+
+def measure(args: List[str], stdin: Optional[str], runs: int) -> List[float]:
+    _run(args, stdin)  # warm the bytecode cache and the OS file cache
+    return [_run(args, stdin) for _ in range(runs)]
+
+
+def slowest_imports(args: List[str], stdin: Optional[str], top: int) -> List[Tuple[int, str]]:
+    """(cumulative microseconds, module) for the `top` slowest imports of one entry point."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        input=stdin,
+        capture_output=True,
+        text=True,
+    )
+    rows: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per entry point")
+    parser.add_argument("--budget-ms", type=float, help="one budget for every entry point")
+    parser.add_argument("--only", action="append", choices=sorted(ENTRY_POINTS), help="entry point to check (repeatable)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="show the N slowest imports per entry point")
+    args = parser.parse_args()
+
+    floor = statistics.median(measure(["-c", "pass"], None, args.runs))
+    print(f"interpreter startup: {floor:.0f} ms (median of {args.runs})")
+    print(f"{'entry point':<26} {'median ms':>10} {'min ms':>8} {'budget':>8}  status")
+
+    over = 0
+    for name in args.only or ENTRY_POINTS:
+        argv, stdin = ENTRY_POINTS[name]
+        times = measure(argv, stdin, args.runs)
+        median = statistics.median(times)
+        budget = args.budget_ms if args.budget_ms is not None else BUDGETS_MS[name]
+        ok = median <= budget
+        over += not ok
+        print(f"{name:<26} {median:>10.0f} {min(times):>8.0f} {budget:>8.0f}  {'ok' if ok else 'OVER BUDGET'}")
+        if args.importtime:
+            for us, module in slowest_imports(argv, stdin, args.importtime):
+                print(f"    {us / 1000.0:>8.1f} ms  {module.strip()}")
+
+    if over:
+        print(f"\n{over} entry point(s) over budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,32 +5,50 @@ Re-export common service functions for convenience. Avoid importing models here.
 
 from .venue_services import get_or_create_venue, list_venues
 from .seat_service import ensure_grid, list_seats_for_venue
+from .venue_layout_service import SectionLayout, build_venue_layout
 from .event_service import (
 	get_or_create_event,
 	list_events_for_venue,
 	list_all_events,
 	delete_event,
 )
-from .eventseat_setup_service import seed_event_seats
+from .eventseat_setup_service import (
+	seed_event_seats,
+	bulk_seed_event_seats,
+	clone_event,
+	clone_event_run,
+)
 from .eventseat_service import (
 	get_available_event_seats,
 	hold_event_seats,
 	sell_event_seat,
 	release_expired_holds,
 )
+from .hold_service import place_hold, finalize_hold, extend_hold, cancel_hold
+from .seat_allocator import allocate_best_available
 
 __all__ = [
 	"get_or_create_venue",
 	"list_venues",
 	"ensure_grid",
 	"list_seats_for_venue",
+	"SectionLayout",
+	"build_venue_layout",
 	"get_or_create_event",
 	"list_events_for_venue",
 	"list_all_events",
 	"delete_event",
 	"seed_event_seats",
+	"bulk_seed_event_seats",
+	"clone_event",
+	"clone_event_run",
 	"get_available_event_seats",
 	"hold_event_seats",
 	"sell_event_seat",
 	"release_expired_holds",
+	"place_hold",
+	"finalize_hold",
+	"extend_hold",
+	"cancel_hold",
+	"allocate_best_available",
 ]
\ No newline at end of file
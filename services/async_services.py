@@ -0,0 +1,150 @@
+"""
+Asyncio versions of the hot booking paths, on the async engine (db/async_session.py).
+
+Each function opens an AsyncSession and runs the same transaction body as its sync
+twin through AsyncSession.run_sync: the statement builders and helpers in
+eventseat_service / hold_service / booking are shared, only the I/O is awaited.
+Post-commit availability map updates are identical, so sync and async callers in
+one process see the same maps.
+
+    receipt = await place_hold_async(event_id, seat_ids, minutes=10)
+    result = await finalize_hold_async(receipt.token, customer_id)
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db.async_session import get_async_session
+from models.event_seat import EventSeat
+from models.ticket import Ticket
+from services import availability_map
+from services.booking import FinalizeResult, _purchase_tx, _try_finalize_tx
+from services.eventseat_service import (
+    InventoryPage,
+    InventoryRow,
+    _available_seats_query,
+    _inventory_page,
+    _inventory_page_query,
+)
+from services.hold_service import HoldReceipt, _finalize_hold_tx, _place_hold_tx
+
+
+async def place_hold_async(
+    event_id: int,
+    seat_ids: Iterable[int],
+    minutes: int = 15,
+    owner: Optional[str] = None,
+) -> Optional[HoldReceipt]:
+    """Async place_hold: hold seats (by seat_id) under a new Hold. None if none could be held."""
+    if minutes <= 0:
+        minutes = 15
+    expires_at = datetime.now(tz=timezone.utc) + timedelta(minutes=minutes)
+    ids = list(seat_ids)
+    if not ids:
+        return None
+    async with get_async_session() as session:
+        receipt = await session.run_sync(_place_hold_tx, event_id, ids, expires_at, owner)
+    if receipt is not None:
+        availability_map.mark_eventseats(event_id, receipt.eventseat_ids, "HELD", held_until=expires_at)
+    return receipt
+
+
+async def hold_event_seats_async(event_id: int, seat_ids: Iterable[int], minutes: int = 15) -> List[int]:
+    """Async hold_event_seats: returns the held EventSeat ids."""
+    receipt = await place_hold_async(event_id, seat_ids, minutes=minutes)
+    return receipt.eventseat_ids if receipt else []
+
+
+async def finalize_hold_async(
+    token: str,
+    customer_id: int,
+    idempotency_key: Optional[str] = None,
+) -> FinalizeResult:
+    """Async finalize_hold: sell every seat still held by the token's hold."""
+    now = datetime.now(tz=timezone.utc)
+    async with get_async_session() as session:
+        event_id, result = await session.run_sync(_finalize_hold_tx, token, customer_id, now, idempotency_key)
+    if event_id is not None:
+        availability_map.mark_eventseats(event_id, [t.event_seat_id for t, _ in result.tickets], "SOLD")
+    return result
+
+
+async def try_finalize_held_seats_async(
+    event_id: int,
+    eventseat_ids: Iterable[int],
+    customer_id: int,
+    idempotency_key: Optional[str] = None,
+) -> FinalizeResult:
+    """Async try_finalize_held_seats: versioned finalize with per-seat conflicts."""
+    now = datetime.now(tz=timezone.utc)
+    ids = list(dict.fromkeys(int(i) for i in eventseat_ids))
+    if not ids:
+        return FinalizeResult()
+    async with get_async_session() as session:
+        result = await session.run_sync(_try_finalize_tx, event_id, ids, customer_id, now, idempotency_key)
+    availability_map.mark_eventseats(event_id, [t.event_seat_id for t, _ in result.tickets], "SOLD")
+    return result
+
+
+async def finalize_held_seats_async(
+    event_id: int,
+    eventseat_ids: Iterable[int],
+    customer_id: int,
+    idempotency_key: Optional[str] = None,
+) -> List[Tuple[Ticket, str]]:
+    """Async finalize_held_seats: returns (Ticket, seat_label) for the seats sold."""
+    return (await try_finalize_held_seats_async(event_id, eventseat_ids, customer_id, idempotency_key)).tickets
+
+
+async def purchase_event_seats_async(
+    event_id: int,
+    eventseat_ids: Iterable[int],
+    customer_id: int,
+    idempotency_key: Optional[str] = None,
+) -> List[Tuple[Ticket, str]]:
+    """Async purchase_event_seats: sell available or held seats and create tickets."""
+    now = datetime.now(tz=timezone.utc)
+    ids = list(dict.fromkeys(int(i) for i in eventseat_ids))
+    if not ids:
+        return []
+    async with get_async_session() as session:
+        created = await session.run_sync(_purchase_tx, event_id, ids, customer_id, now, idempotency_key)
+    availability_map.mark_eventseats(event_id, [t.event_seat_id for t, _ in created], "SOLD")
+    return created
+
+
+async def get_available_event_seats_async(event_id: int, limit: int = 10) -> List[EventSeat]:
+    """Async get_available_event_seats: ids suggested by the availability map, re-checked in SQL."""
+    now = datetime.now(tz=timezone.utc)
+    amap = await availability_map.get_availability_map_async(event_id)
+    ids = amap.available_eventseat_ids(limit)
+    async with get_async_session() as session:
+        rows = list((await session.scalars(_available_seats_query(event_id, now, limit, ids))).all()) if ids else []
+        if len(rows) < len(ids):
+            availability_map.invalidate(event_id)
+            rows = list((await session.scalars(_available_seats_query(event_id, now, limit))).all())
+        return rows
+
+
+async def get_inventory_page_async(
+    event_id: int,
+    after_seat_id: Optional[int] = None,
+    limit: int = 100,
+    row: Optional[str] = None,
+    section: Optional[str] = None,
+) -> InventoryPage:
+    """Async get_inventory_page: one keyset page of available seats."""
+    q = _inventory_page_query(event_id, after_seat_id, limit, row, section)
+    async with get_async_session() as session:
+        rows = [InventoryRow(*r) for r in await session.execute(q)]
+    return _inventory_page(rows, limit)
+
+
+async def availability_counts_async(event_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """Async availability_counts: {event_id: (available, total)} from the availability maps."""
+    out: Dict[int, Tuple[int, int]] = {}
+    for eid in event_ids:
+        amap = await availability_map.get_availability_map_async(eid)
+        out[eid] = (amap.available_count(), len(amap))
+    return out
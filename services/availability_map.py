@@ -0,0 +1,252 @@
+"""
+In-process, array-backed seat availability map per event.
+
+- One byte of state per seat (AVAILABLE / HELD / SOLD), indexed by seat position.
+  Positions follow seat_id order, the same order the availability views use.
+- HELD seats also keep their held_until (epoch seconds) in a small side table, so a
+  lapsed hold reads as available, matching eventseat_service.available_clause.
+- Built once per event from event_seats as plain tuples (no ORM objects), then kept
+  current incrementally by the hold / sell / release / booking services.
+- The map is a hint: readers pick candidate ids from it and the database re-checks
+  availability (eventseat_service.get_available_event_seats).
+- A fingerprint (row count, max id, sum of EventSeat.version) is compared with the
+  database every FRESHNESS_CHECK_SECONDS. Every status change bumps a row's version,
+  so any change made by another process shows up; on mismatch the map is rebuilt.
+- memory_report() reports the bytes held per event.
+"""
+from __future__ import annotations
+
+import heapq
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db import get_session
+from models.event_seat import EventSeat
+
+AVAILABLE, HELD, SOLD = 0, 1, 2
+STATUS_CODES = {"AVAILABLE": AVAILABLE, "HELD": HELD, "SOLD": SOLD}
+
+# How often (seconds) a cached map is re-checked against the database.
+FRESHNESS_CHECK_SECONDS = 2.0
+
+
+@dataclass
+class EventAvailabilityMap:
+    event_id: int
+    seat_ids: array          # 'q', sorted; position -> seat_id
+    eventseat_ids: array     # 'q', parallel to seat_ids; position -> EventSeat.id
+    states: bytearray        # position -> AVAILABLE / HELD / SOLD
+    hold_expiry: Dict[int, float] = field(default_factory=dict)  # HELD position -> held_until
+    version_sum: int = 0     # sum of EventSeat.version, advanced by one per recorded change
+    checked_at: float = field(default_factory=time.monotonic)
+    _es_sorted: array = field(init=False)
+    _es_pos: array = field(init=False)
+    counts: List[int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        order = sorted(range(len(self.eventseat_ids)), key=self.eventseat_ids.__getitem__)
+        self._es_sorted = array("q", (self.eventseat_ids[p] for p in order))
+        self._es_pos = array("q", order)
+        self.counts = [self.states.count(code) for code in (AVAILABLE, HELD, SOLD)]
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def position_of_eventseat(self, eventseat_id: int) -> Optional[int]:
+        i = bisect_left(self._es_sorted, eventseat_id)
+        if i < len(self._es_sorted) and self._es_sorted[i] == eventseat_id:
+            return self._es_pos[i]
+        return None
+
+    def position_of_seat(self, seat_id: int) -> Optional[int]:
+        i = bisect_left(self.seat_ids, seat_id)
+        if i < len(self.seat_ids) and self.seat_ids[i] == seat_id:
+            return i
+        return None
+
+    def set_state(
+        self, eventseat_ids: Iterable[int], code: int, expiry: Optional[float] = None, bumped: bool = True,
+    ) -> bool:
+        """Apply a state change. Returns False if an id is unknown (map needs a rebuild)."""
+        for esid in eventseat_ids:
+            pos = self.position_of_eventseat(esid)
+            if pos is None:
+                return False
+            if bumped:
+                self.version_sum += 1
+            old = self.states[pos]
+            if old != code:
+                self.counts[old] -= 1
+                self.counts[code] += 1
+                self.states[pos] = code
+            if code == HELD:
+                self.hold_expiry[pos] = expiry if expiry is not None else float("inf")
+            else:
+                self.hold_expiry.pop(pos, None)
+        return True
+
+    def _lapsed_positions(self, now: float) -> List[int]:
+        return sorted(pos for pos, until in self.hold_expiry.items() if until <= now)
+
+    def _available_positions(self) -> Iterator[int]:
+        needle = bytes([AVAILABLE])
+        pos = self.states.find(needle)
+        while pos != -1:
+            yield pos
+            pos = self.states.find(needle, pos + 1)
+
+    def available_eventseat_ids(self, limit: Optional[int] = None) -> List[int]:
+        """
+        EventSeat ids of available seats (AVAILABLE or lapsed HELD) in seat_id order,
+        scanning the byte map plus the held side table only.
+        Reads under the module lock: mark_eventseats updates the map from other threads.
+        """
+        with _lock:
+            merged = heapq.merge(self._available_positions(), self._lapsed_positions(time.time()))
+            return [self.eventseat_ids[pos] for pos in islice(merged, limit)]
+
+    def available_count(self) -> int:
+        with _lock:
+            return self.counts[AVAILABLE] + len(self._lapsed_positions(time.time()))
+
+    def fingerprint(self) -> Tuple[int, int, int]:
+        with _lock:
+            return len(self.states), self._es_sorted[-1] if len(self._es_sorted) else 0, self.version_sum
+
+    def memory_bytes(self) -> int:
+        return sum(sys.getsizeof(a) for a in (
+            self.seat_ids, self.eventseat_ids, self.states, self._es_sorted, self._es_pos,
+            self.hold_expiry,
+        ))
+
+
+_maps: Dict[int, EventAvailabilityMap] = {}
+_lock = threading.Lock()
+
+
+def _db_fingerprint(session: Session, event_id: int) -> Tuple[int, int, int]:
+    rows, max_id, version_sum = session.execute(
+        select(func.count(), func.coalesce(func.max(EventSeat.id), 0), func.coalesce(func.sum(EventSeat.version), 0))
+        .where(EventSeat.event_id == event_id)
+    ).one()
+    return int(rows), int(max_id), int(version_sum)
+
+
+def _build(session: Session, event_id: int) -> EventAvailabilityMap:
+    seat_ids = array("q")
+    eventseat_ids = array("q")
+    states = bytearray()
+    hold_expiry: Dict[int, float] = {}
+    version_sum = 0
+    for pos, (esid, seat_id, status, held_until, version) in enumerate(session.execute(
+        select(EventSeat.id, EventSeat.seat_id, EventSeat.status, EventSeat.held_until, EventSeat.version)
+        .where(EventSeat.event_id == event_id)
+        .order_by(EventSeat.seat_id)
+    )):
+        seat_ids.append(seat_id)
+        eventseat_ids.append(esid)
+        states.append(STATUS_CODES[status])
+        version_sum += version
+        if status == "HELD":
+            hold_expiry[pos] = _epoch(held_until)
+    return EventAvailabilityMap(event_id, seat_ids, eventseat_ids, states, hold_expiry, version_sum=version_sum)
+
+
+def _epoch(dt: Optional[datetime]) -> float:
+    if dt is None:
+        return float("inf")
+    if dt.tzinfo is None:
+        # timestamps are stored in UTC; some drivers hand them back naive
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def get_availability_map(event_id: int) -> EventAvailabilityMap:
+    """Return the event's map, building it on first use and rebuilding it if the DB disagrees."""
+    with _lock:
+        amap = _maps.get(event_id)
+        due = amap is None or time.monotonic() - amap.checked_at > FRESHNESS_CHECK_SECONDS
+    if not due:
+        return amap  # type: ignore[return-value]
+
+    with get_session() as session:
+        return _refresh(session, event_id, amap)
+
+
+async def get_availability_map_async(event_id: int) -> EventAvailabilityMap:
+    """get_availability_map for asyncio callers; the fingerprint / rebuild queries run on the async engine."""
+    from db.async_session import get_async_session
+
+    with _lock:
+        amap = _maps.get(event_id)
+        due = amap is None or time.monotonic() - amap.checked_at > FRESHNESS_CHECK_SECONDS
+    if not due:
+        return amap  # type: ignore[return-value]
+
+    async with get_async_session() as session:
+        return await session.run_sync(_refresh, event_id, amap)
+
+
+def _refresh(session: Session, event_id: int, amap: Optional[EventAvailabilityMap]) -> EventAvailabilityMap:
+    if amap is not None and _db_fingerprint(session, event_id) == amap.fingerprint():
+        amap.checked_at = time.monotonic()
+        return amap
+    amap = _build(session, event_id)
+    with _lock:
+        _maps[event_id] = amap
+    return amap
+
+
+def mark_eventseats(
+    event_id: int,
+    eventseat_ids: Iterable[int],
+    status: str,
+    held_until: Optional[datetime] = None,
+    bumped: bool = True,
+) -> None:
+    """
+    Record a committed status change; a no-op for events whose map isn't loaded.
+    bumped=False for writes that leave EventSeat.version alone (extend_hold).
+    """
+    expiry = _epoch(held_until) if status == "HELD" else None
+    with _lock:
+        amap = _maps.get(event_id)
+        if amap is not None and not amap.set_state(eventseat_ids, STATUS_CODES[status], expiry, bumped):
+            del _maps[event_id]
+
+
+def invalidate(event_id: Optional[int] = None) -> None:
+    """Drop one event's map (or all of them); the next read rebuilds from the DB."""
+    with _lock:
+        if event_id is None:
+            _maps.clear()
+        else:
+            _maps.pop(event_id, None)
+
+
+def availability_counts(event_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """{event_id: (available, total)} answered from the maps; lapsed holds count as available."""
+    out: Dict[int, Tuple[int, int]] = {}
+    for eid in event_ids:
+        amap = get_availability_map(eid)
+        out[eid] = (amap.available_count(), len(amap))
+    return out
+
+
+def memory_report() -> Dict[int, Dict[str, int]]:
+    """Per loaded event: seat count and bytes used by its arrays."""
+    with _lock:
+        return {
+            eid: {"seats": len(amap), "bytes": amap.memory_bytes()}
+            for eid, amap in _maps.items()
+        }
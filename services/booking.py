@@ -1,117 +1,200 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Optional, Tuple
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
 from db import get_session
-from models.event import Event
 from models.event_seat import EventSeat
+from models.seat import Seat
 from models.ticket import Ticket
-
-
-def purchase_event_seats(event_id: int, eventseat_ids: Iterable[int], customer_id: int) -> List[Tuple[Ticket, str]]:
+from services import availability_map
+from services.inventory_stats import record_transition
+from services.idempotency import claim_key, load_tickets, record_result
+from services.seat_service import seat_label_expr
+
+
+def _checkout(
+	session: Session,
+	event_id: int,
+	ids: List[int],
+	customer_id: int,
+	now: datetime,
+	from_status: str,
+	eligible: Optional[ColumnElement[bool]] = None,
+) -> List[Tuple[Ticket, str]]:
+	"""
+	Set-based checkout: one conditional UPDATE ... RETURNING moves the eligible seats
+	currently in `from_status` to SOLD (with their labels looked up from seats in the
+	same statement), then one multi-row INSERT ... RETURNING creates the tickets and the
+	event's inventory counters move in the same transaction. Returns (Ticket, seat_label)
+	in the order the ids were given.
+	"""
+	label = (
+		select(seat_label_expr())
+		.where(Seat.id == EventSeat.seat_id)
+		.scalar_subquery()
+	)
+	where = [EventSeat.event_id == event_id, EventSeat.id.in_(ids), EventSeat.status == from_status]
+	if eligible is not None:
+		where.append(eligible)
+	sold = session.execute(
+		update(EventSeat)
+		.where(*where)
+		.values(status="SOLD", held_until=None, version=EventSeat.version + 1)
+		.returning(EventSeat.id, EventSeat.price_ksh, label)
+		.execution_options(synchronize_session=False)
+	).all()
+	if not sold:
+		return []
+	record_transition(session, event_id, from_status, "SOLD", len(sold), sum(price for _, price, _ in sold))
+
+	tickets = session.scalars(
+		insert(Ticket).returning(Ticket),
+		[
+			{"customer_id": customer_id, "event_seat_id": esid, "price_ksh": price, "purchased_at": now}
+			for esid, price, _ in sold
+		],
+	).all()
+	labels = {esid: seat_label for esid, _, seat_label in sold}
+	order = {esid: i for i, esid in enumerate(ids)}
+	tickets = sorted(tickets, key=lambda t: order[t.event_seat_id])
+	return [(t, labels[t.event_seat_id]) for t in tickets]
+
+
+def purchase_event_seats(
+	event_id: int,
+	eventseat_ids: Iterable[int],
+	customer_id: int,
+	idempotency_key: Optional[str] = None,
+) -> List[Tuple[Ticket, str]]:
 	"""
 	Attempt to sell the given EventSeat ids for an event and create tickets.
 	Returns a list of (Ticket, seat_label) for successful purchases.
 	Seats not available are skipped.
+	A repeat call with the same idempotency_key returns the first call's tickets.
 	"""
 	now = datetime.now(tz=timezone.utc)
-	created: List[Tuple[Ticket, str]] = []
-	ids = [int(i) for i in eventseat_ids]
+	ids = list(dict.fromkeys(int(i) for i in eventseat_ids))
 	if not ids:
-		return created
+		return []
 
 	with get_session() as session:
-		# Validate event exists (optional safety)
-		_ = session.get(Event, event_id)
-
-		# Load EventSeat rows with seat relationship
-		rows = session.scalars(
-			select(EventSeat)
-			.where(EventSeat.event_id == event_id, EventSeat.id.in_(ids))
-			.options(selectinload(EventSeat.seat))
-		).all()
-
-		id_to_es = {es.id: es for es in rows}
-
-		# Process in requested order
-		for esid in ids:
-			es = id_to_es.get(esid)
-			if not es:
-				continue
-
-			# Decide if we can sell this seat now.
-			can_sell = False
-			if es.status == "AVAILABLE":
-				can_sell = True
-			elif es.status == "HELD":
-				# If hold is still valid, allow selling; if expired, revert to AVAILABLE and sell.
-				if es.held_until and es.held_until > now:
-					can_sell = True
-				else:
-					es.status = "AVAILABLE"
-					es.held_until = None
-					can_sell = True
-			else:
-				# SOLD or any other status → skip
-				can_sell = False
-
-			if not can_sell:
-				continue
-
-			# Sell and create ticket
-			es.status = "SOLD"
-			es.held_until = None
-			ticket = Ticket(
-				customer_id=customer_id,
-				event_seat_id=es.id,
-				price_ksh=es.price_ksh,
-				purchased_at=now,
-			)
-			session.add(ticket)
-			# Compute seat label
-			seat = es.seat if hasattr(es, "seat") else None
-			label = f"{seat.row}{seat.number}" if seat else f"seat#{es.seat_id}"
-			created.append((ticket, label))
+		created = _purchase_tx(session, event_id, ids, customer_id, now, idempotency_key)
+
+	availability_map.mark_eventseats(event_id, [t.event_seat_id for t, _ in created], "SOLD")
+	return created
+
 
+def _purchase_tx(
+	session: Session,
+	event_id: int,
+	ids: List[int],
+	customer_id: int,
+	now: datetime,
+	idempotency_key: Optional[str],
+) -> List[Tuple[Ticket, str]]:
+	"""purchase_event_seats inside the caller's transaction (shared with the async service layer)."""
+	if idempotency_key:
+		replay = claim_key(session, idempotency_key, "purchase", customer_id, now)
+		if replay is not None:
+			return load_tickets(session, replay)
+	# Sellable: available (lapsed holds included, see available_clause) or under a
+	# live hold being checked out, i.e. any AVAILABLE or HELD seat. Held seats (the
+	# usual case) go first; a second statement only runs for seats still missing.
+	created = _checkout(session, event_id, ids, customer_id, now, "HELD")
+	if len(created) < len(ids):
+		done = {t.event_seat_id for t, _ in created}
+		created += _checkout(session, event_id, [i for i in ids if i not in done], customer_id, now, "AVAILABLE")
+		order = {esid: i for i, esid in enumerate(ids)}
+		created.sort(key=lambda tl: order[tl[0].event_seat_id])
+	if idempotency_key:
+		record_result(session, idempotency_key, [t.id for t, _ in created])
 	return created
 
 
-def finalize_held_seats(event_id: int, eventseat_ids: Iterable[int], customer_id: int) -> List[Tuple[Ticket, str]]:
+@dataclass
+class FinalizeResult:
+	"""Outcome of a versioned finalize: what sold, what lost a race, and what wasn't eligible."""
+	tickets: List[Tuple[Ticket, str]] = field(default_factory=list)
+	conflicts: List[int] = field(default_factory=list)  # changed by someone else between read and write
+	skipped: List[int] = field(default_factory=list)    # not HELD, hold expired, or not in this event
+
+
+def try_finalize_held_seats(
+	event_id: int,
+	eventseat_ids: Iterable[int],
+	customer_id: int,
+	idempotency_key: Optional[str] = None,
+) -> FinalizeResult:
 	"""
-	Finalize purchase of EventSeat ids that are currently HELD and not expired.
-	Creates Ticket rows and marks seats as SOLD. Skips any that are not HELD or already expired.
-	Returns list of (Ticket, seat_label) for successful finalizations.
+	Finalize held seats with optimistic concurrency, reporting partial success.
+
+	Reads (id, version) of the live holds, then sells only rows whose version is
+	unchanged. A concurrent finalizer or hold release bumps the version, so the seat
+	is reported in `conflicts` instead of aborting the whole order.
+	A repeat call with the same idempotency_key returns the first call's tickets.
 	"""
 	now = datetime.now(tz=timezone.utc)
-	created: List[Tuple[Ticket, str]] = []
-	ids = [int(i) for i in eventseat_ids]
+	ids = list(dict.fromkeys(int(i) for i in eventseat_ids))
 	if not ids:
-		return created
+		return FinalizeResult()
 
 	with get_session() as session:
-		rows = session.scalars(
-			select(EventSeat)
-			.where(EventSeat.event_id == event_id, EventSeat.id.in_(ids))
-			.options(selectinload(EventSeat.seat))
-		).all()
-		for es in rows:
-			if es.status != "HELD" or not es.held_until or es.held_until <= now:
-				continue
-			es.status = "SOLD"
-			es.held_until = None
-			ticket = Ticket(
-				customer_id=customer_id,
-				event_seat_id=es.id,
-				price_ksh=es.price_ksh,
-				purchased_at=now,
-			)
-			session.add(ticket)
-			seat = es.seat if hasattr(es, "seat") else None
-			label = f"{seat.row}{seat.number}" if seat else f"seat#{es.seat_id}"
-			created.append((ticket, label))
-
-	return created
+		result = _try_finalize_tx(session, event_id, ids, customer_id, now, idempotency_key)
+
+	availability_map.mark_eventseats(event_id, [t.event_seat_id for t, _ in result.tickets], "SOLD")
+	return result
+
+
+def _try_finalize_tx(
+	session: Session,
+	event_id: int,
+	ids: List[int],
+	customer_id: int,
+	now: datetime,
+	idempotency_key: Optional[str],
+) -> FinalizeResult:
+	"""try_finalize_held_seats inside the caller's transaction (shared with the async service layer)."""
+	result = FinalizeResult()
+	if idempotency_key:
+		replay = claim_key(session, idempotency_key, "finalize", customer_id, now)
+		if replay is not None:
+			return FinalizeResult(tickets=load_tickets(session, replay))
+	held = dict(session.execute(
+		select(EventSeat.id, EventSeat.version).where(
+			EventSeat.event_id == event_id,
+			EventSeat.id.in_(ids),
+			EventSeat.status == "HELD",
+			EventSeat.held_until > now,
+		)
+	).all())
+	result.skipped = [i for i in ids if i not in held]
+	if held:
+		result.tickets = _checkout(
+			session, event_id, [i for i in ids if i in held], customer_id, now, "HELD",
+			tuple_(EventSeat.id, EventSeat.version).in_(list(held.items())),
+		)
+	sold = {t.event_seat_id for t, _ in result.tickets}
+	result.conflicts = [i for i in ids if i in held and i not in sold]
+	if idempotency_key:
+		record_result(session, idempotency_key, [t.id for t, _ in result.tickets])
+	return result
+
+
+def finalize_held_seats(
+	event_id: int,
+	eventseat_ids: Iterable[int],
+	customer_id: int,
+	idempotency_key: Optional[str] = None,
+) -> List[Tuple[Ticket, str]]:
+	"""
+	Finalize purchase of EventSeat ids that are currently HELD and not expired.
+	Creates Ticket rows and marks seats as SOLD. Skips any that are not HELD or already expired.
+	Returns list of (Ticket, seat_label) for successful finalizations.
+	"""
+	return try_finalize_held_seats(event_id, eventseat_ids, customer_id, idempotency_key).tickets
@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy import select
 from db import get_session
 from models.event import Event
+from services import availability_map
 
 def get_or_create_event(venue_id: int, name: str, start_at: datetime, description: Optional[str] = None) -> Event:
     with get_session() as session:
@@ -31,4 +32,5 @@ def delete_event(event_id: int) -> bool:
         if not e:
             return False
         session.delete(e)
-        return True
\ No newline at end of file
+    availability_map.invalidate(event_id)
+    return True
\ No newline at end of file
@@ -1,85 +1,350 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Iterable, List, Optional
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
 
-from sqlalchemy import select, update
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.orm import Session
 
 from db import get_session
 from models.event_seat import EventSeat
+from models.hold import Hold
+from models.seat import Seat
+from services import availability_map
+from services.inventory_stats import record_transition
+from services.seat_service import seat_label, seat_label_expr
+
+
+def available_clause(now: datetime) -> ColumnElement[bool]:
+    """
+    The one availability predicate: AVAILABLE, or HELD with a hold that has lapsed.
+
+    Expired holds are bookable immediately, without waiting for release_expired_holds.
+    Backed by the ix_event_seats_available / ix_event_seats_held_until partial indexes.
+    """
+    return or_(
+        EventSeat.status == "AVAILABLE",
+        and_(EventSeat.status == "HELD", EventSeat.held_until <= now),
+    )
+
+
+def _available_seats_query(event_id: int, now: datetime, limit: int, ids: Optional[List[int]] = None):
+    q = select(EventSeat).where(EventSeat.event_id == event_id, available_clause(now))
+    if ids is not None:
+        q = q.where(EventSeat.id.in_(ids))
+    return q.order_by(EventSeat.seat_id).limit(limit)
 
 
 def get_available_event_seats(event_id: int, limit: int = 10) -> List[EventSeat]:
+    # The availability map only suggests ids (a primary-key lookup); the database still
+    # checks availability. Only when some of the map's picks fail that check was it stale:
+    # drop it and answer from the partial indexes instead. Fewer picks than `limit` just
+    # means fewer seats are left, so that costs no second query.
+    now = datetime.now(tz=timezone.utc)
+    ids = availability_map.get_availability_map(event_id).available_eventseat_ids(limit)
     with get_session() as session:
-        return session.scalars(
-            select(EventSeat)
-            .where(EventSeat.event_id == event_id, EventSeat.status == "AVAILABLE")
-            .order_by(EventSeat.seat_id)
-            .limit(limit)
-        ).all()
+        rows = session.scalars(_available_seats_query(event_id, now, limit, ids)).all() if ids else []
+        if len(rows) < len(ids):
+            availability_map.invalidate(event_id)
+            rows = session.scalars(_available_seats_query(event_id, now, limit)).all()
+        return rows
 
 
-def hold_event_seats(event_id: int, seat_ids: Iterable[int], minutes: int = 15) -> List[int]:
-    """Hold specific seats if they are currently AVAILABLE."""
-    if minutes <= 0:
-        minutes = 15
-    hold_until = datetime.now(tz=timezone.utc) + timedelta(minutes=minutes)
+class InventoryRow(NamedTuple):
+    """Lightweight inventory row (no ORM identity map); `id` is the EventSeat id."""
+    id: int
+    seat_id: int
+    section: str
+    row: str
+    number: int
+    price_ksh: int
 
-    held_ids: List[int] = []
+    @property
+    def label(self) -> str:
+        return seat_label(self.section, self.row, self.number)
+
+
+class InventoryPage(NamedTuple):
+    rows: List[InventoryRow]
+    next_cursor: Optional[int]  # pass back as after_seat_id; None on the last page
+
+
+def _inventory_query(event_id: int, now: datetime, row: Optional[str], section: Optional[str]):
+    q = (
+        select(EventSeat.id, EventSeat.seat_id, Seat.section, Seat.row, Seat.number, EventSeat.price_ksh)
+        .join(Seat, Seat.id == EventSeat.seat_id)
+        .where(EventSeat.event_id == event_id, available_clause(now))
+        .order_by(EventSeat.seat_id)
+    )
+    if row is not None:
+        q = q.where(Seat.row == row)
+    if section is not None:
+        q = q.where(Seat.section == section)
+    return q
+
+
+def get_inventory_page(
+    event_id: int,
+    after_seat_id: Optional[int] = None,
+    limit: int = 100,
+    row: Optional[str] = None,
+    section: Optional[str] = None,
+) -> InventoryPage:
+    """One keyset page of available seats, ordered by seat_id, starting after `after_seat_id`."""
+    q = _inventory_page_query(event_id, after_seat_id, limit, row, section)
+    with get_session() as session:
+        rows = [InventoryRow(*r) for r in session.execute(q)]
+    return _inventory_page(rows, limit)
+
+
+def _inventory_page_query(
+    event_id: int,
+    after_seat_id: Optional[int],
+    limit: int,
+    row: Optional[str],
+    section: Optional[str],
+):
+    q = _inventory_query(event_id, datetime.now(tz=timezone.utc), row, section).limit(limit)
+    if after_seat_id is not None:
+        q = q.where(EventSeat.seat_id > after_seat_id)
+    return q
+
+
+def _inventory_page(rows: List[InventoryRow], limit: int) -> InventoryPage:
+    return InventoryPage(rows, rows[-1].seat_id if len(rows) == limit else None)
+
+
+def iter_available_inventory(
+    event_id: int,
+    row: Optional[str] = None,
+    section: Optional[str] = None,
+    page_size: int = 1000,
+) -> Iterator[InventoryRow]:
+    """
+    Stream every available seat of an event as InventoryRow tuples, in seat_id order.
+
+    Pages by seat_id keyset (never an OFFSET), so memory stays at one page regardless of
+    venue size. Each page is read in one short transaction that is closed before its rows
+    are yielded: a slow or abandoned consumer holds no session or connection.
+    """
+    after: Optional[int] = None
+    while True:
+        page = get_inventory_page(event_id, after, page_size, row, section)
+        yield from page.rows
+        if page.next_cursor is None:
+            return
+        after = page.next_cursor
+
+
+def resolve_inventory(event_id: int, eventseat_ids: Sequence[int] = (), labels: Sequence[str] = ()) -> List[InventoryRow]:
+    """
+    Look up available seats picked by EventSeat id or by label ("A12", or "North-A12"
+    in a sectioned venue), without loading the rest of the inventory.
+    Raises ValueError if a label matches more than one seat.
+    """
+    if not eventseat_ids and not labels:
+        return []
+    label_expr = func.upper(seat_label_expr())
+    q = _inventory_query(event_id, datetime.now(tz=timezone.utc), None, None).where(
+        or_(EventSeat.id.in_(list(eventseat_ids)), label_expr.in_([l.upper() for l in labels]))
+    )
     with get_session() as session:
-        rows = session.scalars(
-            select(EventSeat)
+        rows = [InventoryRow(*r) for r in session.execute(q)]
+    by_label = Counter(r.label.upper() for r in rows)
+    ambiguous = sorted({l for l in labels if by_label[l.upper()] > 1})
+    if ambiguous:
+        raise ValueError(f"seat label(s) {', '.join(ambiguous)} match more than one seat; use the EventSeat id")
+    return rows
+
+
+def _hold_rows_orm(session: Session, event_id: int, seat_ids: List[int], hold_until: datetime) -> List[int]:
+    """Row-at-a-time hold: load each candidate as an ORM object and flush one UPDATE per row.
+
+    Kept for comparison in scripts/hold_benchmark.py; hold_event_seats uses _hold_rows.
+    """
+    now = datetime.now(tz=timezone.utc)
+    rows = session.scalars(
+        select(EventSeat)
+        .where(
+            EventSeat.event_id == event_id,
+            EventSeat.seat_id.in_(seat_ids),
+            available_clause(now),
+        )
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    held_ids: List[int] = []
+    newly_held = 0
+    for es in rows:
+        newly_held += es.status == "AVAILABLE"
+        es.status = "HELD"
+        es.held_until = hold_until
+        es.version += 1
+        held_ids.append(es.id)
+    session.flush()
+    record_transition(session, event_id, "AVAILABLE", "HELD", newly_held)
+    return held_ids
+
+
+def _hold_rows(
+    session: Session,
+    event_id: int,
+    seat_ids: List[int],
+    hold_until: datetime,
+    hold_id: Optional[int] = None,
+) -> List[int]:
+    """Set-based hold: one UPDATE ... RETURNING over the rows we managed to lock.
+
+    The inner SELECT keeps the FOR UPDATE SKIP LOCKED semantics, so rows locked by a
+    concurrent hold are skipped instead of waited on. The outer status check re-runs
+    against the locked row version.
+
+    AVAILABLE rows are taken first; lapsed holds only when some seats are still
+    missing, in a second statement, so the inventory counters know which seats
+    actually left AVAILABLE.
+    """
+    now = datetime.now(tz=timezone.utc)
+
+    def take(eligible: ColumnElement[bool]) -> List[int]:
+        candidates = (
+            select(EventSeat.id)
             .where(
                 EventSeat.event_id == event_id,
-                EventSeat.seat_id.in_(list(seat_ids)),
-                EventSeat.status == "AVAILABLE",
+                EventSeat.seat_id.in_(seat_ids),
+                eligible,
             )
             .with_for_update(skip_locked=True)
-        ).all()
+            .scalar_subquery()
+        )
+        return list(session.scalars(
+            update(EventSeat)
+            .where(EventSeat.id.in_(candidates), eligible)
+            .values(status="HELD", held_until=hold_until, hold_id=hold_id, version=EventSeat.version + 1)
+            .returning(EventSeat.id)
+            .execution_options(synchronize_session=False)
+        ).all())
 
-        for es in rows:
-            es.status = "HELD"
-            es.held_until = hold_until
-            held_ids.append(es.id)
+    held = take(EventSeat.status == "AVAILABLE")
+    record_transition(session, event_id, "AVAILABLE", "HELD", len(held))
+    if len(held) < len(seat_ids):
+        held += take(and_(EventSeat.status == "HELD", EventSeat.held_until <= now))
+    return held
 
-    return held_ids
 
+def hold_event_seats(event_id: int, seat_ids: Iterable[int], minutes: int = 15) -> List[int]:
+    """
+    Hold specific seats if they are currently AVAILABLE. Returns the held EventSeat ids.
 
-def sell_event_seat(eventseat_id: int) -> bool:
-    """Mark a seat SOLD if AVAILABLE or HELD (and not expired)."""
-    now = datetime.now(tz=timezone.utc)
-    with get_session() as session:
-        es = session.get(EventSeat, eventseat_id, with_for_update=True)
-        if es is None:
-            return False
+    The hold is recorded as a Hold session; use hold_service.place_hold to get its token.
+    """
+    from services.hold_service import place_hold  # hold_service builds on this module
+
+    receipt = place_hold(event_id, seat_ids, minutes=minutes)
+    return receipt.eventseat_ids if receipt else []
 
-        if es.status == "AVAILABLE":
-            es.status = "SOLD"
-            es.held_until = None
-            return True
 
-        if es.status == "HELD" and es.held_until and es.held_until > now:
-            es.status = "SOLD"
-            es.held_until = None
-            return True
+def sell_event_seat(eventseat_id: int) -> bool:
+    """Mark a seat SOLD if it is available (see available_clause) or under a live hold."""
+    event_id = None
+    with get_session() as session:
+        # Available (including a lapsed hold) or under a live hold being checked out; tried
+        # per current status so the inventory counters move the right bucket
+        for from_status in ("AVAILABLE", "HELD"):
+            sold = session.execute(
+                update(EventSeat)
+                .where(EventSeat.id == eventseat_id, EventSeat.status == from_status)
+                .values(status="SOLD", held_until=None, version=EventSeat.version + 1)
+                .returning(EventSeat.event_id, EventSeat.price_ksh)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if sold is not None:
+                event_id, price = sold
+                record_transition(session, event_id, from_status, "SOLD", 1, price)
+                break
 
+    if event_id is None:
         return False
+    availability_map.mark_eventseats(event_id, [eventseat_id], "SOLD")
+    return True
 
 
 def release_expired_holds(now: Optional[datetime] = None) -> int:
-    """Set status back to AVAILABLE where HELD and held_until <= now."""
+    """
+    Set status back to AVAILABLE where HELD and held_until <= now.
+
+    Lapsed holds are already treated as available by available_clause, so this is
+    housekeeping (tidy statuses and counts), not what returns seats to sale.
+    Works per Hold session: expired ACTIVE holds (a partial-index lookup) are marked
+    EXPIRED and only their seats are touched. Seats held without a Hold record are
+    swept by held_until as before.
+    """
     if now is None:
         now = datetime.now(tz=timezone.utc)
 
+    released: List = []
     with get_session() as session:
-        result = session.execute(
-            update(EventSeat)
-            .where(
-                EventSeat.status == "HELD",
-                EventSeat.held_until.is_not(None),
-                EventSeat.held_until <= now,
-            )
-            .values(status="AVAILABLE", held_until=None)
+        released += _expire_holds(session, Hold.expires_at <= now)
+        released += _release_rows(
+            session,
+            and_(EventSeat.hold_id.is_(None), EventSeat.held_until.is_not(None), EventSeat.held_until <= now),
         )
-        return result.rowcount or 0
\ No newline at end of file
+
+    _mark_released(released)
+    return len(released)
+
+
+def release_due_holds(hold_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+    """
+    Targeted release: expire just these holds (those still ACTIVE and past expires_at)
+    and free their seats. Primary-key lookups only; used by the worker's expiry
+    scheduler. Returns seats released.
+    """
+    ids = list(hold_ids)
+    if not ids:
+        return 0
+    if now is None:
+        now = datetime.now(tz=timezone.utc)
+    with get_session() as session:
+        released = _expire_holds(session, and_(Hold.id.in_(ids), Hold.expires_at <= now))
+    _mark_released(released)
+    return len(released)
+
+
+def _expire_holds(session: Session, where: ColumnElement[bool]) -> List:
+    """Mark ACTIVE holds matching `where` EXPIRED and release their seats; returns _release_rows rows."""
+    expired_ids = session.scalars(
+        update(Hold)
+        .where(Hold.status == "ACTIVE", where)
+        .values(status="EXPIRED")
+        .returning(Hold.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not expired_ids:
+        return []
+    return _release_rows(session, EventSeat.hold_id.in_(expired_ids))
+
+
+def _release_rows(session: Session, where: ColumnElement[bool]) -> List:
+    """HELD rows matching `where` back to AVAILABLE; returns (event_id, EventSeat id) rows."""
+    released = session.execute(
+        update(EventSeat)
+        .where(EventSeat.status == "HELD", where)
+        .values(status="AVAILABLE", held_until=None, hold_id=None, version=EventSeat.version + 1)
+        .returning(EventSeat.event_id, EventSeat.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    per_event = Counter(event_id for event_id, _ in released)
+    # fixed event order keeps concurrent sweeps from locking counter rows in opposite orders
+    for event_id in sorted(per_event):
+        record_transition(session, event_id, "HELD", "AVAILABLE", per_event[event_id])
+    return released
+
+
+def _mark_released(released: Iterable) -> None:
+    by_event: Dict[int, List[int]] = {}
+    for event_id, esid in released:
+        by_event.setdefault(event_id, []).append(esid)
+    for event_id, esids in by_event.items():
+        availability_map.mark_eventseats(event_id, esids, "AVAILABLE")
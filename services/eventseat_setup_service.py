@@ -1,8 +1,23 @@
 from __future__ import annotations
-from sqlalchemy import select
+import time
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import Integer, cast, exists, func, insert, literal, select, true
 from db import get_session
+from models.event import Event
 from models.seat import Seat
 from models.event_seat import EventSeat
+from services import availability_map
+from services.inventory_stats import rebuild_stats, record_transition
+
+
+class SeedReport(NamedTuple):
+    created: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.created / self.seconds if self.seconds > 0 else 0.0
 
 
 def seed_event_seats(
@@ -11,17 +26,22 @@ def seed_event_seats(
     price_ksh: int,
     only_missing: bool = True,
     seat_limit: int | None = None,
+    bulk: bool = False,
 ) -> int:
     """
     Create EventSeat rows for all seats in a venue for the given event.
     If only_missing, skip seats already present for this event.
+    bulk=True creates the rows inside the database (see bulk_seed_event_seats).
     Returns number of EventSeat rows created.
     """
+    if bulk:
+        return bulk_seed_event_seats(event_id, venue_id, price_ksh, only_missing, seat_limit).created
+
     created = 0
     with get_session() as session:
-        # Deterministic ordering by row, number so capacity selection is predictable
+        # Deterministic ordering by section, row, number so capacity selection is predictable
         seat_ids = session.scalars(
-            select(Seat.id).where(Seat.venue_id == venue_id).order_by(Seat.row, Seat.number)
+            select(Seat.id).where(Seat.venue_id == venue_id).order_by(Seat.section, Seat.row, Seat.number)
         ).all()
         if seat_limit is not None and seat_limit >= 0:
             seat_ids = seat_ids[:seat_limit]
@@ -47,4 +67,119 @@ def seed_event_seats(
         if to_add:
             session.add_all(to_add)
             created = len(to_add)
-    return created
\ No newline at end of file
+            session.flush()
+            record_transition(session, event_id, None, "AVAILABLE", created)
+    if created:
+        availability_map.invalidate(event_id)
+    return created
+
+
+def bulk_seed_event_seats(
+    event_id: int,
+    venue_id: int,
+    price_ksh: int,
+    only_missing: bool = True,
+    seat_limit: int | None = None,
+) -> SeedReport:
+    """
+    Same result as seed_event_seats, as one INSERT ... SELECT run by the database.
+
+    Seat ids never travel to Python: the venue's seats (first seat_limit by section, row, number)
+    are selected and inserted server-side; only_missing becomes a NOT EXISTS filter.
+    Returns a SeedReport with rows created and elapsed time (rows_per_second).
+    """
+    seats = select(Seat.id).where(Seat.venue_id == venue_id).order_by(Seat.section, Seat.row, Seat.number)
+    if seat_limit is not None and seat_limit >= 0:
+        seats = seats.limit(seat_limit)
+    seats = seats.subquery()
+
+    rows = select(literal(event_id), seats.c.id, literal("AVAILABLE"), literal(price_ksh))
+    if only_missing:
+        rows = rows.where(
+            ~exists().where(EventSeat.event_id == event_id, EventSeat.seat_id == seats.c.id)
+        )
+
+    started = time.perf_counter()
+    with get_session() as session:
+        result = session.execute(
+            insert(EventSeat.__table__).from_select(["event_id", "seat_id", "status", "price_ksh"], rows)
+        )
+        created = result.rowcount or 0
+        record_transition(session, event_id, None, "AVAILABLE", created)
+    report = SeedReport(created, time.perf_counter() - started)
+    if created:
+        availability_map.invalidate(event_id)
+    return report
+
+
+class CloneReport(NamedTuple):
+    events: List[Event]
+    created: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.created / self.seconds if self.seconds > 0 else 0.0
+
+
+def clone_event_run(
+    source_event_id: int,
+    nights: Iterable[Tuple[str, datetime]],
+    price_multiplier: float = 1.0,
+    description: Optional[str] = None,
+) -> CloneReport:
+    """
+    Create one new Event per (name, start_at) at the source event's venue and copy the
+    source's inventory (seat ids and per-seat prices, reset to AVAILABLE) into all of them.
+
+    The inventory is copied by a single INSERT ... SELECT that cross joins the source
+    event_seats with the new event ids, so seats and prices never travel to Python.
+    Prices are multiplied by price_multiplier and rounded to whole KSh.
+    """
+    nights = list(nights)
+    started = time.perf_counter()
+    with get_session() as session:
+        source = session.get(Event, source_event_id)
+        if source is None:
+            raise ValueError(f"Event {source_event_id} not found")
+        events = [
+            Event(
+                venue_id=source.venue_id,
+                name=name,
+                start_at=start_at,
+                description=description if description is not None else source.description,
+            )
+            for name, start_at in nights
+        ]
+        if not events:
+            return CloneReport([], 0, 0.0)
+        session.add_all(events)
+        session.flush()
+
+        targets = select(Event.id).where(Event.id.in_([e.id for e in events])).subquery()
+        price = EventSeat.price_ksh
+        if price_multiplier != 1.0:
+            price = cast(func.round(EventSeat.price_ksh * price_multiplier), Integer)
+        rows = (
+            select(targets.c.id, EventSeat.seat_id, literal("AVAILABLE"), price)
+            .join_from(EventSeat, targets, true())
+            .where(EventSeat.event_id == source_event_id)
+        )
+        result = session.execute(
+            insert(EventSeat.__table__).from_select(["event_id", "seat_id", "status", "price_ksh"], rows)
+        )
+        created = result.rowcount or 0
+        rebuild_stats(session, [e.id for e in events])
+    return CloneReport(events, created, time.perf_counter() - started)
+
+
+def clone_event(
+    source_event_id: int,
+    name: str,
+    start_at: datetime,
+    price_multiplier: float = 1.0,
+    description: Optional[str] = None,
+) -> Tuple[Event, int]:
+    """Clone one event's inventory into a new Event. Returns (new event, EventSeat rows created)."""
+    report = clone_event_run(source_event_id, [(name, start_at)], price_multiplier, description)
+    return report.events[0], report.created
@@ -0,0 +1,164 @@
+"""
+Hold sessions: a token, an owner, an expiry and the seats it covers.
+
+place_hold returns the token; finalize / extend / cancel take only the token and find
+the hold by its unique index, then its seats through event_seats.hold_id.
+"""
+from __future__ import annotations
+
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from db import get_session
+from models.event_seat import EventSeat
+from models.hold import Hold
+from services import availability_map
+from services.booking import FinalizeResult, _checkout
+from services.eventseat_service import _hold_rows, _mark_released, _release_rows
+from services.idempotency import claim_key, load_tickets, record_result
+
+
+class HoldReceipt(NamedTuple):
+    token: str
+    event_id: int
+    eventseat_ids: List[int]
+    expires_at: datetime
+
+
+def create_hold(session: Session, event_id: int, expires_at: datetime, owner: Optional[str] = None) -> Hold:
+    """Insert an ACTIVE Hold row in the caller's transaction and return it (id assigned)."""
+    hold = Hold(token=secrets.token_urlsafe(24), event_id=event_id, owner=owner, expires_at=expires_at)
+    session.add(hold)
+    session.flush()
+    return hold
+
+
+def place_hold(
+    event_id: int,
+    seat_ids: Iterable[int],
+    minutes: int = 15,
+    owner: Optional[str] = None,
+) -> Optional[HoldReceipt]:
+    """Hold the given seats (by seat_id) under a new Hold. Returns None if none could be held."""
+    if minutes <= 0:
+        minutes = 15
+    expires_at = datetime.now(tz=timezone.utc) + timedelta(minutes=minutes)
+
+    ids = list(seat_ids)
+    if not ids:
+        return None
+    with get_session() as session:
+        receipt = _place_hold_tx(session, event_id, ids, expires_at, owner)
+    if receipt is not None:
+        availability_map.mark_eventseats(event_id, receipt.eventseat_ids, "HELD", held_until=expires_at)
+    return receipt
+
+
+def _place_hold_tx(
+    session: Session,
+    event_id: int,
+    seat_ids: List[int],
+    expires_at: datetime,
+    owner: Optional[str],
+) -> Optional[HoldReceipt]:
+    """place_hold inside the caller's transaction (shared with the async service layer)."""
+    hold = create_hold(session, event_id, expires_at, owner)
+    held_ids = _hold_rows(session, event_id, seat_ids, expires_at, hold_id=hold.id)
+    if not held_ids:
+        session.delete(hold)
+        return None
+    return HoldReceipt(hold.token, event_id, held_ids, expires_at)
+
+
+def _active_hold(session: Session, token: str, now: datetime) -> Optional[Hold]:
+    return session.scalar(
+        select(Hold)
+        .where(Hold.token == token, Hold.status == "ACTIVE", Hold.expires_at > now)
+        .with_for_update()
+    )
+
+
+def finalize_hold(token: str, customer_id: int, idempotency_key: Optional[str] = None) -> FinalizeResult:
+    """
+    Sell every seat still held by this hold and mark it FINALIZED.
+    Seats the hold no longer owns (lapsed and re-held elsewhere) are reported as conflicts;
+    an unknown, expired or already-closed token gives an empty result.
+    A repeat call with the same idempotency_key returns the first call's tickets.
+    """
+    now = datetime.now(tz=timezone.utc)
+    with get_session() as session:
+        event_id, result = _finalize_hold_tx(session, token, customer_id, now, idempotency_key)
+    if event_id is not None:
+        availability_map.mark_eventseats(event_id, [t.event_seat_id for t, _ in result.tickets], "SOLD")
+    return result
+
+
+def _finalize_hold_tx(
+    session: Session,
+    token: str,
+    customer_id: int,
+    now: datetime,
+    idempotency_key: Optional[str],
+) -> Tuple[Optional[int], FinalizeResult]:
+    """
+    finalize_hold inside the caller's transaction (shared with the async service layer).
+    Returns (event_id, result); event_id is None when nothing changed (replay, unknown token).
+    """
+    result = FinalizeResult()
+    if idempotency_key:
+        replay = claim_key(session, idempotency_key, "finalize_hold", customer_id, now)
+        if replay is not None:
+            return None, FinalizeResult(tickets=load_tickets(session, replay))
+    hold = _active_hold(session, token, now)
+    if hold is None:
+        return None, result
+    ids = list(session.scalars(
+        select(EventSeat.id).where(EventSeat.hold_id == hold.id).order_by(EventSeat.seat_id)
+    ).all())
+    if ids:
+        result.tickets = _checkout(
+            session, hold.event_id, ids, customer_id, now, "HELD", EventSeat.hold_id == hold.id,
+        )
+    sold = {t.event_seat_id for t, _ in result.tickets}
+    result.conflicts = [i for i in ids if i not in sold]
+    hold.status = "FINALIZED"
+    if idempotency_key:
+        record_result(session, idempotency_key, [t.id for t, _ in result.tickets])
+    return hold.event_id, result
+
+
+def extend_hold(token: str, minutes: int) -> Optional[datetime]:
+    """Push an active hold's expiry (and its seats' held_until) out by `minutes`. Returns the new expiry."""
+    now = datetime.now(tz=timezone.utc)
+    with get_session() as session:
+        hold = _active_hold(session, token, now)
+        if hold is None:
+            return None
+        hold.expires_at = hold.expires_at + timedelta(minutes=minutes)
+        held = session.scalars(
+            update(EventSeat)
+            .where(EventSeat.hold_id == hold.id, EventSeat.status == "HELD")
+            .values(held_until=hold.expires_at)
+            .returning(EventSeat.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        event_id, expires_at = hold.event_id, hold.expires_at
+    availability_map.mark_eventseats(event_id, held, "HELD", held_until=expires_at, bumped=False)
+    return expires_at
+
+
+def cancel_hold(token: str) -> int:
+    """Release an active hold's seats and mark it CANCELLED. Returns seats released."""
+    now = datetime.now(tz=timezone.utc)
+    with get_session() as session:
+        hold = _active_hold(session, token, now)
+        if hold is None:
+            return 0
+        released = _release_rows(session, EventSeat.hold_id == hold.id)
+        hold.status = "CANCELLED"
+    _mark_released(released)
+    return len(released)
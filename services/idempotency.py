@@ -0,0 +1,97 @@
+"""
+Idempotency keys for the booking functions.
+
+A retried checkout (double Enter, client retry after a timeout) carrying the same key
+gets the tickets of the first call back, without touching event_seats again.
+
+- claim_key inserts the key with ON CONFLICT DO NOTHING. On PostgreSQL a concurrent
+  retry blocks on the first caller's uncommitted row and then sees its stored result.
+- A key only replays for the operation and customer that claimed it; any other caller
+  gets IdempotencyConflict, never someone else's tickets.
+- Keys live for IDEMPOTENCY_TTL; purge_expired_keys deletes the expired ones.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from db import get_session, dialect_insert
+from models.event_seat import EventSeat
+from models.idempotency_key import IdempotencyKey
+from models.seat import Seat
+from models.ticket import Ticket
+from services.seat_service import seat_label_expr
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+
+
+class IdempotencyConflict(ValueError):
+    """The key was claimed by a different operation or customer."""
+
+
+def claim_key(
+    session: Session,
+    key: str,
+    operation: str,
+    customer_id: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Optional[List[int]]:
+    """
+    Claim `key` in the caller's transaction.
+    Returns None if this call owns the key, or the stored ticket ids if it was used before.
+    Raises IdempotencyConflict if the stored key belongs to another operation or customer.
+    """
+    now = now or datetime.now(tz=timezone.utc)
+    # an expired key is free to be reused
+    session.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now))
+    claimed = session.scalar(
+        dialect_insert(session, IdempotencyKey)
+        .values(
+            key=key, operation=operation, customer_id=customer_id, ticket_ids=[],
+            created_at=now, expires_at=now + IDEMPOTENCY_TTL,
+        )
+        .on_conflict_do_nothing(index_elements=["key"])
+        .returning(IdempotencyKey.key)
+    )
+    if claimed is not None:
+        return None
+    stored = session.execute(
+        select(IdempotencyKey.operation, IdempotencyKey.customer_id, IdempotencyKey.ticket_ids)
+        .where(IdempotencyKey.key == key)
+    ).one()
+    if stored.operation != operation or stored.customer_id != customer_id:
+        raise IdempotencyConflict(f"idempotency key {key!r} was already used by another operation or customer")
+    return list(stored.ticket_ids or [])
+
+
+def record_result(session: Session, key: str, ticket_ids: List[int]) -> None:
+    """Store the ticket ids produced under a claimed key (same transaction as the tickets)."""
+    session.execute(
+        update(IdempotencyKey).where(IdempotencyKey.key == key).values(ticket_ids=list(ticket_ids))
+    )
+
+
+def load_tickets(session: Session, ticket_ids: List[int]) -> List[Tuple[Ticket, str]]:
+    """(Ticket, seat_label) for stored ticket ids, in the stored order."""
+    if not ticket_ids:
+        return []
+    rows = session.execute(
+        select(Ticket, seat_label_expr())
+        .join(EventSeat, EventSeat.id == Ticket.event_seat_id)
+        .join(Seat, Seat.id == EventSeat.seat_id)
+        .where(Ticket.id.in_(ticket_ids))
+    ).all()
+    by_id = {t.id: (t, label) for t, label in rows}
+    return [by_id[i] for i in ticket_ids if i in by_id]
+
+
+def purge_expired_keys(now: Optional[datetime] = None) -> int:
+    """Delete expired idempotency keys. Returns rows removed."""
+    now = now or datetime.now(tz=timezone.utc)
+    with get_session() as session:
+        return session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now)
+        ).rowcount or 0
@@ -0,0 +1,206 @@
+"""
+Per-event inventory counters (event_inventory_stats), maintained transactionally.
+
+- Every service that changes an EventSeat status calls record_transition in the same
+  transaction, with the number of rows that moved and (for sales) their revenue. The
+  counter UPDATE commits or rolls back together with the seats it describes.
+- Counts follow the stored status: a lapsed hold is still `held` until
+  release_expired_holds returns it to AVAILABLE.
+- A missing stats row is created from event_seats on first touch (INSERT ... ON
+  CONFLICT DO NOTHING, so concurrent first touches don't collide), so events created
+  before the table existed heal themselves; rebuild_stats upserts recomputed counters
+  for any set of events and backs scripts/reconcile_inventory_stats.py.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from db import dialect_insert, get_session
+from models.event import Event
+from models.event_inventory_stats import EventInventoryStats
+from models.event_seat import EventSeat
+
+_COUNTERS = {"AVAILABLE": "available", "HELD": "held", "SOLD": "sold"}
+_COLUMNS = ["event_id", "available", "held", "sold", "revenue_ksh", "updated_at"]
+
+
+class InventoryStats(NamedTuple):
+    available: int
+    held: int
+    sold: int
+    revenue_ksh: int
+
+    @property
+    def total(self) -> int:
+        return self.available + self.held + self.sold
+
+
+def record_transition(
+    session: Session,
+    event_id: int,
+    from_status: Optional[str],
+    to_status: Optional[str],
+    count: int,
+    revenue_ksh: int = 0,
+) -> None:
+    """
+    Move `count` seats of an event from one status counter to another (None = the seat
+    row was created / deleted). revenue_ksh is the price total of seats entering or
+    leaving SOLD.
+    """
+    if count <= 0 or from_status == to_status:
+        return
+    values = {}
+    if from_status is not None:
+        col = _COUNTERS[from_status]
+        values[col] = getattr(EventInventoryStats, col) - count
+    if to_status is not None:
+        col = _COUNTERS[to_status]
+        values[col] = getattr(EventInventoryStats, col) + count
+    if to_status == "SOLD":
+        values["revenue_ksh"] = EventInventoryStats.revenue_ksh + revenue_ksh
+    elif from_status == "SOLD":
+        values["revenue_ksh"] = EventInventoryStats.revenue_ksh - revenue_ksh
+    values["updated_at"] = datetime.now(tz=timezone.utc)
+
+    apply = (
+        update(EventInventoryStats)
+        .where(EventInventoryStats.event_id == event_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if session.execute(apply).rowcount:
+        return
+    # No counters yet: create them from event_seats, this transaction's change included.
+    # If a concurrent first touch created the row instead, its count cannot see our
+    # uncommitted change, so apply the change on top of its row.
+    if not create_missing_stats(session, [event_id]):
+        session.execute(apply)
+
+
+def _stats_query(event_ids: Optional[List[int]] = None):
+    """Counters computed from event_seats, one row per event (events without seats give zeros)."""
+
+    def count_of(status: str):
+        return func.coalesce(func.sum(case((EventSeat.status == status, 1), else_=0)), 0)
+
+    q = (
+        select(
+            Event.id,
+            count_of("AVAILABLE"),
+            count_of("HELD"),
+            count_of("SOLD"),
+            func.coalesce(func.sum(case((EventSeat.status == "SOLD", EventSeat.price_ksh), else_=0)), 0),
+        )
+        .outerjoin(EventSeat, EventSeat.event_id == Event.id)
+        .group_by(Event.id)
+    )
+    if event_ids is not None:
+        q = q.where(Event.id.in_(event_ids))
+    return q
+
+
+def _insert_stats(session: Session, ids: Optional[List[int]]):
+    rows = _stats_query(ids).add_columns(literal(datetime.now(tz=timezone.utc)))
+    return dialect_insert(session, EventInventoryStats).from_select(_COLUMNS, rows)
+
+
+def create_missing_stats(session: Session, event_ids: Iterable[int]) -> List[int]:
+    """
+    Create counters from event_seats for events that have none, with INSERT ... SELECT
+    ... ON CONFLICT DO NOTHING. Returns the event ids whose rows this call created.
+    """
+    ids = list(event_ids)
+    if not ids:
+        return []
+    stmt = _insert_stats(session, ids).on_conflict_do_nothing(index_elements=["event_id"])
+    return list(session.scalars(stmt.returning(EventInventoryStats.event_id)).all())
+
+
+def rebuild_stats(session: Session, event_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the counters of the given events (all events if None) from event_seats with
+    one INSERT ... SELECT ... ON CONFLICT DO UPDATE. Returns rows written.
+    """
+    ids = None if event_ids is None else list(event_ids)
+    if ids is not None and not ids:
+        return 0
+    stmt = _insert_stats(session, ids)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["event_id"], set_={col: stmt.excluded[col] for col in _COLUMNS[1:]}
+    )
+    return session.execute(stmt).rowcount or 0
+
+
+def get_inventory_stats(event_ids: Iterable[int]) -> Dict[int, InventoryStats]:
+    """{event_id: InventoryStats}, one primary-key row per event; missing rows are created first."""
+    ids = list(dict.fromkeys(event_ids))
+    if not ids:
+        return {}
+    with get_session() as session:
+        stmt = select(
+            EventInventoryStats.event_id,
+            EventInventoryStats.available,
+            EventInventoryStats.held,
+            EventInventoryStats.sold,
+            EventInventoryStats.revenue_ksh,
+        ).where(EventInventoryStats.event_id.in_(ids))
+        out = {eid: InventoryStats(*rest) for eid, *rest in session.execute(stmt)}
+        missing = [eid for eid in ids if eid not in out]
+        if missing:
+            create_missing_stats(session, missing)
+            out.update({
+                eid: InventoryStats(*rest)
+                for eid, *rest in session.execute(stmt.where(EventInventoryStats.event_id.in_(missing)))
+            })
+    return out
+
+
+class StatsDrift(NamedTuple):
+    event_id: int
+    stored: Optional[InventoryStats]
+    actual: InventoryStats
+
+
+def reconcile_inventory_stats(event_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> List[StatsDrift]:
+    """
+    Compare stored counters with a fresh count of event_seats and rebuild the ones that drifted.
+    Returns the events whose stored counters were wrong (or missing); dry_run only reports.
+    Safe while bookings run: only drifted rows are rewritten, each under a row lock.
+    """
+    ids = None if event_ids is None else list(event_ids)
+    with get_session() as session:
+        stored_q = select(
+            EventInventoryStats.event_id,
+            EventInventoryStats.available,
+            EventInventoryStats.held,
+            EventInventoryStats.sold,
+            EventInventoryStats.revenue_ksh,
+        )
+        if ids is not None:
+            stored_q = stored_q.where(EventInventoryStats.event_id.in_(ids))
+        stored = {eid: InventoryStats(*rest) for eid, *rest in session.execute(stored_q)}
+        drift = [
+            StatsDrift(eid, stored.get(eid), InventoryStats(*rest))
+            for eid, *rest in session.execute(_stats_query(ids))
+            if stored.get(eid) != InventoryStats(*rest)
+        ]
+        if not dry_run and drift:
+            # Lock the drifted rows before recounting: the recount then sees every change
+            # committed to them, and later record_transition calls queue behind it.
+            # Missing rows are only created, never overwritten (see record_transition).
+            present = sorted(d.event_id for d in drift if d.stored is not None)
+            if present:
+                session.execute(
+                    select(EventInventoryStats.event_id)
+                    .where(EventInventoryStats.event_id.in_(present))
+                    .order_by(EventInventoryStats.event_id)
+                    .with_for_update()
+                ).all()
+                rebuild_stats(session, present)
+            create_missing_stats(session, [d.event_id for d in drift if d.stored is None])
+    return drift
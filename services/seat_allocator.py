@@ -0,0 +1,250 @@
+"""
+Best-available allocator for group bookings.
+
+Finds a contiguous run of AVAILABLE seats in one row (Seat.section / Seat.row /
+Seat.number grid) and holds the whole run atomically.
+
+- FreeRunIndex keeps, per row, the sorted free runs (start, length) and the longest
+  run length, so a lookup skips every row that cannot fit the party.
+- The index is built from a gaps-and-islands query: the database collapses the
+  event's available seats into runs and only the runs come back to Python.
+- Indexes are cached per event for a short TTL and patched as blocks are taken. A
+  failed hold (another buyer got there first) reloads just that row, drops the seats
+  it lost from the candidates (a concurrent hold may still be uncommitted) and retries.
+- Rows are tried front to back in natural order ("2" before "10").
+- None means no block of that size exists; AllocationContended means every attempt
+  lost a race while seats remain, so the caller can retry.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db import get_session
+from models.event_seat import EventSeat
+from models.seat import Seat
+from services import availability_map
+from services.eventseat_service import _hold_rows, available_clause
+from services.hold_service import create_hold
+from services.seat_service import seat_label
+
+# How long a cached per-event index is trusted before being rebuilt from the DB.
+INDEX_TTL_SECONDS = 5.0
+
+
+@dataclass
+class SeatBlock:
+    """A held contiguous block: hold token, section/row label, first/last seat number and the held EventSeat ids."""
+    token: str
+    section: str
+    row: str
+    first_number: int
+    last_number: int
+    eventseat_ids: List[int]
+    held_until: datetime
+
+    @property
+    def labels(self) -> List[str]:
+        return [seat_label(self.section, self.row, n) for n in range(self.first_number, self.last_number + 1)]
+
+
+class AllocationContended(RuntimeError):
+    """Every attempt lost its block to concurrent buyers; seats may remain, retry shortly."""
+
+
+# Rows are keyed by (section, row) since row labels may repeat across sections.
+RowKey = Tuple[str, str]
+
+
+def _natural(label: str) -> Tuple[Tuple[int, int, str], ...]:
+    # "A" < "B", "2" < "10", "AA2" < "AA10"
+    return tuple((0, int(t), "") if t.isdigit() else (1, 0, t) for t in re.split(r"(\d+)", label) if t)
+
+
+def _row_order(row: RowKey) -> Tuple[Tuple[Tuple[int, int, str], ...], ...]:
+    return _natural(row[0]), _natural(row[1])
+
+
+@dataclass
+class FreeRunIndex:
+    """Per-row free runs for one event: (section, row) -> sorted [(start, length)]."""
+    event_id: int
+    runs: Dict[RowKey, List[Tuple[int, int]]]
+    built_at: float = field(default_factory=time.monotonic)
+    longest: Dict[RowKey, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.longest = {r: max((n for _, n in rs), default=0) for r, rs in self.runs.items()}
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.built_at > INDEX_TTL_SECONDS
+
+    def best_run(self, party_size: int) -> Optional[Tuple[RowKey, int]]:
+        """
+        Pick ((section, row), start) for the party: front-most row that fits, and within that row
+        the tightest run (least fragmentation), then the lowest seat number.
+        """
+        for row in sorted(self.runs, key=_row_order):
+            if self.longest.get(row, 0) < party_size:
+                continue
+            fits = [
+                (length - party_size, start)
+                for start, length in self.runs[row]
+                if length >= party_size
+            ]
+            if fits:
+                _, start = min(fits)
+                return row, start
+        return None
+
+    def set_row(self, row: RowKey, runs: List[Tuple[int, int]]) -> None:
+        self.runs[row] = sorted(runs)
+        self.longest[row] = max((n for _, n in runs), default=0)
+
+    def take(self, row: RowKey, start: int, length: int) -> None:
+        """Remove [start, start+length) from the run that contains it, splitting the remainder."""
+        end = start + length
+        updated: List[Tuple[int, int]] = []
+        for run_start, run_len in self.runs.get(row, []):
+            run_end = run_start + run_len
+            if run_end <= start or run_start >= end:
+                updated.append((run_start, run_len))
+                continue
+            if run_start < start:
+                updated.append((run_start, start - run_start))
+            if run_end > end:
+                updated.append((end, run_end - end))
+        self.set_row(row, updated)
+
+
+_indexes: Dict[int, FreeRunIndex] = {}
+_lock = threading.Lock()
+
+
+def _load_runs(session: Session, event_id: int, row: Optional[RowKey] = None) -> Dict[RowKey, List[Tuple[int, int]]]:
+    """Collapse available seats (see available_clause) into (row, start, length) runs inside the database."""
+    now = datetime.now(tz=timezone.utc)
+    island = Seat.number - func.row_number().over(partition_by=(Seat.section, Seat.row), order_by=Seat.number)
+    q = (
+        select(
+            Seat.section.label("section"),
+            Seat.row.label("row"),
+            Seat.number.label("number"),
+            island.label("island"),
+        )
+        .join(EventSeat, EventSeat.seat_id == Seat.id)
+        .where(EventSeat.event_id == event_id, available_clause(now))
+    )
+    if row is not None:
+        q = q.where(Seat.section == row[0], Seat.row == row[1])
+    seats = q.subquery()
+    runs: Dict[RowKey, List[Tuple[int, int]]] = {}
+    for section, r, start, length in session.execute(
+        select(seats.c.section, seats.c.row, func.min(seats.c.number), func.count())
+        .group_by(seats.c.section, seats.c.row, seats.c.island)
+    ):
+        runs.setdefault((section, r), []).append((int(start), int(length)))
+    return runs
+
+
+def get_free_run_index(event_id: int, refresh: bool = False) -> FreeRunIndex:
+    """Return the cached index for an event, rebuilding it when missing, stale or refresh=True."""
+    with _lock:
+        idx = _indexes.get(event_id)
+        if idx is not None and not refresh and not idx.is_stale():
+            return idx
+    with get_session() as session:
+        idx = FreeRunIndex(event_id=event_id, runs=_load_runs(session, event_id))
+    with _lock:
+        _indexes[event_id] = idx
+    return idx
+
+
+def allocate_best_available(
+    event_id: int,
+    party_size: int,
+    minutes: int = 15,
+    max_attempts: int = 5,
+) -> Optional[SeatBlock]:
+    """
+    Find the best contiguous run of `party_size` AVAILABLE seats in one row and hold it.
+
+    All-or-nothing: the run is held under a new Hold inside a savepoint and rolled back
+    if any seat in it was taken concurrently; the row is then reloaded without the
+    contested seats and the next candidate tried.
+    Returns the held SeatBlock, or None when no row has a long enough free run.
+    Raises AllocationContended when all max_attempts lost their race.
+    """
+    if party_size <= 0:
+        return None
+    if minutes <= 0:
+        minutes = 15
+    hold_until = datetime.now(tz=timezone.utc) + timedelta(minutes=minutes)
+
+    idx = get_free_run_index(event_id)
+    for _ in range(max_attempts):
+        with _lock:
+            pick = idx.best_run(party_size)
+        if pick is None:
+            return None
+        row, start = pick
+        last = start + party_size - 1
+
+        with get_session() as session:
+            block = session.execute(
+                select(Seat.id, Seat.number, EventSeat.id)
+                .join(EventSeat, EventSeat.seat_id == Seat.id)
+                .where(
+                    EventSeat.event_id == event_id,
+                    Seat.section == row[0],
+                    Seat.row == row[1],
+                    Seat.number.between(start, last),
+                )
+            ).all()
+            held: List[int] = []
+            contested: List[int] = []
+            if len(block) == party_size:
+                savepoint = session.begin_nested()
+                hold = create_hold(session, event_id, hold_until)
+                token = hold.token
+                held = _hold_rows(session, event_id, [sid for sid, _, _ in block], hold_until, hold_id=hold.id)
+                if len(held) == party_size:
+                    savepoint.commit()
+                else:
+                    savepoint.rollback()
+                    got = set(held)
+                    contested = [number for _, number, esid in block if esid not in got]
+                    held = []
+            if not held:
+                # Lost the race (or the index was stale): reload this row only and retry.
+                fresh = _load_runs(session, event_id, row=row).get(row, [])
+
+        with _lock:
+            if held:
+                idx.take(row, start, party_size)
+            else:
+                # seats locked by an uncommitted concurrent hold still read as available
+                idx.set_row(row, fresh)
+                for number in contested:
+                    idx.take(row, number, 1)
+        if held:
+            availability_map.mark_eventseats(event_id, held, "HELD", held_until=hold_until)
+            return SeatBlock(
+                token=token,
+                section=row[0],
+                row=row[1],
+                first_number=start,
+                last_number=last,
+                eventseat_ids=held,
+                held_until=hold_until,
+            )
+    raise AllocationContended(
+        f"lost {max_attempts} races for {party_size} seats together in event {event_id}; try again"
+    )
@@ -1,30 +1,30 @@
 from __future__ import annotations
 from typing import Iterable, List
-from sqlalchemy import select, func
+from sqlalchemy import String, case, cast, select, func
+from sqlalchemy.sql.elements import ColumnElement
 from db import get_session
 from models.seat import Seat
+from services.venue_layout_service import SectionLayout, build_venue_layout
+
+def seat_label(section: str, row: str, number: int) -> str:
+    # "A12"; in a sectioned venue row labels repeat across sections, so "North-A12"
+    return f"{section}-{row}{number}" if section else f"{row}{number}"
+
+def seat_label_expr() -> ColumnElement[str]:
+    # seat_label in SQL, over the seats table
+    plain = Seat.row + cast(Seat.number, String)
+    return case((Seat.section == "", plain), else_=Seat.section + "-" + plain)
 
 def ensure_seat_row(venue_id: int, row: str, numbers: Iterable[int]) -> int:
-    created = 0
-    nums = list(numbers)
-    with get_session() as session:
-        existing = set(session.scalars(
-            select(Seat.number).where(Seat.venue_id == venue_id, Seat.row == row, Seat.number.in_(nums))
-        ).all())
-        to_create = [n for n in nums if n not in existing]
-        if to_create:
-            session.add_all([Seat(venue_id=venue_id, row=row, number=n) for n in to_create])
-            created = len(to_create)
-    return created
+    return build_venue_layout(venue_id, [SectionLayout(rows={row: list(numbers)})])
 
 def ensure_grid(venue_id: int, rows: Iterable[str], numbers: Iterable[int]) -> int:
-    total = 0
-    for r in rows:
-        total += ensure_seat_row(venue_id, r, numbers)
-    return total
+    # Whole grid in one transaction with batched, conflict-skipping inserts
+    nums = list(numbers)
+    return build_venue_layout(venue_id, [SectionLayout(rows={r: nums for r in rows})])
 
 def list_seats_for_venue(venue_id: int) -> List[Seat]:
     with get_session() as session:
         return session.scalars(
-            select(Seat).where(Seat.venue_id == venue_id).order_by(Seat.row, Seat.number)
-        ).all()
\ No newline at end of file
+            select(Seat).where(Seat.venue_id == venue_id).order_by(Seat.section, Seat.row, Seat.number)
+        ).all()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Union
+from sqlalchemy.orm import Session
+from db import get_session, dialect_insert
+from models.seat import Seat
+
+# Rows per multi-row INSERT (4 bind params per row keeps well under driver limits).
+DEFAULT_BATCH_SIZE = 5000
+
+# A row is either a seat count (numbers 1..count) or an explicit list of seat numbers.
+RowSpec = Union[int, Iterable[int]]
+
+
+@dataclass
+class SectionLayout:
+    """One section of a venue: row label -> seat count (or explicit seat numbers)."""
+    name: str = ""
+    rows: Mapping[str, RowSpec] = field(default_factory=dict)
+
+
+def iter_layout_seats(venue_id: int, sections: Iterable[SectionLayout]) -> Iterator[Dict[str, object]]:
+    """Expand a layout into Seat insert parameters, one dict per seat."""
+    for section in sections:
+        for row, spec in section.rows.items():
+            numbers = range(1, spec + 1) if isinstance(spec, int) else spec
+            for n in numbers:
+                yield {"venue_id": venue_id, "section": section.name, "row": row, "number": int(n)}
+
+
+def insert_seat_batch(session: Session, seats: List[Dict[str, object]]) -> int:
+    """One multi-row INSERT that skips seats already present. Returns rows inserted."""
+    if not seats:
+        return 0
+    stmt = (
+        dialect_insert(session, Seat)
+        .values(seats)
+        .on_conflict_do_nothing(index_elements=["venue_id", "section", "row", "number"])
+    )
+    return session.execute(stmt).rowcount or 0
+
+
+def build_venue_layout(
+    venue_id: int,
+    sections: Iterable[SectionLayout],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Create a venue's multi-section seat grid in one transaction.
+
+    Seats are written in batches of multi-row INSERT ... ON CONFLICT DO NOTHING, so
+    re-running a layout only adds the seats that are missing (existing seats, and the
+    event inventory pointing at them, are never touched).
+    Returns number of Seat rows created.
+    """
+    created = 0
+    batch: List[Dict[str, object]] = []
+    with get_session() as session:
+        for seat in iter_layout_seats(venue_id, sections):
+            batch.append(seat)
+            if len(batch) >= batch_size:
+                created += insert_seat_batch(session, batch)
+                batch = []
+        created += insert_seat_batch(session, batch)
+    return created
+
+
+class ImportReport(NamedTuple):
+    read: int
+    created: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds > 0 else 0.0
+
+
+def _layout_record_seats(record: Mapping[str, object]) -> Iterator[Dict[str, object]]:
+    """
+    One layout record -> seat(s). A record names a section (optional) and a row, plus
+    either a seat `number` or a `seats` count (expands to numbers 1..seats).
+    """
+    section = str(record.get("section") or "").strip()
+    row = str(record.get("row") or "").strip()
+    if not row:
+        raise ValueError(f"layout record without a row: {dict(record)!r}")
+    number = record.get("number")
+    if number not in (None, ""):
+        yield {"section": section, "row": row, "number": int(number)}  # type: ignore[arg-type]
+        return
+    count = record.get("seats")
+    if count in (None, ""):
+        raise ValueError(f"layout record needs 'number' or 'seats': {dict(record)!r}")
+    for n in range(1, int(count) + 1):  # type: ignore[arg-type]
+        yield {"section": section, "row": row, "number": n}
+
+
+def iter_layout_file(path: Union[str, Path], fmt: Optional[str] = None) -> Iterator[Dict[str, object]]:
+    """
+    Stream seats from a CSV (header: section,row,number or section,row,seats) or a
+    JSON-lines layout file, one line at a time. fmt defaults to the file extension.
+    """
+    path = Path(path)
+    fmt = (fmt or path.suffix.lstrip(".")).lower()
+    # utf-8-sig: spreadsheet exports often start with a BOM, which would otherwise stick to
+    # the first CSV header ("\ufeffsection") and silently blank the section
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            records: Iterable[Mapping[str, object]] = csv.DictReader(fh)
+        elif fmt in ("jsonl", "ndjson", "json"):
+            records = (json.loads(line) for line in fh if line.strip())
+        else:
+            raise ValueError(f"unsupported layout format: {fmt!r} (use csv or jsonl)")
+        for record in records:
+            yield from _layout_record_seats(record)
+
+
+def import_layout_seats(
+    venue_id: int,
+    seats: Iterable[Mapping[str, object]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Insert streamed seats (section/row/number dicts) for a venue in bounded batches.
+
+    Each batch is its own transaction, so memory stays at one batch and an interrupted
+    import can simply be re-run (existing seats are skipped). `progress` is called
+    after every batch with the running totals.
+    """
+    read = created = 0
+    started = time.perf_counter()
+    batch: List[Dict[str, object]] = []
+
+    def flush() -> None:
+        nonlocal created, batch
+        with get_session() as session:
+            created += insert_seat_batch(session, batch)
+        batch = []
+        if progress is not None:
+            progress(ImportReport(read, created, time.perf_counter() - started))
+
+    for seat in seats:
+        batch.append({"venue_id": venue_id, **seat})
+        read += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return ImportReport(read, created, time.perf_counter() - started)
@@ -0,0 +1,209 @@
+"""
+Archiver: cold storage for past events before the reclaimer deletes them.
+
+Behavior:
+- archive: stream one event's Event, EventSeat and Ticket rows into a gzip-compressed
+  JSON-lines file (event-<id>.jsonl.gz). Rows come through a server-side cursor
+  (yield_per) and are written line by line, so memory stays constant per event.
+  The file is written under a .part name, fsynced and renamed, and ends with a
+  trailer holding the row counts, so a truncated file is never mistaken for a
+  complete archive.
+- restore: bulk-load an archive back (batched multi-row INSERTs in one transaction),
+  then rebuild the event's inventory counters. Customers and venue seats are not
+  archived; they must still exist.
+
+Line format: a header {"format": "event-archive", "version": 1, ...}, then one
+{"table": ..., "row": {...}} per row, then {"end": true, "rows": {table: count}}.
+
+Run from project root:
+  python -m worker.archiver archive 12 --dir archives/
+  python -m worker.archiver restore archives/event-000012.jsonl.gz
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Union
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+	sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import DateTime, Table, insert, select
+
+import models  # noqa: F401  register mappers
+from db import get_session
+from models.event import Event
+from models.event_seat import EventSeat
+from models.ticket import Ticket
+from services import availability_map
+from services.inventory_stats import rebuild_stats
+
+ARCHIVE_FORMAT = "event-archive"
+ARCHIVE_VERSION = 1
+
+# Rows fetched per round trip from the server-side cursor, and rows per INSERT on restore.
+STREAM_BATCH = 2000
+
+_TABLES: Dict[str, Table] = {
+	t.name: t for t in (Event.__table__, EventSeat.__table__, Ticket.__table__)  # type: ignore[misc]
+}
+
+
+class ArchiveReport(NamedTuple):
+	event_id: int
+	path: Path
+	rows: Dict[str, int]
+	bytes: int
+	seconds: float
+
+
+class RestoreReport(NamedTuple):
+	event_id: int
+	rows: Dict[str, int]
+	seconds: float
+
+
+def archive_path(archive_dir: Union[str, Path], event_id: int) -> Path:
+	return Path(archive_dir) / f"event-{event_id:06d}.jsonl.gz"
+
+
+def _encode(value: Any) -> Any:
+	return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _decode(table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+	out = {}
+	for name, value in row.items():
+		if value is not None and isinstance(table.c[name].type, DateTime):
+			value = datetime.fromisoformat(value)
+		out[name] = value
+	return out
+
+
+def _event_rows(session, event_id: int) -> Iterator[tuple[str, Dict[str, Any]]]:
+	"""(table name, row mapping) for the event, its seats and their tickets, streamed."""
+	ev, es, tk = _TABLES["events"], _TABLES["event_seats"], _TABLES["tickets"]
+	statements = (
+		(ev, select(ev).where(ev.c.id == event_id)),
+		(es, select(es).where(es.c.event_id == event_id).order_by(es.c.id)),
+		(tk, select(tk).join(es, es.c.id == tk.c.event_seat_id).where(es.c.event_id == event_id).order_by(tk.c.id)),
+	)
+	for table, stmt in statements:
+		for row in session.execute(stmt, execution_options={"yield_per": STREAM_BATCH}).mappings():
+			yield table.name, dict(row)
+
+
+def archive_event(event_id: int, archive_dir: Union[str, Path]) -> ArchiveReport:
+	"""Write one event's rows to archive_dir/event-<id>.jsonl.gz. Raises ValueError if the event is missing."""
+	path = archive_path(archive_dir, event_id)
+	path.parent.mkdir(parents=True, exist_ok=True)
+	part = path.with_name(path.name + ".part")
+	counts = {name: 0 for name in _TABLES}
+	started = time.perf_counter()
+	with get_session() as session, gzip.open(part, "wt", encoding="utf-8") as fh:
+		header = {
+			"format": ARCHIVE_FORMAT,
+			"version": ARCHIVE_VERSION,
+			"event_id": event_id,
+			"archived_at": datetime.now(tz=timezone.utc).isoformat(),
+		}
+		fh.write(json.dumps(header) + "\n")
+		for table, row in _event_rows(session, event_id):
+			fh.write(json.dumps({"table": table, "row": {k: _encode(v) for k, v in row.items()}}) + "\n")
+			counts[table] += 1
+		fh.write(json.dumps({"end": True, "rows": counts}) + "\n")
+	if counts["events"] == 0:
+		part.unlink()
+		raise ValueError(f"Event {event_id} not found")
+	with open(part, "rb") as raw:
+		os.fsync(raw.fileno())
+	os.replace(part, path)
+	return ArchiveReport(event_id, path, counts, path.stat().st_size, time.perf_counter() - started)
+
+
+def _read_archive(path: Path) -> Iterator[Dict[str, Any]]:
+	with gzip.open(path, "rt", encoding="utf-8") as fh:
+		for line in fh:
+			if line.strip():
+				yield json.loads(line)
+
+
+def restore_archive(path: Union[str, Path]) -> RestoreReport:
+	"""
+	Load an archive back in one transaction: rows are inserted in batches of
+	STREAM_BATCH as the file is read. A missing trailer or count mismatch (truncated
+	file) rolls the whole restore back with ValueError.
+	"""
+	path = Path(path)
+	records = _read_archive(path)
+	header = next(records, None)
+	if not header or header.get("format") != ARCHIVE_FORMAT or header.get("version") != ARCHIVE_VERSION:
+		raise ValueError(f"{path}: not a version {ARCHIVE_VERSION} event archive")
+
+	event_id = int(header["event_id"])
+	counts = {name: 0 for name in _TABLES}
+	started = time.perf_counter()
+	with get_session() as session:
+		if session.get(Event, event_id) is not None:
+			raise ValueError(f"Event {event_id} already exists; delete it before restoring")
+		table_name = None
+		batch: List[Dict[str, Any]] = []
+
+		def flush() -> None:
+			if batch:
+				session.execute(insert(_TABLES[table_name]), batch)  # type: ignore[index]
+				batch.clear()
+
+		trailer = None
+		for record in records:
+			if record.get("end"):
+				trailer = record
+				break
+			if record["table"] != table_name:
+				flush()
+				table_name = record["table"]
+			row = _decode(_TABLES[table_name], record["row"])
+			if table_name == "event_seats":
+				row["hold_id"] = None  # holds are not archived
+			batch.append(row)
+			counts[table_name] += 1
+			if len(batch) >= STREAM_BATCH:
+				flush()
+		flush()
+		if trailer is None or trailer.get("rows") != counts:
+			raise ValueError(f"{path}: archive is truncated or inconsistent (read {counts})")
+		rebuild_stats(session, [event_id])
+	availability_map.invalidate(event_id)
+	return RestoreReport(event_id, counts, time.perf_counter() - started)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	sub = parser.add_subparsers(dest="command", required=True)
+	p_archive = sub.add_parser("archive", help="archive one or more events")
+	p_archive.add_argument("event_ids", type=int, nargs="+")
+	p_archive.add_argument("--dir", default="archives", help="directory for event-<id>.jsonl.gz files")
+	p_restore = sub.add_parser("restore", help="load archive files back into the database")
+	p_restore.add_argument("paths", nargs="+")
+	args = parser.parse_args()
+
+	if args.command == "archive":
+		for eid in args.event_ids:
+			r = archive_event(eid, args.dir)
+			print(f"Archived event {eid} → {r.path} ({r.rows}, {r.bytes:,} bytes, {r.seconds:.1f}s)")
+	else:
+		for p in args.paths:
+			r = restore_archive(p)
+			print(f"Restored event {r.event_id} from {p} ({r.rows}, {r.seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+	main()
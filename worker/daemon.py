@@ -0,0 +1,298 @@
+"""
+Worker daemon: the background jobs on their own schedules, in one long-running process.
+
+Tasks (intervals in seconds, each run pushed out by up to --jitter of its interval so
+replicas and jobs don't fire in lockstep):
+- expiry     hold expiry scheduler (worker/hold_expiry.py): picks up new holds every
+             --expiry-poll (default 1) and wakes at the next hold deadline to release
+             exactly the holds that are due
+- holds      full release_expired_holds sweep, the safety net for holds the scheduler
+             cannot see                    every --hold-interval       (default 300)
+- reclaim    chunked past-event reclaim     every --reclaim-interval    (default 3600)
+- reconcile  rebuild drifted counters       every --reconcile-interval  (default 900)
+- idem-keys  purge expired idempotency keys every --purge-interval      (default 3600)
+
+Leader election: several replicas may run; only the one holding the lock sweeps.
+On PostgreSQL that is a session-level advisory lock (pg_try_advisory_lock) on a
+dedicated connection, released automatically if the process dies. On other databases
+(local development) an exclusive flock on --lock-file stands in. Standbys retry the
+lock every few seconds.
+
+SIGINT / SIGTERM finish the running task, release the lock and exit. Every task run
+logs its duration, and a summary (runs, failures, mean / max seconds) is logged on exit.
+--profile DIR (or PROFILE_DIR) profiles each task run as worker.<task> (profiling.py);
+--profile-only reclaim keeps it to the tasks named.
+
+Run from project root:
+  python -m worker.daemon [--expiry-poll 1] [--hold-interval 300] [--archive-dir archives/] [--once]
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import argparse
+import logging
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+	sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+import models  # noqa: F401  register mappers
+import db.session
+import profiling
+from services.eventseat_service import release_expired_holds
+from services.idempotency import purge_expired_keys
+from services.inventory_stats import reconcile_inventory_stats
+from worker.hold_expiry import HoldExpiryScheduler
+from worker.reclaimer import DEFAULT_CHUNK_SIZE, reclaim_past_events_chunked
+
+log = logging.getLogger("worker.daemon")
+
+# Advisory lock id shared by every replica ("tick" in ASCII).
+ADVISORY_LOCK_KEY = 0x7469636B
+DEFAULT_LOCK_FILE = Path("/tmp/ticketing-worker.lock")
+
+# How often a standby retries the leader lock (seconds).
+STANDBY_RETRY_SECONDS = 5.0
+
+
+class LeaderLock:
+	"""Single-sweeper lock: PG advisory lock on its own connection, or a local flock."""
+
+	def __init__(self, lock_file: Path = DEFAULT_LOCK_FILE) -> None:
+		self.lock_file = lock_file
+		self._conn: Optional[Connection] = None
+		self._fh: Any = None
+
+	@property
+	def held(self) -> bool:
+		return self._conn is not None or self._fh is not None
+
+	def acquire(self) -> bool:
+		"""Try to become leader without blocking; True if this process now holds the lock."""
+		if self.held:
+			return self._still_held()
+		engine = db.session.get_engine()
+		if engine.dialect.name == "postgresql":
+			conn = engine.connect()
+			try:
+				got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": ADVISORY_LOCK_KEY}).scalar()
+				conn.commit()
+			except Exception:
+				conn.close()
+				raise
+			if got:
+				self._conn = conn
+			else:
+				conn.close()
+			return bool(got)
+
+		import fcntl  # local stand-in; POSIX only
+
+		fh = open(self.lock_file, "a+")
+		try:
+			fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+		except OSError:
+			fh.close()
+			return False
+		self._fh = fh
+		return True
+
+	def _still_held(self) -> bool:
+		# A dropped connection silently drops the advisory lock; probe it before each sweep.
+		if self._conn is None:
+			return True
+		try:
+			self._conn.execute(text("SELECT 1")).scalar()
+			self._conn.commit()
+			return True
+		except Exception:
+			log.warning("leader connection lost; giving up leadership")
+			self.release()
+			return False
+
+	def release(self) -> None:
+		if self._conn is not None:
+			try:
+				self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": ADVISORY_LOCK_KEY})
+				self._conn.commit()
+			except Exception:
+				pass  # closing the connection releases the lock anyway
+			finally:
+				self._conn.close()
+				self._conn = None
+		if self._fh is not None:
+			self._fh.close()  # closing the file drops the flock
+			self._fh = None
+
+
+@dataclass
+class Task:
+	name: str
+	fn: Callable[[], Any]
+	interval: float
+	jitter: float = 0.1
+	#optional: seconds until the task has real work (e.g. the next hold deadline); caps the wait
+	due_in: Optional[Callable[[], Optional[float]]] = None
+	#log runs that returned a falsy result at DEBUG only (frequent pollers)
+	quiet: bool = False
+	next_run: float = 0.0
+	runs: int = 0
+	failures: int = 0
+	total_seconds: float = 0.0
+	max_seconds: float = 0.0
+	last_seconds: float = 0.0
+
+	def schedule(self, now: float) -> None:
+		delay = self.interval * (1.0 + random.uniform(0.0, self.jitter))
+		if self.due_in is not None:
+			due = self.due_in()
+			if due is not None:
+				delay = min(delay, due)
+		self.next_run = now + delay
+
+	def run(self) -> None:
+		started = time.perf_counter()
+		try:
+			with profiling.profile(f"worker.{self.name}"):
+				result = self.fn()
+			outcome = "ok"
+		except Exception:
+			log.exception("task %s failed", self.name)
+			self.failures += 1
+			result, outcome = None, "failed"
+		elapsed = time.perf_counter() - started
+		self.runs += 1
+		self.last_seconds = elapsed
+		self.total_seconds += elapsed
+		self.max_seconds = max(self.max_seconds, elapsed)
+		level = logging.DEBUG if self.quiet and outcome == "ok" and not result else logging.INFO
+		log.log(level, "task=%s status=%s seconds=%.3f result=%s", self.name, outcome, elapsed, result)
+
+	def summary(self) -> Dict[str, Any]:
+		return {
+			"runs": self.runs,
+			"failures": self.failures,
+			"mean_seconds": round(self.total_seconds / self.runs, 4) if self.runs else 0.0,
+			"max_seconds": round(self.max_seconds, 4),
+		}
+
+
+@dataclass
+class WorkerDaemon:
+	tasks: List[Task]
+	lock: LeaderLock = field(default_factory=LeaderLock)
+	stop: threading.Event = field(default_factory=threading.Event)
+
+	def install_signal_handlers(self) -> None:
+		def handle(signum, _frame) -> None:
+			log.info("signal %s received; stopping after the current task", signal.Signals(signum).name)
+			self.stop.set()
+
+		signal.signal(signal.SIGINT, handle)
+		signal.signal(signal.SIGTERM, handle)
+
+	def run_once(self) -> None:
+		"""Run every task once, as leader; for cron-style use and testing."""
+		if not self.lock.acquire():
+			log.info("another worker holds the lock; nothing to do")
+			return
+		try:
+			for task in self.tasks:
+				if self.stop.is_set():
+					break
+				task.run()
+		finally:
+			self.lock.release()
+
+	def run_forever(self) -> None:
+		now = time.monotonic()
+		for task in self.tasks:
+			task.next_run = now  # first sweep right after becoming leader
+		leader = False
+		try:
+			while not self.stop.is_set():
+				if not self.lock.acquire():
+					if leader:
+						log.info("lost leadership; standing by")
+					leader = False
+					self.stop.wait(STANDBY_RETRY_SECONDS)
+					continue
+				if not leader:
+					log.info("acquired leader lock")
+					leader = True
+
+				for task in sorted(self.tasks, key=lambda t: t.next_run):
+					if self.stop.is_set() or task.next_run > time.monotonic():
+						continue
+					task.run()
+					task.schedule(time.monotonic())
+				wake = min(t.next_run for t in self.tasks)
+				self.stop.wait(max(0.0, min(wake - time.monotonic(), STANDBY_RETRY_SECONDS)))
+		finally:
+			self.lock.release()
+			for task in self.tasks:
+				log.info("summary task=%s %s", task.name, task.summary())
+
+
+def build_tasks(args: argparse.Namespace) -> List[Task]:
+	def reclaim() -> Any:
+		report = reclaim_past_events_chunked(args.chunk_size, args.sleep, archive_dir=args.archive_dir)
+		return f"{len(report.removed)} events, {report.rows} rows, {report.rows_per_second:.0f} rows/s"
+
+	def reconcile() -> Any:
+		return f"{len(reconcile_inventory_stats())} drifted"
+
+	scheduler = HoldExpiryScheduler(args.expiry_batch)
+	tasks = [
+		Task("expiry", scheduler.tick, args.expiry_poll, 0.0, due_in=scheduler.seconds_until_due, quiet=True),
+		Task("holds", release_expired_holds, args.hold_interval, args.jitter),
+		Task("reclaim", reclaim, args.reclaim_interval, args.jitter),
+		Task("reconcile", reconcile, args.reconcile_interval, args.jitter),
+		Task("idem-keys", purge_expired_keys, args.purge_interval, args.jitter),
+	]
+	return [t for t in tasks if t.interval > 0]
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--expiry-poll", type=float, default=1.0, help="seconds between new-hold polls (0 disables the scheduler)")
+	parser.add_argument("--expiry-batch", type=int, default=500, help="holds released per transaction by the scheduler")
+	parser.add_argument("--hold-interval", type=float, default=300.0, help="seconds between full hold sweeps (0 disables)")
+	parser.add_argument("--reclaim-interval", type=float, default=3600.0, help="seconds between reclaims (0 disables)")
+	parser.add_argument("--reconcile-interval", type=float, default=900.0, help="seconds between counter drift checks (0 disables)")
+	parser.add_argument("--purge-interval", type=float, default=3600.0, help="seconds between key purges (0 disables)")
+	parser.add_argument("--jitter", type=float, default=0.1, help="random extra delay, as a fraction of the interval")
+	parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="reclaim: seat rows per transaction")
+	parser.add_argument("--sleep", type=float, default=0.0, help="reclaim: pause between batches")
+	parser.add_argument("--archive-dir", help="reclaim: archive events here before deleting them")
+	parser.add_argument("--lock-file", type=Path, default=DEFAULT_LOCK_FILE, help="flock path when not on PostgreSQL")
+	parser.add_argument("--once", action="store_true", help="run every task once and exit")
+	parser.add_argument("--profile", metavar="DIR", help="profile every task run into DIR (see profiling.py)")
+	parser.add_argument("--profile-memory", action="store_true", help="with --profile: trace allocations too")
+	parser.add_argument("--profile-only", action="append", default=[], metavar="TASK", help="with --profile: only these tasks (repeatable)")
+	args = parser.parse_args()
+	if args.profile:
+		profiling.configure(args.profile, memory=args.profile_memory, only=args.profile_only)
+
+	logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+	daemon = WorkerDaemon(build_tasks(args), LeaderLock(args.lock_file))
+	daemon.install_signal_handlers()
+	if args.once:
+		daemon.run_once()
+	else:
+		daemon.run_forever()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,100 @@
+"""
+Hold expiry scheduler: release each hold close to its own deadline.
+
+- Upcoming deadlines live in a min-heap of (expires_at epoch, hold id).
+- The heap is loaded incrementally: the first load reads every ACTIVE hold (the
+  ix_holds_active_expires_at partial index); later loads read only holds with an id
+  above the highest one seen (a primary-key range scan).
+- Due holds are popped in batches of batch_size and released with
+  release_due_holds, which touches only those holds and their seats.
+- Holds that are no longer due when they fire (extended meanwhile) are pushed back
+  with their new expiry. Finalized or cancelled holds simply match nothing.
+- A hold whose id commits out of order (a lower id committing after a higher one was
+  seen) is not picked up here. The full release_expired_holds sweep, run on a long
+  interval, still catches it, along with legacy seats held without a Hold row.
+
+Used by worker/daemon.py; tick() loads new holds and releases whatever is due, and
+seconds_until_due() tells the daemon when to wake for the next deadline.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import heapq
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+	sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import func, select
+
+from db import get_session
+from models.hold import Hold
+from services.availability_map import _epoch
+from services.eventseat_service import release_due_holds
+
+# Holds released per transaction.
+DEFAULT_BATCH_SIZE = 500
+
+
+class HoldExpiryScheduler:
+	def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+		self.batch_size = max(1, batch_size)
+		self._heap: List[Tuple[float, int]] = []
+		self._last_id: Optional[int] = None
+
+	def __len__(self) -> int:
+		return len(self._heap)
+
+	def load(self) -> int:
+		"""Push holds created since the last load (all ACTIVE holds the first time). Returns holds added."""
+		with get_session() as session:
+			if self._last_id is None:
+				top = session.scalar(select(func.max(Hold.id))) or 0
+				rows = session.execute(
+					select(Hold.id, Hold.expires_at).where(Hold.status == "ACTIVE", Hold.id <= top)
+				).all()
+			else:
+				top = self._last_id
+				rows = session.execute(
+					select(Hold.id, Hold.expires_at).where(Hold.id > self._last_id, Hold.status == "ACTIVE")
+				).all()
+		for hold_id, expires_at in rows:
+			heapq.heappush(self._heap, (_epoch(expires_at), hold_id))
+			top = max(top, hold_id)
+		self._last_id = top
+		return len(rows)
+
+	def seconds_until_due(self) -> Optional[float]:
+		"""Seconds until the earliest queued deadline (0 if overdue), or None when idle."""
+		if not self._heap:
+			return None
+		return max(0.0, self._heap[0][0] - time.time())
+
+	def release_due(self) -> int:
+		"""Release every queued hold whose deadline has passed, batch_size holds per transaction."""
+		released = 0
+		while self._heap and self._heap[0][0] <= time.time():
+			now = datetime.now(tz=timezone.utc)
+			batch = []
+			while self._heap and self._heap[0][0] <= now.timestamp() and len(batch) < self.batch_size:
+				batch.append(heapq.heappop(self._heap)[1])
+			released += release_due_holds(batch, now)
+			self._requeue_extended(batch)
+		return released
+
+	def _requeue_extended(self, hold_ids: List[int]) -> None:
+		with get_session() as session:
+			for hold_id, expires_at in session.execute(
+				select(Hold.id, Hold.expires_at).where(Hold.id.in_(hold_ids), Hold.status == "ACTIVE")
+			):
+				heapq.heappush(self._heap, (_epoch(expires_at), hold_id))
+
+	def tick(self) -> int:
+		"""Load new holds, then release the due ones. Returns seats released."""
+		self.load()
+		return self.release_due()
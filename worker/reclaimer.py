@@ -4,9 +4,19 @@ Reclaimer: clean up events that have already passed.
 Behavior:
 - Find events where start_at < now (UTC).
 - Delete those events. Cascades will remove associated EventSeats and Tickets.
+- Default (chunked) mode deletes each event's seats in bounded batches of
+  --chunk-size rows, one transaction per batch, optionally sleeping --sleep seconds
+  between batches. Tickets go with their seats through the database's ON DELETE
+  CASCADE; the emptied event row (and its holds / counters) is deleted last.
+  Locks are held for one batch at a time and nothing is loaded into Python.
+- --single-transaction deletes all past events in one transaction (the old behavior).
+- --archive-dir DIR first writes each event to DIR/event-<id>.jsonl.gz (see
+  worker/archiver.py); an archive error stops the run before that event is deleted.
+- --profile DIR writes a cProfile / SQL summary of the reclaim cycle to DIR (profiling.py;
+  PROFILE_DIR does the same from the environment).
 
 Run from project root:
-  python -m worker.reclaimer
+  python -m worker.reclaimer [--chunk-size 5000] [--sleep 0.05] [--single-transaction] [--archive-dir archives/] [--profile profiles/]
 
 cronjob:
 
@@ -16,17 +26,28 @@ from __future__ import annotations
 
 from pathlib import Path
 import sys
+import argparse
+import time
 from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
 
 # Ensure project root on sys.path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
 	sys.path.insert(0, str(ROOT))
 
-from sqlalchemy import select
+from sqlalchemy import delete, select
 
+import models  # noqa: F401  register mappers
+import profiling
 from db import get_session
 from models.event import Event
+from models.event_seat import EventSeat
+from services import availability_map
+from worker.archiver import archive_event
+
+# Seat rows deleted per transaction in chunked mode.
+DEFAULT_CHUNK_SIZE = 5000
 
 
 def _fmt_event(e: Event) -> str:
@@ -41,19 +62,120 @@ def list_events_by_expiry():
 	return healthy, expired
 
 
-def reclaim_past_events() -> list[tuple[int, str, str]]:
+def reclaim_past_events(archive_dir: Optional[Union[str, Path]] = None) -> list[tuple[int, str, str]]:
 	"""Delete past events and return a list of removed (id, name, start_at_iso)."""
 	now = datetime.now(tz=timezone.utc)
 	removed: list[tuple[int, str, str]] = []
 	with get_session() as session:
 		past_events = session.scalars(select(Event).where(Event.start_at < now)).all()
 		for e in past_events:
+			if archive_dir is not None:
+				archive_event(e.id, archive_dir)
 			removed.append((e.id, e.name, e.start_at.isoformat()))
 			session.delete(e)
+	for eid, _, _ in removed:
+		availability_map.invalidate(eid)
 	return removed
 
 
+class ReclaimReport(NamedTuple):
+	removed: List[Tuple[int, str, str]]  # (id, name, start_at_iso) of deleted events
+	rows: int                            # event_seats + events rows deleted (cascaded tickets/holds not counted)
+	batches: int
+	seconds: float
+
+	@property
+	def rows_per_second(self) -> float:
+		return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _delete_seat_batch(event_id: int, chunk_size: int) -> int:
+	"""Delete up to chunk_size of an event's seats in one transaction. Returns rows deleted."""
+	batch = (
+		select(EventSeat.id)
+		.where(EventSeat.event_id == event_id)
+		.limit(chunk_size)
+		.scalar_subquery()
+	)
+	with get_session() as session:
+		return session.execute(
+			delete(EventSeat)
+			.where(EventSeat.id.in_(batch))
+			.execution_options(synchronize_session=False)
+		).rowcount or 0
+
+
+def reclaim_past_events_chunked(
+	chunk_size: int = DEFAULT_CHUNK_SIZE,
+	sleep: float = 0.0,
+	now: Optional[datetime] = None,
+	progress: Optional[Callable[[ReclaimReport], None]] = None,
+	archive_dir: Optional[Union[str, Path]] = None,
+) -> ReclaimReport:
+	"""
+	Delete past events batch by batch: each event's seats go chunk_size rows per
+	transaction (tickets cascade in the database), then the empty event row itself.
+	With archive_dir, each event is archived first; an archive error stops the run before
+	that event is touched.
+	`sleep` pauses between batches to give concurrent traffic room; `progress` is called
+	after every event with the running totals.
+	"""
+	if now is None:
+		now = datetime.now(tz=timezone.utc)
+	chunk_size = max(1, chunk_size)
+	with get_session() as session:
+		past = session.execute(
+			select(Event.id, Event.name, Event.start_at).where(Event.start_at < now).order_by(Event.start_at)
+		).all()
+
+	removed: List[Tuple[int, str, str]] = []
+	rows = batches = 0
+	started = time.perf_counter()
+	for eid, name, start_at in past:
+		if archive_dir is not None:
+			archive_event(eid, archive_dir)
+		while True:
+			deleted = _delete_seat_batch(eid, chunk_size)
+			rows += deleted
+			batches += 1
+			if deleted < chunk_size:
+				break
+			if sleep > 0:
+				time.sleep(sleep)
+		with get_session() as session:
+			rows += session.execute(
+				delete(Event).where(Event.id == eid).execution_options(synchronize_session=False)
+			).rowcount or 0
+		availability_map.invalidate(eid)
+		removed.append((eid, name, start_at.isoformat()))
+		if progress is not None:
+			progress(ReclaimReport(list(removed), rows, batches, time.perf_counter() - started))
+		if sleep > 0:
+			time.sleep(sleep)
+	return ReclaimReport(removed, rows, batches, time.perf_counter() - started)
+
+
+def _print_progress(report: ReclaimReport) -> None:
+	eid, name, _ = report.removed[-1]
+	print(
+		f"  event {eid} ({name}) done — {report.rows:,} rows in {report.batches} batches, "
+		f"{report.rows_per_second:,.0f} rows/s",
+		flush=True,
+	)
+
+
 def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="seat rows deleted per transaction")
+	parser.add_argument("--sleep", type=float, default=0.0, help="seconds to pause between batches")
+	parser.add_argument("--single-transaction", action="store_true", help="delete everything in one transaction")
+	parser.add_argument("--archive-dir", help="archive each event to this directory before deleting it")
+	parser.add_argument("--profile", metavar="DIR", help="profile the reclaim cycle into DIR (see profiling.py)")
+	parser.add_argument("--profile-memory", action="store_true", help="with --profile: trace allocations too")
+	args = parser.parse_args()
+	if args.profile:
+		profiling.configure(args.profile, memory=args.profile_memory)
+
 	healthy, expired = list_events_by_expiry()
 	print("Healthy (upcoming or ongoing) events:")
 	if healthy:
@@ -69,7 +191,19 @@ def main() -> None:
 	else:
 		print(" - None")
 
-	removed = reclaim_past_events()
+	with profiling.profile("reclaimer.cycle"):
+		if args.single_transaction:
+			removed = reclaim_past_events(args.archive_dir)
+		else:
+			report = reclaim_past_events_chunked(
+				args.chunk_size, args.sleep, progress=_print_progress, archive_dir=args.archive_dir
+			)
+			removed = report.removed
+	if removed and not args.single_transaction:
+		print(
+			f"\nReclaimed {report.rows:,} rows in {report.batches} batches, "
+			f"{report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)"
+		)
 	print("\nRemoved expired events:")
 	if removed:
 		for eid, name, when in removed:
@@ -80,4 +214,3 @@ def main() -> None:
 
 if __name__ == "__main__":
 	main()
-